@@ -0,0 +1,94 @@
+"""Read-throughput benchmark for compressed CSV input.
+
+Writes a deterministic synthetic CSV, compresses it with gzip, bz2 and xz, and times
+``read_sales_table`` on each file against the plain CSV.  For every codec it also times
+decompression alone and parsing with decompression inline on the parsing thread, so
+the gain from the read-ahead thread is visible (it needs a second CPU core to overlap
+with parsing).  Run from the project root::
+
+    python -m benchmarks.bench_compression --rows 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import bz2
+import csv
+import gzip
+import lzma
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+from src.sales_analysis.compression import CODECS, open_text
+from src.sales_analysis.reader import build_table, header_layout, read_sales_table
+from src.sales_analysis.synthetic import write_synthetic_csv
+
+_COMPRESSORS = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+_SUFFIXES = {codec.name: codec.suffixes[0] for codec in CODECS}
+
+
+def _compress(plain: Path, codec: str) -> Path:
+    target = plain.with_name(plain.name + _SUFFIXES[codec])
+    with plain.open("rb") as source, _COMPRESSORS[codec](target, "wb") as out:
+        shutil.copyfileobj(source, out, 1 << 20)
+    return target
+
+
+def _best(action: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def _drain(path: Path) -> None:
+    with open_text(path, threaded=False) as handle:
+        while handle.read(1 << 20):
+            pass
+
+
+def _parse(path: Path, threaded: bool) -> None:
+    with open_text(path, threaded=threaded) as handle:
+        rows = filter(None, csv.reader(handle))
+        build_table(rows, header_layout(next(rows, [])))
+
+
+def run(rows: int, seed: int, repeat: int, directory: Path) -> None:
+    plain = write_synthetic_csv(directory / f"synthetic_{rows}_{seed}.csv", rows, seed=seed)
+    megabytes = plain.stat().st_size / 2**20
+
+    def line(label: str, seconds: float, size: Optional[float] = None) -> None:
+        ratio = f"{size / megabytes:6.1%} of plain" if size is not None else ""
+        print(f"{label:<34} {seconds * 1000:9.1f} ms  {megabytes / seconds:8.1f} MiB/s  {ratio}")
+
+    print(f"Reading {rows:,} rows ({megabytes:.1f} MiB of CSV), best of {repeat}")
+    baseline = _best(lambda: read_sales_table(plain), repeat)
+    line("plain read_sales_table", baseline)
+    for codec in _COMPRESSORS:
+        compressed = _compress(plain, codec)
+        size = compressed.stat().st_size / 2**20
+        line(f"{codec}: decompress only", _best(lambda: _drain(compressed), repeat), size)
+        inline = _best(lambda: _parse(compressed, threaded=False), repeat)
+        line(f"{codec}: inline decompression", inline)
+        threaded = _best(lambda: _parse(compressed, threaded=True), repeat)
+        line(f"{codec}: read-ahead thread", threaded)
+        print(f"{'':<34} {min(inline, threaded) / baseline:9.2f}x the plain read time")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark reading gzip/bz2/xz sales CSVs")
+    parser.add_argument("--rows", type=int, default=100_000, help="number of synthetic rows")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the synthetic CSV")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per measurement (best is kept)")
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as directory:
+        run(max(1, args.rows), args.seed, max(1, args.repeat), Path(directory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Parse-throughput benchmark for the date/numeric decoding layer.
+
+Run from the project root::
+
+    python -m benchmarks.bench_decoding --rows 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional, Sequence
+
+from src.sales_analysis.decoding import DateDecoder, decode_floats, decode_ints
+
+
+def _legacy_parse_date(raw: str) -> Optional[date]:
+    cleaned = raw.strip()
+    if not cleaned:
+        return None
+    for fmt in ("%m/%d/%y", "%m/%d/%Y"):
+        try:
+            return datetime.strptime(cleaned, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unsupported date format: {raw}")
+
+
+def _legacy_parse_int(raw: str) -> int:
+    return int(float(raw)) if raw else 0
+
+
+def _legacy_parse_float(raw: str) -> float:
+    return float(raw) if raw else 0.0
+
+
+def _columns(rows: int, seed: int) -> tuple[List[str], List[str], List[str]]:
+    rng = random.Random(seed)
+    start = date(2014, 1, 1)
+    dates = [(start + timedelta(days=rng.randrange(3650))).strftime("%m/%d/%Y") for _ in range(rows)]
+    quantities = [str(rng.randint(1, 14)) for _ in range(rows)]
+    sales = [f"{rng.uniform(1, 5000):.4f}" for _ in range(rows)]
+    return dates, quantities, sales
+
+
+def _rate(label: str, rows: int, action: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed if elapsed else float("inf")
+    print(f"{label:<34} {elapsed * 1000:9.1f} ms  {rate:14,.0f} rows/s")
+    return rate
+
+
+def run(rows: int, seed: int) -> None:
+    dates, quantities, sales = _columns(rows, seed)
+
+    def legacy() -> None:
+        [_legacy_parse_date(value) for value in dates]
+        [_legacy_parse_int(value) for value in quantities]
+        [_legacy_parse_float(value) for value in sales]
+
+    def decoded() -> None:
+        DateDecoder().decode_days(dates)
+        decode_ints(quantities)
+        decode_floats(sales)
+
+    print(f"Decoding {rows:,} rows (Order Date + Quantity + Sales, MM/DD/YYYY dates)")
+    before = _rate("before: strptime + int(float())", rows, legacy)
+    after = _rate("after: DateDecoder + bulk columns", rows, decoded)
+    _rate("  dates only, strptime", rows, lambda: [_legacy_parse_date(value) for value in dates])
+    _rate("  dates only, DateDecoder", rows, lambda: list(map(DateDecoder(), dates)))
+    print(f"speed-up: {after / before:.1f}x")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark sales CSV field decoding")
+    parser.add_argument("--rows", type=int, default=200_000, help="number of synthetic rows to decode")
+    parser.add_argument("--seed", type=int, default=7, help="random seed for the synthetic columns")
+    args = parser.parse_args(argv)
+    run(max(1, args.rows), args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Heap-per-row benchmark for materialized ``SaleRecord`` lists.
+
+Compares the original representation (a ``__dict__``-backed frozen dataclass holding a
+fresh string and ``date`` per field) with what ``read_sales_csv`` returns now (slotted
+records sharing repeated strings and dates).  Run from the project root::
+
+    python -m benchmarks.bench_memory --rows 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import tempfile
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+from src.sales_analysis.decoding import parse_date, parse_float, parse_int
+from src.sales_analysis.models import SaleRecord
+from src.sales_analysis.reader import _iter_rows, header_layout, read_sales_csv
+from src.sales_analysis.synthetic import write_synthetic_csv
+
+LegacySaleRecord = make_dataclass(
+    "LegacySaleRecord", [(field.name, field.type) for field in fields(SaleRecord)], frozen=True
+)
+
+
+def _legacy_read(path: Path) -> List[object]:
+    """The pre-slots reader: a fresh string per field and a fresh ``date`` per cell."""
+    records = []
+    rows = _iter_rows(path)
+    layout = header_layout(next(rows))
+    for row in rows:
+        values = {}
+        for name, position in layout.items():
+            raw = row[position]
+            if name.endswith("_date"):
+                values[name] = parse_date(raw)
+            elif name == "quantity":
+                values[name] = parse_int(raw)
+            elif name in ("sales", "discount", "profit"):
+                values[name] = parse_float(raw)
+            else:
+                values[name] = raw
+        records.append(LegacySaleRecord(**values))
+    return records
+
+
+def _bytes_per_row(label: str, load: Callable[[], List[object]]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    records = load()
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_row = retained / max(1, len(records))
+    print(f"{label:<40} {retained / 2**20:9.1f} MiB  {per_row:8.0f} bytes/row")
+    del records
+    return per_row
+
+
+def run(rows: int, seed: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "sales.csv"
+        write_synthetic_csv(path, rows, seed=seed)
+        print(f"Retained heap for {rows:,} materialized rows")
+        before = _bytes_per_row("before: dict-backed, unshared fields", lambda: _legacy_read(path))
+        after = _bytes_per_row("after: slotted, shared strings/dates", lambda: read_sales_csv(path))
+    print(f"reduction: {before / after:.1f}x")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure heap bytes per materialized SaleRecord")
+    parser.add_argument("--rows", type=int, default=100_000, help="number of synthetic rows to load")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the synthetic CSV")
+    args = parser.parse_args(argv)
+    run(max(1, args.rows), args.seed)
+
+
+if __name__ == "__main__":
+    main()
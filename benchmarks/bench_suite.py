@@ -0,0 +1,185 @@
+"""Scaling benchmark for ``sales_analysis``: parse throughput, peak RSS and per-function latency.
+
+Each size runs in a fresh process on a deterministic synthetic CSV (see
+``src/sales_analysis/synthetic.py``), so the peak RSS figure belongs to that size alone.
+Run from the project root::
+
+    python -m benchmarks.bench_suite --rows 10000 100000 1000000
+    python -m benchmarks.bench_suite --rows 10000 100000 --save-baseline
+    python -m benchmarks.bench_suite --rows 10000 100000 --compare
+
+``--compare`` exits with status 1 when any timing or the peak RSS is worse than the
+stored baseline by more than ``--threshold`` (timings under ``--noise-floor`` seconds
+are reported but never flagged).  Baselines are machine-specific; regenerate them on
+the machine that runs the comparison.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.sales_analysis import analytics
+from src.sales_analysis.reader import read_sales_csv, read_sales_table
+from src.sales_analysis.report import build_report
+from src.sales_analysis.synthetic import write_synthetic_csv
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / "sales_analysis_bench"
+
+ANALYTICS: Dict[str, Callable[[Any], object]] = {
+    "total_sales": analytics.total_sales,
+    "total_quantity_sold": analytics.total_quantity_sold,
+    "average_discount": analytics.average_discount,
+    "average_profit": analytics.average_profit,
+    "sales_by_region": analytics.sales_by_region,
+    "sales_by_category": analytics.sales_by_category,
+    "sales_by_segment": analytics.sales_by_segment,
+    "sales_by_state": analytics.sales_by_state,
+    "top_n_products_by_sales": lambda data: analytics.top_n_products_by_sales(data, 5),
+    "top_n_customers_by_sales": lambda data: analytics.top_n_customers_by_sales(data, 5),
+    "top_n_states_by_sales": lambda data: analytics.top_n_states_by_sales(data, 5),
+    "top_n_sub_categories_by_sales": lambda data: analytics.top_n_sub_categories_by_sales(data, 5),
+    "monthly_sales": analytics.monthly_sales,
+    "build_report": build_report,
+}
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _best_of(repeat: int, action: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def dataset(rows: int, seed: int, data_dir: Path) -> Path:
+    """Return the cached synthetic CSV for ``rows``/``seed``, generating it on first use."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    path = data_dir / f"synthetic_{rows}_{seed}.csv"
+    if not path.exists():
+        partial = path.with_suffix(".tmp")
+        write_synthetic_csv(partial, rows, seed=seed)
+        partial.replace(path)
+    return path
+
+
+def measure(path: str, rows: int, repeat: int) -> Dict[str, Any]:
+    """Benchmark one CSV; runs inside a fresh worker process."""
+    parse = {}
+    for name, reader in (("read_sales_csv", read_sales_csv), ("read_sales_table", read_sales_table)):
+        seconds = _best_of(repeat, lambda: reader(path))
+        parse[name] = {"seconds": seconds, "rows_per_sec": rows / seconds if seconds else None}
+    records = read_sales_csv(path)
+    table = read_sales_table(path)
+    latency = {}
+    for label, data in (("records", records), ("table", table)):
+        for name, function in ANALYTICS.items():
+            latency[f"{label}.{name}"] = _best_of(repeat, lambda: function(data))
+    return {"rows": rows, "parse": parse, "latency": latency, "peak_rss_bytes": _peak_rss_bytes()}
+
+
+def run(sizes: Sequence[int], *, seed: int, repeat: int, data_dir: Path) -> Dict[str, Any]:
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for rows in sizes:
+        path = dataset(rows, seed, data_dir)
+        with context.Pool(1) as pool:
+            result = pool.apply(measure, (str(path), rows, repeat))
+        results[str(rows)] = result
+        _print_size(result)
+    return {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(), "seed": seed},
+        "results": results,
+    }
+
+
+def _print_size(result: Dict[str, Any]) -> None:
+    rows = result["rows"]
+    rss = result["peak_rss_bytes"]
+    print(f"== {rows:,} rows  (peak RSS {rss / 2**20:,.1f} MiB)" if rss else f"== {rows:,} rows")
+    for name, stats in result["parse"].items():
+        print(f"  parse  {name:<34} {stats['seconds'] * 1000:10.1f} ms  {stats['rows_per_sec']:14,.0f} rows/s")
+    for name, seconds in result["latency"].items():
+        print(f"  call   {name:<34} {seconds * 1000:10.2f} ms")
+
+
+def _metrics(result: Dict[str, Any]) -> Dict[str, float]:
+    metrics = {f"parse.{name}": stats["seconds"] for name, stats in result["parse"].items()}
+    metrics.update(result["latency"])
+    return metrics
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], *, threshold: float, noise_floor: float) -> List[str]:
+    """Return a description of every metric that regressed beyond ``threshold``."""
+    regressions = []
+    for size, result in current["results"].items():
+        base = baseline.get("results", {}).get(size)
+        if base is None:
+            continue
+        old_metrics = _metrics(base)
+        for name, seconds in _metrics(result).items():
+            old = old_metrics.get(name)
+            if old is None or max(old, seconds) < noise_floor:
+                continue
+            if seconds > old * (1 + threshold):
+                regressions.append(f"{size} rows: {name} {old * 1000:.2f} ms -> {seconds * 1000:.2f} ms")
+        old_rss, rss = base.get("peak_rss_bytes"), result.get("peak_rss_bytes")
+        if old_rss and rss and rss > old_rss * (1 + threshold):
+            regressions.append(f"{size} rows: peak RSS {old_rss / 2**20:.1f} MiB -> {rss / 2**20:.1f} MiB")
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark sales_analysis at several dataset sizes")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000], help="dataset sizes to run")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic data seed")
+    parser.add_argument("--repeat", type=int, default=3, help="timings keep the best of N runs")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help="where synthetic CSVs are cached")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline JSON location")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="flag regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before flagging (0.25 = 25%%)")
+    parser.add_argument("--noise-floor", type=float, default=0.01, help="ignore timings below this many seconds")
+    parser.add_argument("--output", type=Path, default=None, help="also write this run's JSON here")
+    args = parser.parse_args(argv)
+
+    current = run(args.rows, seed=args.seed, repeat=max(1, args.repeat), data_dir=args.data_dir)
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline written to {args.baseline}")
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(current, baseline, threshold=args.threshold, noise_floor=args.noise_floor)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,16 +8,73 @@ from .analytics import (
     sales_by_region,
     sales_by_segment,
     sales_by_state,
+    top_n_customers_by_sales,
     top_n_products_by_sales,
+    top_n_states_by_sales,
+    top_n_sub_categories_by_sales,
     total_quantity_sold,
     total_sales,
 )
+from .cache import CachedAnalytics, CacheStats, ResultCache, dataset_fingerprint
+from .compression import detect_codec, open_text
+from .cube import CubeTotals, SalesCube
+from .dataset import DatasetFile, SalesDataset
+from .date_index import DateIndex, RangeTotals
+from .groupby import group_by
 from .models import SaleRecord
-from .reader import read_sales_csv
+from .parallel import read_sales_table_parallel
+from .partials import PartialState, merge_partials
+from .pipeline import PipelineResult, run_pipeline
+from .profiling import Profiler, profiling
+from .reader import iter_sales_csv, read_sales_csv, read_sales_table
+from .report import SalesAggregator, SalesReport, build_report
+from .sections import compute_sections, report_sections, required_columns
+from .server import SalesServer
+from .sketches import ApproximateSummary, HyperLogLog, KLLSketch, SketchAggregator
+from .table import CategoricalColumn, SalesTable
+from .timeseries import TimeSeries, time_series
+from .topn import HeavyHitter, SpaceSaving
 
 __all__ = [
     "SaleRecord",
+    "SalesTable",
+    "CategoricalColumn",
     "read_sales_csv",
+    "iter_sales_csv",
+    "read_sales_table",
+    "read_sales_table_parallel",
+    "open_text",
+    "detect_codec",
+    "run_pipeline",
+    "PipelineResult",
+    "Profiler",
+    "profiling",
+    "SalesDataset",
+    "DatasetFile",
+    "DateIndex",
+    "RangeTotals",
+    "SalesServer",
+    "SalesReport",
+    "SalesAggregator",
+    "PartialState",
+    "merge_partials",
+    "build_report",
+    "compute_sections",
+    "report_sections",
+    "required_columns",
+    "SalesCube",
+    "ResultCache",
+    "CachedAnalytics",
+    "CacheStats",
+    "dataset_fingerprint",
+    "CubeTotals",
+    "group_by",
+    "SpaceSaving",
+    "HeavyHitter",
+    "HyperLogLog",
+    "KLLSketch",
+    "SketchAggregator",
+    "ApproximateSummary",
     "total_sales",
     "total_quantity_sold",
     "average_discount",
@@ -27,6 +84,11 @@ __all__ = [
     "sales_by_segment",
     "sales_by_state",
     "top_n_products_by_sales",
+    "top_n_customers_by_sales",
+    "top_n_states_by_sales",
+    "top_n_sub_categories_by_sales",
     "monthly_sales",
+    "time_series",
+    "TimeSeries",
 ]
 
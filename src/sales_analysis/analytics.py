@@ -1,87 +1,128 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from itertools import groupby
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Sequence, Tuple
 
+from .groupby import group_by, sum_by
 from .models import SaleRecord
+from .profiling import profiled
+from .table import SalesTable
+from .timeseries import time_series
+from .topn import nlargest_totals, top_n_by
 
 
+def _mean(column: Sequence[float]) -> float:
+    return sum(column) / len(column) if len(column) else 0.0
+
+
+def _running_mean(values: Iterable[float]) -> float:
+    """Single-pass mean that never materializes ``values``."""
+    total = 0.0
+    count = 0
+    for value in values:
+        total += value
+        count += 1
+    return total / count if count else 0.0
+
+
+@profiled("analytics.total_sales")
 def total_sales(records: Iterable[SaleRecord]) -> float:
     """Return the total sales revenue."""
+    if isinstance(records, SalesTable):
+        return sum(records.sales)
     return sum(record.sales for record in records)
 
 
+@profiled("analytics.total_quantity_sold")
 def total_quantity_sold(records: Iterable[SaleRecord]) -> int:
     """Return the total quantity sold."""
+    if isinstance(records, SalesTable):
+        return sum(records.quantity)
     return sum(record.quantity for record in records)
 
 
+@profiled("analytics.average_discount")
 def average_discount(records: Iterable[SaleRecord]) -> float:
     """Return the mean discount across all records."""
-    discounts = [record.discount for record in records]
-    return sum(discounts) / len(discounts) if discounts else 0.0
+    if isinstance(records, SalesTable):
+        return _mean(records.discount)
+    return _running_mean(record.discount for record in records)
 
 
+@profiled("analytics.average_profit")
 def average_profit(records: Iterable[SaleRecord]) -> float:
     """Return the mean profit across all records."""
-    profits = [record.profit for record in records]
-    return sum(profits) / len(profits) if profits else 0.0
+    if isinstance(records, SalesTable):
+        return _mean(records.profit)
+    return _running_mean(record.profit for record in records)
 
 
+@profiled("analytics.sales_by_region")
 def sales_by_region(records: Iterable[SaleRecord]) -> Dict[str, float]:
     """Aggregate sales revenue per region."""
-    totals: Dict[str, float] = defaultdict(float)
-    for record in records:
-        totals[record.region] += record.sales
-    return dict(totals)
+    return sum_by(records, "region")
 
 
+@profiled("analytics.sales_by_category")
 def sales_by_category(records: Iterable[SaleRecord]) -> Dict[str, float]:
     """Aggregate sales revenue per product category."""
-    totals: Dict[str, float] = defaultdict(float)
-    for record in records:
-        totals[record.category] += record.sales
-    return dict(totals)
+    return sum_by(records, "category")
 
 
+@profiled("analytics.sales_by_segment")
 def sales_by_segment(records: Iterable[SaleRecord]) -> Dict[str, float]:
     """Aggregate sales revenue per customer segment."""
-    totals: Dict[str, float] = defaultdict(float)
-    for record in records:
-        totals[record.segment] += record.sales
-    return dict(totals)
+    return sum_by(records, "segment")
 
 
+@profiled("analytics.sales_by_state")
 def sales_by_state(records: Iterable[SaleRecord]) -> Dict[str, float]:
     """Aggregate sales revenue per state."""
-    totals: Dict[str, float] = defaultdict(float)
-    for record in records:
-        totals[record.state] += record.sales
-    return dict(totals)
+    return sum_by(records, "state")
 
 
+@profiled("analytics.top_n_products_by_sales")
 def top_n_products_by_sales(records: Iterable[SaleRecord], n: int) -> List[Tuple[str, float]]:
     """Return the top N products ranked by sales."""
+    return top_n_by(records, "product_name", n)
+
+
+@profiled("analytics.top_n_customers_by_sales")
+def top_n_customers_by_sales(records: Iterable[SaleRecord], n: int) -> List[Tuple[str, float]]:
+    """Return the top N customers ranked by sales, labelled with their names.
+
+    Sales are totalled per ``customer_id``, so customers who share a name are ranked
+    separately; each is shown under the first name seen for its ID.
+    """
     if n <= 0:
         return []
-    totals = defaultdict(float)
-    for record in records:
-        totals[record.product_name] += record.sales
-    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
-    return ranked[:n]
+    totals: Dict[str, float] = {}
+    names: Dict[str, str] = {}
+    grouped = group_by(records, ["customer_id", "customer_name"], {"sales": ("sales", "sum")})
+    for (customer_id, name), row in grouped.items():
+        totals[customer_id] = totals.get(customer_id, 0.0) + row["sales"]
+        names.setdefault(customer_id, name)
+    return [(names[customer_id], total) for customer_id, total in nlargest_totals(totals, n)]
 
 
-def monthly_sales(records: Iterable[SaleRecord]) -> Dict[str, float]:
-    """Return sales aggregated per calendar month (YYYY-MM)."""
-    dated_records = [rec for rec in records if rec.order_date is not None]
-    sorted_records = sorted(dated_records, key=lambda rec: rec.order_date)  # type: ignore[arg-type]
-    monthly_totals = (
-        (month, sum(entry.sales for entry in group))
-        for month, group in groupby(
-            sorted_records,
-            key=lambda rec: rec.order_date.strftime("%Y-%m")  # type: ignore[union-attr]
-        )
-    )
-    return dict(monthly_totals)
+@profiled("analytics.top_n_states_by_sales")
+def top_n_states_by_sales(records: Iterable[SaleRecord], n: int) -> List[Tuple[str, float]]:
+    """Return the top N states ranked by sales."""
+    return top_n_by(records, "state", n)
+
 
+@profiled("analytics.top_n_sub_categories_by_sales")
+def top_n_sub_categories_by_sales(records: Iterable[SaleRecord], n: int) -> List[Tuple[str, float]]:
+    """Return the top N product sub-categories ranked by sales."""
+    return top_n_by(records, "sub_category", n)
+
+
+@profiled("analytics.monthly_sales")
+def monthly_sales(records: Iterable[SaleRecord]) -> Dict[str, float]:
+    """Return sales aggregated per calendar month (YYYY-MM).
+
+    A thin wrapper over :func:`time_series`, which also offers other periods, metrics,
+    rolling windows and year-over-year changes.  Each month is summed in row order
+    rather than after sorting by date, so totals can differ from a date-sorted sum in
+    the last floating-point digits.
+    """
+    return time_series(records, "month", "sales").to_dict()
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, Union
+
+from .dataset import SalesDataset
+from .filters import SalesFilter
+from .report import SalesReport, build_report
+from .table import SalesTable
+
+PathLike = Union[str, Path]
+T = TypeVar("T")
+
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".result"
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_DISK_BYTES = 64 * 2**20
+
+_MISSING = object()
+
+
+def dataset_fingerprint(source: PathLike) -> str:
+    """Identify the current contents of a CSV file, directory or glob without reading it.
+
+    Built from each file's resolved path, size and modification time (the key used by
+    the ``.stats`` sidecars), so any rewrite or append produces a new fingerprint.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for item in SalesDataset.discover(source).files:
+        stat = item.path.stat()
+        digest.update(f"{item.path.resolve()}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _canonical(value: Any) -> Any:
+    """JSON-ready form of a parameter that is identical across processes."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(_canonical(item) for item in value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if is_dataclass(value):
+        return {item.name: _canonical(getattr(value, item.name)) for item in fields(value)}
+    return repr(value)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Counters of one :class:`ResultCache` since it was created."""
+
+    hits: int
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResultCache:
+    """Two-tier memo table for analytics results.
+
+    The memory tier is an LRU of at most ``max_entries`` values.  With ``directory`` set,
+    results are also pickled there (one file per key, written atomically) and the least
+    recently used files are deleted once they exceed ``max_disk_bytes`` in total, so
+    separate processes share results.  Only point ``directory`` at a location you trust:
+    entries are unpickled on read.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        directory: Optional[PathLike] = None,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+    ) -> None:
+        if max_entries < 0 or max_disk_bytes < 0:
+            raise ValueError("max_entries and max_disk_bytes must be non-negative")
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory is not None else None
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._memory_hits = self._disk_hits = self._misses = self._evictions = 0
+
+    @staticmethod
+    def key(fingerprint: str, function: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Stable key of one call: dataset fingerprint, function name and parameters."""
+        payload = json.dumps([CACHE_VERSION, fingerprint, function, _canonical(params or {})], sort_keys=True)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=20).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}{CACHE_SUFFIX}"
+
+    def _remember(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self._evictions += 1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for ``key`` (memory first, then disk) or ``default``."""
+        with self._lock:
+            value = self._memory.get(key, _MISSING)
+            if value is not _MISSING:
+                self._memory.move_to_end(key)
+                self._hits += 1
+                self._memory_hits += 1
+                return value
+        value = self._read_disk(key)
+        if value is _MISSING:
+            with self._lock:
+                self._misses += 1
+            return default
+        with self._lock:
+            self._hits += 1
+            self._disk_hits += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self._remember(key, value)
+        if self.directory is not None:
+            self._write_disk(key, value)
+
+    def get_or_compute(
+        self, fingerprint: str, function: str, params: Optional[Dict[str, Any]], compute: Callable[[], T]
+    ) -> T:
+        """Return the cached result of ``function(params)`` on ``fingerprint``, computing it on a miss."""
+        key = self.key(fingerprint, function, params)
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _read_disk(self, key: str) -> Any:
+        if self.directory is None:
+            return _MISSING
+        path = self._path(key)
+        try:
+            with path.open("rb") as handle:
+                value = pickle.load(handle)
+            os.utime(path)  # mtime doubles as the disk tier's recency
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return _MISSING
+        return value
+
+    def _write_disk(self, key: str, value: Any) -> None:
+        assert self.directory is not None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            target = self._path(key)
+            handle, temp_name = tempfile.mkstemp(dir=self.directory, prefix=target.name, suffix=".tmp")
+            try:
+                with os.fdopen(handle, "wb") as out:
+                    pickle.dump(value, out, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_name, target)
+            except BaseException:
+                Path(temp_name).unlink(missing_ok=True)
+                raise
+            self._trim_disk()
+        except OSError:
+            pass  # the disk tier is best effort, like the other sidecar caches
+
+    def _trim_disk(self) -> None:
+        assert self.directory is not None
+        entries = []
+        for path in self.directory.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            with self._lock:
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers (counters are kept)."""
+        with self._lock:
+            self._memory.clear()
+        if self.directory is not None and self.directory.is_dir():
+            for path in self.directory.glob(f"*{CACHE_SUFFIX}"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                memory_hits=self._memory_hits,
+                disk_hits=self._disk_hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._memory),
+            )
+
+
+class CachedAnalytics:
+    """Memoized analytics over one CSV file, directory or glob.
+
+    ``queries(sales_by_region)`` or ``queries(top_n_products_by_sales, 5)`` returns the
+    cached result when the dataset is unchanged; the data itself is only read (as a
+    ``SalesTable`` restricted by ``where``) on the first miss and is re-read when the
+    source's fingerprint changes.  Results are keyed by the function's module and
+    qualified name.  Lambdas and nested functions share names, so they are keyed by object
+    identity instead.  They are kept alive for the cache's lifetime so the identity is not
+    reused, and they cannot use a disk tier.
+    """
+
+    def __init__(
+        self, source: PathLike, *, cache: Optional[ResultCache] = None, where: Optional[SalesFilter] = None
+    ) -> None:
+        self.source = source
+        self.cache = cache if cache is not None else ResultCache()
+        self.where = where
+        self._loaded: Optional[Tuple[str, SalesTable]] = None
+        self._pinned: Dict[int, Callable[..., Any]] = {}
+
+    def fingerprint(self) -> str:
+        return dataset_fingerprint(self.source)
+
+    def table(self, fingerprint: Optional[str] = None) -> SalesTable:
+        fingerprint = fingerprint or self.fingerprint()
+        if self._loaded is None or self._loaded[0] != fingerprint:
+            self._loaded = (fingerprint, SalesDataset.discover(self.source).read_table(where=self.where))
+        return self._loaded[1]
+
+    def __call__(self, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        qualname = getattr(function, "__qualname__", "<callable>")
+        name = f"{getattr(function, '__module__', None)}.{qualname}"
+        if "<" in qualname:  # ``<lambda>``, ``outer.<locals>.inner`` or an unnamed callable
+            if self.cache.directory is not None:
+                raise ValueError(f"{name} has no stable name for the disk cache; define it at module level")
+            self._pinned.setdefault(id(function), function)
+            name = f"{name}#{id(function)}"
+        fingerprint = self.fingerprint()
+        params = {"where": self.where, "args": args, "kwargs": kwargs}
+        return self.cache.get_or_compute(
+            fingerprint, name, params, lambda: function(self.table(fingerprint), *args, **kwargs)
+        )
+
+    def report(self, *, top_n: int = 5, top_capacity: Optional[int] = None, approximate: bool = False) -> SalesReport:
+        """Cached :func:`build_report` over the dataset."""
+        return self(build_report, top_n=top_n, top_capacity=top_capacity, approximate=approximate)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Event, Thread
+from typing import BinaryIO, Callable, Optional, TextIO, Tuple, Union
+
+from ..producer_consumer import BoundedBuffer
+
+PathLike = Union[str, Path]
+
+DECOMPRESS_CHUNK = 1 << 20
+DEFAULT_READ_AHEAD = 4
+
+
+@dataclass(frozen=True)
+class Codec:
+    """One supported compression format: file suffixes, magic bytes and opener."""
+
+    name: str
+    suffixes: Tuple[str, ...]
+    magic: bytes
+    open: Callable[[str], BinaryIO]
+
+
+CODECS = (
+    Codec("gzip", (".gz", ".gzip"), b"\x1f\x8b", lambda path: gzip.open(path, "rb")),  # type: ignore[arg-type,return-value]
+    Codec("bz2", (".bz2",), b"BZh", lambda path: bz2.open(path, "rb")),  # type: ignore[arg-type,return-value]
+    Codec("xz", (".xz", ".lzma"), b"\xfd7zXZ\x00", lambda path: lzma.open(path, "rb")),  # type: ignore[arg-type,return-value]
+)
+COMPRESSED_SUFFIXES = tuple(suffix for codec in CODECS for suffix in codec.suffixes)
+_MAGIC_BYTES = max(len(codec.magic) for codec in CODECS)
+
+
+def detect_codec(path: PathLike) -> Optional[Codec]:
+    """Codec of ``path`` from its suffix, else from its leading magic bytes; ``None`` for plain text."""
+    suffix = Path(path).suffix.lower()
+    for codec in CODECS:
+        if suffix in codec.suffixes:
+            return codec
+    try:
+        with open(path, "rb") as handle:
+            head = handle.read(_MAGIC_BYTES)
+    except OSError:
+        return None
+    for codec in CODECS:
+        if head.startswith(codec.magic):
+            return codec
+    return None
+
+
+class _ReadAhead(io.RawIOBase):
+    """Raw byte stream decompressed ahead of its reader by a daemon thread.
+
+    The thread pulls ``DECOMPRESS_CHUNK`` bytes at a time from ``source`` into a
+    :class:`BoundedBuffer` of ``read_ahead`` chunks.  zlib, bz2 and lzma release the GIL
+    while they work, so decompression overlaps with CSV parsing and the slower of the
+    two sets the throughput.  A decompression error is re-raised in the reader.
+    """
+
+    def __init__(self, source: BinaryIO, read_ahead: int = DEFAULT_READ_AHEAD) -> None:
+        super().__init__()
+        self._source = source
+        self._chunks: BoundedBuffer[object] = BoundedBuffer(read_ahead)
+        self._pending = memoryview(b"")
+        self._finished = False
+        self._stop = Event()
+        self._thread = Thread(target=self._fill, name="sales-decompress", daemon=True)
+        self._thread.start()
+
+    def _fill(self) -> None:
+        try:
+            while not self._stop.is_set():
+                chunk = self._source.read(DECOMPRESS_CHUNK)
+                self._chunks.put(chunk)  # ``b""`` marks the end of the stream
+                if not chunk:
+                    return
+        except Exception as error:
+            self._chunks.put(error)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:  # type: ignore[override]
+        while not self._pending:
+            if self._finished:
+                return 0
+            item = self._chunks.get()
+            if isinstance(item, Exception):
+                self._finished = True
+                raise item
+            if not item:
+                self._finished = True
+                return 0
+            self._pending = memoryview(item)  # type: ignore[arg-type]
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            # Drain so a thread blocked on a full buffer can see the stop flag and exit.
+            while self._thread.is_alive():
+                if self._chunks.current_size():
+                    self._chunks.get()
+                else:
+                    self._thread.join(0.01)
+            self._source.close()
+        super().close()
+
+
+def open_text(path: PathLike, *, threaded: Optional[bool] = None) -> TextIO:
+    """Open a plain, gzip, bz2 or xz CSV file as UTF-8 text for ``csv.reader``.
+
+    Compressed files are decompressed while they are read, never to disk.  With
+    ``threaded`` that happens on a separate thread, ahead of the caller; by default only
+    when more than one CPU is available, since on one core the thread cannot overlap
+    with parsing and only adds hand-off cost.
+    """
+    codec = detect_codec(path)
+    if codec is None:
+        return Path(path).open(newline="", encoding="utf-8")
+    if threaded is None:
+        threaded = (os.cpu_count() or 1) > 1
+    source = codec.open(str(path))
+    stream: BinaryIO = io.BufferedReader(_ReadAhead(source)) if threaded else source  # type: ignore[assignment]
+    return io.TextIOWrapper(stream, encoding="utf-8", newline="")
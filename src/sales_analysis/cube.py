@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Collection, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .models import SaleRecord
+from .table import MISSING_DAY, SalesTable, day_to_month
+
+DIMENSIONS = ("month", "region", "category", "segment", "state")
+
+CellKey = Tuple[Optional[str], ...]
+Selector = Union[str, Collection[str]]
+
+# Per-cell accumulator layout.
+_SALES, _QUANTITY, _PROFIT, _DISCOUNT, _COUNT = range(5)
+
+
+@dataclass(frozen=True)
+class CubeTotals:
+    """Measures summed over one cube cell or over a group of cells."""
+
+    sales: float
+    quantity: int
+    profit: float
+    discount: float
+    count: int
+
+    @property
+    def average_discount(self) -> float:
+        return self.discount / self.count if self.count else 0.0
+
+    @property
+    def average_profit(self) -> float:
+        return self.profit / self.count if self.count else 0.0
+
+
+def _position(dimension: str) -> int:
+    try:
+        return DIMENSIONS.index(dimension)
+    except ValueError:
+        raise ValueError(f"Unknown cube dimension: {dimension!r} (expected one of {DIMENSIONS})") from None
+
+
+class SalesCube:
+    """Pre-aggregated month × region × category × segment × state cube.
+
+    Each populated cell stores the sum of sales, quantity, profit and discount plus a row
+    count, so any group-by or filter over these dimensions is answered in time
+    proportional to the number of cells instead of the number of rows.  Rows without an
+    order date land in cells whose month is ``None``.  Sums are accumulated per cell and
+    then per group, so they can differ from a row-order sum in the last floating-point
+    digits.
+    """
+
+    def __init__(self, cells: Optional[Dict[CellKey, List[float]]] = None) -> None:
+        self._cells: Dict[CellKey, List[float]] = cells if cells is not None else {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[SaleRecord]) -> SalesCube:
+        """Build the cube in one pass over ``records`` (or a ``SalesTable``)."""
+        if isinstance(records, SalesTable):
+            return cls._from_table(records)
+        cells: Dict[CellKey, List[float]] = {}
+        month_keys: Dict[object, Optional[str]] = {None: None}
+        for record in records:
+            order_date = record.order_date
+            month = month_keys.get(order_date)
+            if month is None and order_date is not None:
+                month = month_keys[order_date] = order_date.strftime("%Y-%m")
+            key = (month, record.region, record.category, record.segment, record.state)
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = [0.0, 0, 0.0, 0.0, 0]
+            cell[_SALES] += record.sales
+            cell[_QUANTITY] += record.quantity
+            cell[_PROFIT] += record.profit
+            cell[_DISCOUNT] += record.discount
+            cell[_COUNT] += 1
+        return cls(cells)
+
+    @classmethod
+    def _from_table(cls, table: SalesTable) -> SalesCube:
+        columns = [table.categorical(name) for name in DIMENSIONS[1:]]
+        coded: Dict[Tuple[int, ...], List[float]] = {}
+        for day, region, category, segment, state, sales, quantity, profit, discount in zip(
+            table.order_day,
+            *(column.codes for column in columns),
+            table.sales,
+            table.quantity,
+            table.profit,
+            table.discount,
+        ):
+            key = (day, region, category, segment, state)
+            cell = coded.get(key)
+            if cell is None:
+                cell = coded[key] = [0.0, 0, 0.0, 0.0, 0]
+            cell[_SALES] += sales
+            cell[_QUANTITY] += quantity
+            cell[_PROFIT] += profit
+            cell[_DISCOUNT] += discount
+            cell[_COUNT] += 1
+        # Days are folded into months here, once per distinct coded cell.
+        cells: Dict[CellKey, List[float]] = {}
+        labels = [column.values for column in columns]
+        for (day, *codes), coded_cell in coded.items():
+            month = day_to_month(day) if day != MISSING_DAY else None
+            key = (month, *(values[code] for values, code in zip(labels, codes)))
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = coded_cell
+            else:
+                for index, value in enumerate(coded_cell):
+                    cell[index] += value
+        return cls(cells)
+
+    def __len__(self) -> int:
+        """Number of populated cells."""
+        return len(self._cells)
+
+    def query(
+        self,
+        group_by: Sequence[str] = (),
+        where: Optional[Mapping[str, Selector]] = None,
+    ) -> Dict[CellKey, CubeTotals]:
+        """Group the (optionally filtered) cells by ``group_by`` dimensions.
+
+        ``where`` maps a dimension to one allowed value or a collection of them.  Keys of
+        the result are tuples ordered like ``group_by`` (the empty tuple when not grouping),
+        in first-seen order.
+        """
+        positions = [_position(dimension) for dimension in group_by]
+        filters = [
+            (_position(dimension), {allowed} if isinstance(allowed, str) else set(allowed))
+            for dimension, allowed in (where or {}).items()
+        ]
+        groups: Dict[CellKey, List[float]] = {}
+        for key, cell in self._cells.items():
+            if any(key[position] not in allowed for position, allowed in filters):
+                continue
+            group = tuple(key[position] for position in positions)
+            totals = groups.get(group)
+            if totals is None:
+                groups[group] = list(cell)
+            else:
+                for index, value in enumerate(cell):
+                    totals[index] += value
+        return {group: CubeTotals(*totals) for group, totals in groups.items()}  # type: ignore[arg-type]
+
+    def totals(self, where: Optional[Mapping[str, Selector]] = None) -> CubeTotals:
+        """Return the measures summed over the whole (filtered) cube."""
+        return self.query((), where).get((), CubeTotals(0.0, 0, 0.0, 0.0, 0))
+
+    def sales_by(self, dimension: str, where: Optional[Mapping[str, Selector]] = None) -> Dict[Optional[str], float]:
+        """Sales per value of one dimension, e.g. ``sales_by("region", {"month": "2024-03"})``."""
+        return {key[0]: totals.sales for key, totals in self.query((dimension,), where).items()}
+
+    def monthly_sales(self, where: Optional[Mapping[str, Selector]] = None) -> Dict[str, float]:
+        """Sales per ``YYYY-MM`` month in calendar order, skipping undated rows."""
+        by_month = self.sales_by("month", where)
+        return {month: by_month[month] for month in sorted(key for key in by_month if key is not None)}
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import csv
+import glob
+import json
+import os
+import re
+import tempfile
+from calendar import monthrange
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import date
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .compression import COMPRESSED_SUFFIXES, open_text
+from .decoding import DateDecoder
+from .filters import SalesFilter
+from .models import SaleRecord
+from .reader import BOM, PathLike, iter_sales_csv, project_columns, read_sales_table
+from .table import SalesTable
+
+# Plain and compressed CSV partitions picked up from a directory.
+CSV_PATTERNS = ("*.csv", *(f"*.csv{suffix}" for suffix in COMPRESSED_SUFFIXES))
+STATS_SUFFIX = ".stats"
+STATS_VERSION = 1
+# ``2024``, ``2024-03``, ``2024_03_15`` ... anywhere in a file stem, not inside a longer number.
+_PARTITION = re.compile(r"(?<!\d)((?:19|20)\d{2})(?:[-_]?(0[1-9]|1[0-2]))?(?:[-_]?(0[1-9]|[12]\d|3[01]))?(?!\d)")
+
+Bounds = Tuple[Optional[date], Optional[date]]
+
+
+def _one_copy_per_csv(paths: Sequence[Path]) -> List[Path]:
+    """Drop compressed copies of a CSV that is also present (``x.csv.gz`` next to ``x.csv``).
+
+    Without a plain file, the first codec in ``COMPRESSED_SUFFIXES`` order is kept, so the
+    same rows are never read twice.
+    """
+
+    def base_and_rank(path: Path) -> Tuple[Path, int]:
+        suffix = path.suffix.lower()
+        if suffix in COMPRESSED_SUFFIXES:
+            return path.with_suffix(""), COMPRESSED_SUFFIXES.index(suffix) + 1
+        return path, 0
+
+    chosen: Dict[Path, Tuple[int, Path]] = {}
+    for path in paths:
+        base, rank = base_and_rank(path)
+        if base not in chosen or rank < chosen[base][0]:
+            chosen[base] = (rank, path)
+    kept = {path for _, path in chosen.values()}
+    return [path for path in paths if path in kept]
+
+
+def stats_path(csv_path: PathLike) -> Path:
+    """Return the per-file statistics sidecar location (stored next to the CSV)."""
+    path = Path(csv_path)
+    return path.with_name(path.name + STATS_SUFFIX)
+
+
+def partition_bounds(path: PathLike) -> Optional[Bounds]:
+    """Order-date range implied by a year/month/day in the file name, if any."""
+    match = _PARTITION.search(Path(path).stem)
+    if match is None:
+        return None
+    year, month, day = (int(part) if part else None for part in match.groups())
+    if month is None:
+        return date(year, 1, 1), date(year, 12, 31)  # type: ignore[arg-type]
+    if day is None:
+        return date(year, month, 1), date(year, month, monthrange(year, month)[1])  # type: ignore[arg-type]
+    try:
+        single = date(year, month, day)  # type: ignore[arg-type]
+    except ValueError:
+        return None
+    return single, single
+
+
+def _scan_bounds(csv_path: Path) -> Bounds:
+    """Min/max ``Order Date`` of one file, decoding only that column."""
+    decoder = DateDecoder()
+    first: Optional[date] = None
+    last: Optional[date] = None
+    with open_text(csv_path) as handle:
+        reader = csv.reader(handle)
+        header = [field.lstrip(BOM) for field in next(reader, [])]
+        if "Order Date" not in header:
+            return None, None
+        position = header.index("Order Date")
+        for row in reader:
+            if len(row) <= position:
+                continue
+            value = decoder(row[position])
+            if value is None:
+                continue
+            if first is None or value < first:
+                first = value
+            if last is None or value > last:
+                last = value
+    return first, last
+
+
+def file_stats(csv_path: PathLike) -> Bounds:
+    """Min/max order date of ``csv_path``, cached in a sidecar keyed by size and mtime.
+
+    Both bounds are ``None`` when the file has no dated rows.  The sidecar is rewritten
+    atomically whenever the CSV changes; failing to write it is not an error.
+    """
+    source = Path(csv_path)
+    stat = source.stat()
+    key = {"version": STATS_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    target = stats_path(source)
+    try:
+        cached = json.loads(target.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cached = None
+    if cached is not None and all(cached.get(name) == value for name, value in key.items()):
+        return tuple(  # type: ignore[return-value]
+            date.fromisoformat(value) if value else None for value in cached["order_date"]
+        )
+    bounds = _scan_bounds(source)
+    payload: Dict[str, Any] = {**key, "order_date": [value.isoformat() if value else None for value in bounds]}
+    try:
+        handle, temp_name = tempfile.mkstemp(dir=target.parent, prefix=target.name, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as out:
+                json.dump(payload, out)
+            os.replace(temp_name, target)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+    except OSError:
+        pass
+    return bounds
+
+
+@dataclass(frozen=True)
+class DatasetFile:
+    """One CSV partition and its order-date bounds (``None`` until learned)."""
+
+    path: Path
+    bounds: Optional[Bounds] = None
+
+    def with_bounds(self) -> DatasetFile:
+        """Return this file with bounds filled in from the per-file statistics."""
+        return self if self.bounds is not None else replace(self, bounds=file_stats(self.path))
+
+    def may_match(self, where: SalesFilter) -> bool:
+        """``False`` only when no row of this file can satisfy ``where``'s date range."""
+        if where.start is None and where.end is None:
+            return True
+        first, last = self.with_bounds().bounds  # type: ignore[misc]
+        if first is None or last is None:
+            return False  # no dated rows, and a date bound never matches undated rows
+        return (where.end is None or first <= where.end) and (where.start is None or last >= where.start)
+
+
+def _read_partition(
+    path: str, where: Optional[SalesFilter], snapshot: bool, columns: Optional[Sequence[str]] = None
+) -> SalesTable:
+    """Worker entry point: load one partition as a ``SalesTable``."""
+    return read_sales_table(path, snapshot=snapshot, where=where, columns=columns)
+
+
+class SalesDataset:
+    """A set of CSV partitions read as one logical table.
+
+    Partitions come from a directory, a glob pattern or a single file.  Each file's
+    order-date range is taken from a year/month/day in its name (e.g.
+    ``sales_2024-03.csv``) when present, otherwise from min/max statistics gathered on
+    first use.  Files whose range cannot overlap a filter's dates are never opened.
+    """
+
+    def __init__(self, files: Sequence[DatasetFile]) -> None:
+        self.files = list(files)
+
+    @classmethod
+    def discover(cls, source: PathLike, *, pattern: Union[str, Sequence[str]] = CSV_PATTERNS) -> SalesDataset:
+        """Collect partitions from a directory (matching ``pattern``), a glob or a file.
+
+        By default a directory contributes its ``.csv`` files and their ``.gz``, ``.bz2``
+        and ``.xz`` compressed counterparts.  When one CSV is present both plain and
+        compressed, only the plain file is used.
+        """
+        text = str(source)
+        path = Path(source)
+        if path.is_dir():
+            patterns = (pattern,) if isinstance(pattern, str) else pattern
+            paths = sorted({match for item in patterns for match in path.glob(item)})
+        elif glob.has_magic(text):
+            paths = sorted(Path(match) for match in glob.glob(text))
+        else:
+            paths = [path]
+        paths = _one_copy_per_csv([item for item in paths if not item.is_dir()])
+        return cls([DatasetFile(item, partition_bounds(item)) for item in paths])
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def prune(self, where: Optional[SalesFilter] = None) -> List[DatasetFile]:
+        """Files that may contain rows matching ``where``, in dataset order."""
+        if not where:
+            return list(self.files)
+        return [item for item in self.files if item.may_match(where)]
+
+    def read_table(
+        self,
+        *,
+        where: Optional[SalesFilter] = None,
+        workers: Optional[int] = None,
+        snapshot: bool = False,
+        columns: Optional[Iterable[str]] = None,
+    ) -> SalesTable:
+        """Read the surviving partitions concurrently and concatenate them in order.
+
+        Every partition is parsed in its own process (up to ``workers`` at a time) with
+        ``where`` and the ``columns`` projection pushed down; ``snapshot=True`` reuses
+        per-file binary snapshots.
+        """
+        paths = [str(item.path) for item in self.prune(where)]
+        projected = project_columns(columns)
+        workers = min(workers or os.cpu_count() or 1, len(paths))
+        if workers <= 1:
+            return SalesTable.concat(_read_partition(path, where, snapshot, projected) for path in paths)
+        count = len(paths)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return SalesTable.concat(
+                pool.map(_read_partition, paths, [where] * count, [snapshot] * count, [projected] * count)
+            )
+
+    def iter_records(
+        self, *, where: Optional[SalesFilter] = None, columns: Optional[Iterable[str]] = None
+    ) -> Iterator[SaleRecord]:
+        """Stream the records of every surviving partition, one file after another."""
+        projected = project_columns(columns)
+        return chain.from_iterable(
+            iter_sales_csv(item.path, where=where, columns=projected) for item in self.prune(where)
+        )
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, replace
+from datetime import date
+from itertools import accumulate
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .filters import SalesFilter
+from .models import SaleRecord
+from .table import MISSING_DAY, SalesTable, day_to_date
+
+# Arrays that make up an index, as persisted in a snapshot: sorted days, the table row of
+# each, then prefix sums (with a leading zero) of the measures in that order.
+INDEX_ARRAYS = ("days", "rows", "sales", "quantity", "discount", "profit")
+
+
+@dataclass(frozen=True)
+class RangeTotals:
+    """Sums over the dated rows of one ``[start, end]`` order-date range."""
+
+    rows: int
+    sales: float
+    quantity: int
+    discount: float
+    profit: float
+
+    @property
+    def average_discount(self) -> float:
+        return self.discount / self.rows if self.rows else 0.0
+
+    @property
+    def average_profit(self) -> float:
+        return self.profit / self.rows if self.rows else 0.0
+
+
+class DateIndex:
+    """Rows of a ``SalesTable`` ordered by ``order_date``, with prefix sums of the measures.
+
+    Building costs one sort; afterwards :meth:`totals` answers any inclusive date range
+    with two binary searches and :meth:`slice` returns just the matching rows, so
+    range-restricted group-bys scan only that slice.  Rows without an order date are
+    never part of a range (as with a ``SalesFilter`` date bound).  Range totals are
+    differences of running sums, so they can differ from a row-by-row sum in the last
+    floating-point digits; :meth:`slice` results are exact.
+
+    ``arrays`` (see :meth:`arrays`) restores a previously built index without sorting,
+    e.g. from a memory-mapped snapshot.
+    """
+
+    def __init__(self, table: SalesTable, arrays: Optional[Mapping[str, Sequence]] = None) -> None:
+        self.table = table
+        if arrays is None:
+            arrays = _build(table)
+        self.days: Sequence[int] = arrays["days"]
+        self.rows: Sequence[int] = arrays["rows"]
+        self._prefix: Dict[str, Sequence[float]] = {name: arrays[name] for name in ("sales", "discount", "profit")}
+        self._quantity: Sequence[int] = arrays["quantity"]
+
+    @classmethod
+    def from_records(cls, records: Iterable[SaleRecord]) -> DateIndex:
+        return cls(records if isinstance(records, SalesTable) else SalesTable.from_records(records))
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def arrays(self) -> Dict[str, Sequence]:
+        """The index's arrays, keyed by ``INDEX_ARRAYS`` names, for persisting."""
+        return {"days": self.days, "rows": self.rows, **self._prefix, "quantity": self._quantity}
+
+    @property
+    def first(self) -> Optional[date]:
+        return day_to_date(self.days[0]) if self.days else None
+
+    @property
+    def last(self) -> Optional[date]:
+        return day_to_date(self.days[-1]) if self.days else None
+
+    def span(self, start: Optional[date] = None, end: Optional[date] = None) -> Tuple[int, int]:
+        """Positions ``[low, high)`` of the sorted rows dated within ``[start, end]``."""
+        low = bisect_left(self.days, start.toordinal()) if start is not None else 0
+        high = bisect_right(self.days, end.toordinal()) if end is not None else len(self.days)
+        return low, max(low, high)
+
+    def totals(self, start: Optional[date] = None, end: Optional[date] = None) -> RangeTotals:
+        """Row count and measure sums for ``[start, end]`` in O(log n)."""
+        low, high = self.span(start, end)
+        sales, discount, profit = (self._prefix[name] for name in ("sales", "discount", "profit"))
+        return RangeTotals(
+            rows=high - low,
+            sales=sales[high] - sales[low],
+            quantity=self._quantity[high] - self._quantity[low],
+            discount=discount[high] - discount[low],
+            profit=profit[high] - profit[low],
+        )
+
+    def positions(self, start: Optional[date] = None, end: Optional[date] = None) -> List[int]:
+        """Table row numbers dated within ``[start, end]``, in file order."""
+        low, high = self.span(start, end)
+        return sorted(self.rows[low:high])
+
+    def slice(self, start: Optional[date] = None, end: Optional[date] = None) -> SalesTable:
+        """The rows dated within ``[start, end]`` as a new table, in file order.
+
+        Only the matching rows are touched, and because file order is kept, any
+        analytics over the slice match those over a filtered scan exactly.
+        """
+        return self.table.take(self.positions(start, end))
+
+    def select(self, where: SalesFilter) -> SalesTable:
+        """Rows matching ``where``: the date range is cut from the index, then the rest is scanned."""
+        if where.start is None and where.end is None:
+            return where.filter_table(self.table)
+        return replace(where, start=None, end=None).filter_table(self.slice(where.start, where.end))
+
+
+def _build(table: SalesTable) -> Dict[str, array]:
+    days = table.day_column("order_date")
+    order = sorted((row for row in range(len(table)) if days[row] != MISSING_DAY), key=days.__getitem__)
+    arrays = {"days": array("i", [days[row] for row in order]), "rows": array("q", order)}
+    for name in ("sales", "discount", "profit"):
+        column = table.numeric_column(name)
+        arrays[name] = array("d", accumulate((column[row] for row in order), initial=0.0))
+    quantity = table.numeric_column("quantity")
+    arrays["quantity"] = array("q", accumulate((quantity[row] for row in order), initial=0))
+    return arrays
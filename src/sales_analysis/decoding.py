@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import re
+from array import array
+from datetime import date, datetime
+from typing import Callable, Dict, Optional, Sequence
+
+from .table import date_to_day
+
+DEFAULT_DATE_CACHE_SIZE = 65536
+DEFAULT_STRING_POOL_SIZE = 65536
+
+# ``%y`` semantics from ``time.strptime``: 69-99 -> 19xx, 00-68 -> 20xx.
+_CENTURY_PIVOT = 69
+_SLASH_FOUR_DIGIT = re.compile(r"\d{1,2}/\d{1,2}/\d{4}")
+_SLASH_TWO_DIGIT = re.compile(r"\d{1,2}/\d{1,2}/\d{2}")
+_ISO = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def parse_float(raw: str) -> float:
+    return float(raw) if raw else 0.0
+
+
+def parse_int(raw: str) -> int:
+    if not raw:
+        return 0
+    try:
+        return int(raw)
+    except ValueError:
+        # Some exports write integral quantities as "3.0".
+        return int(float(raw))
+
+
+def parse_date(raw: str) -> Optional[date]:
+    """Format-agnostic fallback accepting ``MM/DD/YY`` and ``MM/DD/YYYY``."""
+    cleaned = raw.strip()
+    if not cleaned:
+        return None
+    # Support both two-digit and four-digit years.
+    for fmt in ("%m/%d/%y", "%m/%d/%Y"):
+        try:
+            return datetime.strptime(cleaned, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unsupported date format: {raw}")
+
+
+def decode_floats(raws: Sequence[str]) -> array:
+    """Decode a column of numeric strings into a ``array('d')`` in one call."""
+    try:
+        return array("d", map(float, raws))
+    except ValueError:
+        return array("d", map(parse_float, raws))
+
+
+def decode_ints(raws: Sequence[str]) -> array:
+    """Decode a column of integer strings into a ``array('q')`` in one call."""
+    try:
+        return array("q", map(int, raws))
+    except ValueError:
+        return array("q", map(parse_int, raws))
+
+
+def _slash_parser(year_digits: int) -> Callable[[str], date]:
+    def parse(text: str) -> date:
+        month, day, year = text.split("/")
+        if len(year) != year_digits:
+            raise ValueError(text)
+        number = int(year)
+        if year_digits == 2:
+            number += 1900 if number >= _CENTURY_PIVOT else 2000
+        return date(number, int(month), int(day))
+
+    return parse
+
+
+def _sniff_date_parser(sample: str) -> Callable[[str], date]:
+    if _SLASH_FOUR_DIGIT.fullmatch(sample):
+        return _slash_parser(4)
+    if _SLASH_TWO_DIGIT.fullmatch(sample):
+        return _slash_parser(2)
+    if _ISO.fullmatch(sample):
+        return date.fromisoformat
+    raise ValueError(f"Unsupported date format: {sample}")
+
+
+class DateDecoder:
+    """Per-file date decoder.
+
+    The layout (``MM/DD/YY``, ``MM/DD/YYYY`` or ISO) is sniffed from the first non-empty
+    value and used for every later one, so no row pays for a failed ``strptime``.  Parsed
+    strings are memoized in a bounded dict, which means the few thousand distinct dates
+    in a multi-million-row export are each decoded once and share one ``date`` object.
+    Values that do not fit the sniffed layout fall back to :func:`parse_date`.
+    """
+
+    def __init__(self, max_cache_size: int = DEFAULT_DATE_CACHE_SIZE) -> None:
+        self._cache: Dict[str, Optional[date]] = {}
+        self._max_cache_size = max_cache_size
+        self._parse: Optional[Callable[[str], date]] = None
+
+    def __call__(self, raw: str) -> Optional[date]:
+        try:
+            return self._cache[raw]
+        except KeyError:
+            pass
+        value = self._decode(raw)
+        if len(self._cache) < self._max_cache_size:
+            self._cache[raw] = value
+        return value
+
+    def _decode(self, raw: str) -> Optional[date]:
+        cleaned = raw.strip()
+        if not cleaned:
+            return None
+        if self._parse is None:
+            self._parse = _sniff_date_parser(cleaned)
+        try:
+            return self._parse(cleaned)
+        except ValueError:
+            return parse_date(cleaned)
+
+    def decode_days(self, raws: Sequence[str]) -> array:
+        """Decode a column of date strings into day numbers (0 for missing)."""
+        return array("i", [date_to_day(value) for value in map(self, raws)])
+
+
+class StringPool:
+    """Per-file pool that hands back one shared ``str`` instance per distinct value.
+
+    ``csv`` allocates a fresh string for every field, so a low-cardinality column such as
+    ``Region`` would otherwise hold millions of equal copies.  Like :class:`DateDecoder`
+    the pool is bounded; values seen after it fills are returned unshared.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_STRING_POOL_SIZE) -> None:
+        self._pool: Dict[str, str] = {}
+        self._max_size = max_size
+
+    def __call__(self, value: str) -> str:
+        try:
+            return self._pool[value]
+        except KeyError:
+            pass
+        if len(self._pool) < self._max_size:
+            self._pool[value] = value
+        return value
+
+    def __len__(self) -> int:
+        return len(self._pool)
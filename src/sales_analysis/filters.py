@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from datetime import date, timedelta
+from typing import Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .models import SaleRecord
+from .table import SalesTable
+
+DateParser = Callable[[str], Optional[date]]
+RawRow = Union[Sequence[str], Mapping[str, str]]
+
+# Filter attribute -> (SaleRecord field, CSV header) for the categorical predicates.
+_CATEGORICAL = {
+    "regions": ("region", "Region"),
+    "categories": ("category", "Category"),
+    "states": ("state", "State"),
+    "segments": ("segment", "Segment"),
+}
+
+
+def month_bounds(month: str) -> Tuple[date, date]:
+    """Return the first and last day of a ``YYYY-MM`` month."""
+    try:
+        year, month_number = (int(part) for part in month.split("-"))
+        first = date(year, month_number, 1)
+    except ValueError:
+        raise ValueError(f"Expected a YYYY-MM month, got {month!r}") from None
+    following = date(year + month_number // 12, month_number % 12 + 1, 1)
+    return first, following - timedelta(days=1)
+
+
+def _raw_key(layout: Optional[Dict[str, int]], record_field: str, header: str) -> Union[int, str]:
+    """Where a raw row holds ``record_field``: its header name, or its position under ``layout``."""
+    if layout is None:
+        return header
+    if record_field not in layout:
+        raise ValueError(f"CSV header is missing the {header} column needed by the filter")
+    return layout[record_field]
+
+
+def _frozen(values: Optional[Iterable[str]]) -> Optional[FrozenSet[str]]:
+    return frozenset(values) if values is not None else None
+
+
+@dataclass(frozen=True)
+class SalesFilter:
+    """Row predicate that can be pushed down into the CSV readers.
+
+    ``start``/``end`` bound ``order_date`` inclusively (rows without an order date never
+    match a date bound); each categorical field restricts its column to a set of values.
+    ``None`` means "no restriction".
+    """
+
+    start: Optional[date] = None
+    end: Optional[date] = None
+    regions: Optional[FrozenSet[str]] = None
+    categories: Optional[FrozenSet[str]] = None
+    states: Optional[FrozenSet[str]] = None
+    segments: Optional[FrozenSet[str]] = None
+
+    def __post_init__(self) -> None:
+        for name in _CATEGORICAL:
+            object.__setattr__(self, name, _frozen(getattr(self, name)))
+
+    @classmethod
+    def for_month(cls, month: str, **categorical: Iterable[str]) -> SalesFilter:
+        """Filter matching one ``YYYY-MM`` month (plus optional categorical restrictions)."""
+        start, end = month_bounds(month)
+        return cls(start=start, end=end, **categorical)  # type: ignore[arg-type]
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, item.name) is not None for item in fields(self))
+
+    def _sets(self) -> List[Tuple[str, str, FrozenSet[str]]]:
+        return [
+            (record_field, header, getattr(self, name))
+            for name, (record_field, header) in _CATEGORICAL.items()
+            if getattr(self, name) is not None
+        ]
+
+    def _date_ok(self, value: Optional[date]) -> bool:
+        if self.start is None and self.end is None:
+            return True
+        if value is None:
+            return False
+        return (self.start is None or value >= self.start) and (self.end is None or value <= self.end)
+
+    def matches(self, record: SaleRecord) -> bool:
+        """Evaluate the filter against a materialized record."""
+        if not self._date_ok(record.order_date):
+            return False
+        return all(getattr(record, name) in allowed for name, _, allowed in self._sets())
+
+    def raw_predicate(
+        self, decode_date: DateParser, layout: Optional[Dict[str, int]] = None
+    ) -> Callable[[RawRow], bool]:
+        """Return a predicate over raw CSV text.
+
+        With ``layout`` (``SaleRecord`` field -> column position) rows are field lists
+        from ``csv.reader``; without it they are header-keyed dicts.  Categorical columns
+        are compared as raw strings first; only rows that survive have their
+        ``Order Date`` decoded, and no other column is decoded at all.
+        """
+        sets = [(_raw_key(layout, record_field, header), allowed) for record_field, header, allowed in self._sets()]
+        has_dates = self.start is not None or self.end is not None
+        order_date = _raw_key(layout, "order_date", "Order Date") if has_dates else None
+
+        def predicate(row: RawRow) -> bool:
+            for key, allowed in sets:
+                if row[key] not in allowed:  # type: ignore[index]
+                    return False
+            return not has_dates or self._date_ok(decode_date(row[order_date]))  # type: ignore[index]
+
+        return predicate
+
+    def filter_table(self, table: SalesTable) -> SalesTable:
+        """Return the rows of ``table`` that match, comparing integer codes and day numbers."""
+        if not self:
+            return table
+        allowed_codes = []
+        for record_field, _, allowed in self._sets():
+            column = table.categorical(record_field)
+            codes = {code for code, value in enumerate(column.values) if value in allowed}
+            allowed_codes.append((column.codes, codes))
+        has_dates = self.start is not None or self.end is not None
+        # Missing dates are stored as day 0, which falls below any lower bound.
+        low = self.start.toordinal() if self.start is not None else 1
+        high = self.end.toordinal() if self.end is not None else date.max.toordinal()
+        indices = []
+        for index, day in enumerate(table.order_day):
+            if has_dates and not low <= day <= high:
+                continue
+            if all(codes[index] in allowed for codes, allowed in allowed_codes):
+                indices.append(index)
+        return table.take(indices)
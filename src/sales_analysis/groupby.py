@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from operator import attrgetter
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from .models import SaleRecord
+from .table import NUMERIC_COLUMNS, STRING_COLUMNS, SalesTable
+
+AGGREGATIONS = ("sum", "count", "mean", "min", "max")
+
+GroupKey = Tuple[str, ...]
+MetricSpec = Tuple[str, str]
+
+
+def _check(keys: Sequence[str], metrics: Mapping[str, MetricSpec]) -> List[str]:
+    """Validate the request and return the numeric columns that must be read."""
+    for key in keys:
+        if key not in STRING_COLUMNS:
+            raise ValueError(f"Cannot group by {key!r} (expected one of {STRING_COLUMNS})")
+    columns: List[str] = []
+    for name, (column, aggregation) in metrics.items():
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation {aggregation!r} for {name!r} (expected one of {AGGREGATIONS})")
+        if column not in NUMERIC_COLUMNS:
+            raise ValueError(f"Cannot aggregate {column!r} for {name!r} (expected one of {NUMERIC_COLUMNS})")
+        if aggregation != "count" and column not in columns:
+            columns.append(column)
+    return columns
+
+
+class _Accumulators:
+    """Per-group counts plus per-column sums (and extrema when needed), indexed by group id."""
+
+    def __init__(self, columns: int, extrema: bool) -> None:
+        self.counts: List[int] = []
+        self.sums: List[List[float]] = [[] for _ in range(columns)]
+        self.mins: List[List[float]] = [[] for _ in range(columns)] if extrema else []
+        self.maxs: List[List[float]] = [[] for _ in range(columns)] if extrema else []
+
+    def grow(self, size: int) -> None:
+        extra = size - len(self.counts)
+        self.counts.extend([0] * extra)
+        for sums in self.sums:
+            sums.extend([0.0] * extra)
+        for mins in self.mins:
+            mins.extend([float("inf")] * extra)
+        for maxs in self.maxs:
+            maxs.extend([float("-inf")] * extra)
+
+    def fold_columns(self, gids: Sequence[int], values: Sequence[Sequence[float]], counted: bool) -> None:
+        """Column-at-a-time passes over pre-encoded group ids (the bincount shape)."""
+        if counted:
+            counts = self.counts
+            for gid in gids:
+                counts[gid] += 1
+        for sums, column in zip(self.sums, values):
+            for gid, value in zip(gids, column):
+                sums[gid] += value
+        for mins, maxs, column in zip(self.mins, self.maxs, values):
+            for gid, value in zip(gids, column):
+                if value < mins[gid]:
+                    mins[gid] = value
+                if value > maxs[gid]:
+                    maxs[gid] = value
+
+    def fold_records(
+        self, records: Iterable[SaleRecord], keys: Sequence[str], columns: Sequence[str], counted: bool
+    ) -> List[GroupKey]:
+        """Encode each record's key to a group id in first-seen order and fold its values."""
+        key_of = attrgetter(*keys) if keys else lambda record: ()
+        ids: Dict[object, int] = {}
+        labels: List[object] = []
+        counts = self.counts
+        if len(columns) == 1 and not self.mins and not counted:
+            # Common case (e.g. the sales_by_* wrappers): one summed column, no counts.
+            value_of = attrgetter(columns[0])
+            sums = self.sums[0]
+            for record in records:
+                key = key_of(record)
+                gid = ids.get(key)
+                if gid is None:
+                    gid = ids[key] = len(labels)
+                    labels.append(key)
+                    counts.append(0)
+                    sums.append(0.0)
+                sums[gid] += value_of(record)
+        else:
+            values_of = [attrgetter(column) for column in columns]
+            extrema = list(zip(self.mins, self.maxs))
+            for record in records:
+                key = key_of(record)
+                gid = ids.get(key)
+                if gid is None:
+                    gid = ids[key] = len(labels)
+                    labels.append(key)
+                    self.grow(gid + 1)
+                counts[gid] += 1
+                for sums, value_of in zip(self.sums, values_of):
+                    sums[gid] += value_of(record)
+                for (mins, maxs), value_of in zip(extrema, values_of):
+                    value = value_of(record)
+                    if value < mins[gid]:
+                        mins[gid] = value
+                    if value > maxs[gid]:
+                        maxs[gid] = value
+        if len(keys) == 1:
+            return [(label,) for label in labels]  # type: ignore[misc]
+        return labels  # type: ignore[return-value]
+
+
+def _encode_table(table: SalesTable, keys: Sequence[str]) -> Tuple[Sequence[int], List[GroupKey]]:
+    """Integer group ids per row (from the dictionary codes) and the label of each id."""
+    columns = [table.categorical(key) for key in keys]
+    if len(columns) == 1:
+        return columns[0].codes, [(value,) for value in columns[0].values]
+    if not columns:
+        return [0] * len(table), [()]
+    ids: Dict[Tuple[int, ...], int] = {}
+    gids = []
+    for codes in zip(*(column.codes for column in columns)):
+        gid = ids.get(codes)
+        if gid is None:
+            gid = ids[codes] = len(ids)
+        gids.append(gid)
+    labels = [
+        tuple(column.values[code] for column, code in zip(columns, codes)) for codes in ids
+    ]
+    return gids, labels
+
+
+def group_by(
+    records: Iterable[SaleRecord],
+    keys: Sequence[str],
+    metrics: Mapping[str, MetricSpec],
+) -> Dict[GroupKey, Dict[str, float]]:
+    """Group rows by one or more string columns and aggregate numeric columns per group.
+
+    ``metrics`` maps an output name to ``(column, aggregation)`` where ``aggregation`` is
+    one of ``sum``, ``count``, ``mean``, ``min`` or ``max``, e.g.
+    ``group_by(records, ["region", "category"], {"revenue": ("sales", "sum")})``.  Keys of
+    the result are tuples ordered like ``keys``, in first-seen row order.  Rows are
+    mapped to integer group ids (the dictionary codes for a ``SalesTable``) and every
+    aggregate is accumulated into per-id lists, so sums match a row-order sum exactly.
+    """
+    columns = _check(keys, metrics)
+    extrema = any(aggregation in ("min", "max") for _, aggregation in metrics.values())
+    counted = any(aggregation in ("count", "mean") for _, aggregation in metrics.values())
+    accumulators = _Accumulators(len(columns), extrema)
+    if isinstance(records, SalesTable):
+        gids, labels = _encode_table(records, keys)
+        accumulators.grow(len(labels))
+        accumulators.fold_columns(gids, [records.numeric_column(column) for column in columns], counted)
+        order: Iterable[int] = dict.fromkeys(gids)
+    else:
+        labels = accumulators.fold_records(records, keys, columns, counted)
+        order = range(len(labels))
+
+    position = {column: index for index, column in enumerate(columns)}
+    counts = accumulators.counts
+    result: Dict[GroupKey, Dict[str, float]] = {}
+    for gid in order:
+        row: Dict[str, float] = {}
+        for name, (column, aggregation) in metrics.items():
+            if aggregation == "count":
+                row[name] = counts[gid]
+                continue
+            index = position[column]
+            if aggregation == "sum":
+                row[name] = accumulators.sums[index][gid]
+            elif aggregation == "mean":
+                row[name] = accumulators.sums[index][gid] / counts[gid]
+            elif aggregation == "min":
+                row[name] = accumulators.mins[index][gid]
+            else:
+                row[name] = accumulators.maxs[index][gid]
+        result[labels[gid]] = row
+    return result
+
+
+def sum_by(records: Iterable[SaleRecord], key: str, column: str = "sales") -> Dict[str, float]:
+    """Single-key, single-column sum, flattened to ``{value: total}``."""
+    grouped = group_by(records, [key], {column: (column, "sum")})
+    return {label: row[column] for (label,), row in grouped.items()}
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
+
+from .compression import detect_codec
+from .decoding import DateDecoder
+from .reader import BOM, header_layout, record_builder
+from .report import SalesAggregator
+
+PathLike = Union[str, Path]
+
+STATE_VERSION = 1
+_HEAD_BYTES = 64 * 1024
+_ANCHOR_BYTES = 4 * 1024
+
+
+@dataclass(frozen=True)
+class RefreshResult:
+    """Outcome of one :func:`refresh_incremental` call."""
+
+    aggregator: SalesAggregator
+    rows_added: int
+    bytes_read: int
+    rebuilt: bool
+
+
+def _digest(handle: BinaryIO, start: int, length: int) -> str:
+    handle.seek(start)
+    return hashlib.blake2b(handle.read(length), digest_size=16).hexdigest()
+
+
+def _fingerprint(handle: BinaryIO, offset: int) -> Dict[str, str]:
+    """Hash the file head and the bytes just before ``offset``.
+
+    Together they detect a rewritten file cheaply; a rewrite that preserves both
+    windows (and does not shrink the file) is not detected.
+    """
+    anchor_start = max(0, offset - _ANCHOR_BYTES)
+    return {
+        "head": _digest(handle, 0, min(offset, _HEAD_BYTES)),
+        "anchor": _digest(handle, anchor_start, offset - anchor_start),
+    }
+
+
+def _complete_lines(handle: BinaryIO, consumed: List[int]) -> Iterator[str]:
+    """Yield newline-terminated lines, stopping before a partially written final line."""
+    for line in handle:
+        if not line.endswith(b"\n"):
+            return
+        consumed[0] += len(line)
+        yield line.decode("utf-8")
+
+
+def _load_state(state_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == STATE_VERSION else None
+
+
+def _save_state(state_path: Path, state: Dict[str, Any]) -> None:
+    handle, temp_name = tempfile.mkstemp(dir=state_path.parent, prefix=state_path.name, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as out:
+            json.dump(state, out)
+        os.replace(temp_name, state_path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+def refresh_incremental(
+    csv_path: PathLike, state_path: PathLike, *, top_capacity: Optional[int] = None, approximate: bool = False
+) -> RefreshResult:
+    """Bring the persisted aggregate state for an append-only CSV up to date.
+
+    The state file remembers the byte offset reached by the previous run, a fingerprint
+    of the consumed prefix and the ``SalesAggregator`` totals.  Only rows appended since
+    then are parsed and folded in.  If the file shrank, its fingerprint changed or the
+    state was built with a different ``top_capacity`` or ``approximate`` setting, the state
+    is discarded and rebuilt from the start of the file.  A trailing line without a
+    newline is treated as still being written and is picked up by a later refresh.
+    Compressed files are rejected: their byte offsets do not address CSV rows.
+    """
+    source = Path(csv_path)
+    if detect_codec(source) is not None:
+        raise ValueError(f"{source} is compressed; incremental refresh needs a plain, append-only CSV")
+    target = Path(state_path)
+    size = source.stat().st_size
+    state = _load_state(target)
+    settings = {"top_capacity": top_capacity, "approximate": approximate}
+
+    with source.open("rb") as handle:
+        rebuilt = True
+        if (
+            state is not None
+            and state["source"] == str(source.resolve())
+            and state.get("settings") == settings
+            and state["header"]
+            and state["offset"] <= size
+        ):
+            rebuilt = _fingerprint(handle, state["offset"]) != state["fingerprint"]
+        if rebuilt:
+            handle.seek(0)
+            header_line = handle.readline()
+            if not header_line.endswith(b"\n"):  # no complete header yet: nothing to consume
+                header_line = b""
+            header = [field.lstrip(BOM) for field in next(csv.reader([header_line.decode("utf-8")]))]
+            aggregator = SalesAggregator(top_capacity=top_capacity, approximate=approximate)
+            start = len(header_line)
+        else:
+            header = state["header"]  # type: ignore[index]
+            aggregator = SalesAggregator.from_state(state["aggregate"])  # type: ignore[index]
+            start = state["offset"]  # type: ignore[index]
+
+        handle.seek(start)
+        consumed = [0]
+        before = aggregator.row_count
+        decoder = DateDecoder()
+        if header:
+            rows = filter(None, csv.reader(_complete_lines(handle, consumed)))
+            aggregator.update(map(record_builder(header_layout(header), decoder), rows))
+        offset = start + consumed[0]
+        fingerprint = _fingerprint(handle, offset)
+
+    _save_state(
+        target,
+        {
+            "version": STATE_VERSION,
+            "source": str(source.resolve()),
+            "offset": offset,
+            "fingerprint": fingerprint,
+            "header": header,
+            "settings": settings,
+            "aggregate": aggregator.to_state(),
+        },
+    )
+    return RefreshResult(
+        aggregator=aggregator,
+        rows_added=aggregator.row_count - before,
+        bytes_read=offset - start,
+        rebuilt=rebuilt,
+    )
@@ -5,9 +5,13 @@ from datetime import date
 from typing import Optional
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SaleRecord:
-    """Strongly typed representation of a single sale row."""
+    """Strongly typed representation of a single sale row.
+
+    Slotted (no per-instance ``__dict__``); the readers additionally share categorical
+    strings and ``date`` objects between records.
+    """
 
     row_id: str
     order_id: str
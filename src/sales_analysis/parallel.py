@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .compression import detect_codec
+from .filters import SalesFilter
+from .reader import BOM, PathLike, build_table, header_layout, project_columns, read_sales_table
+from .table import SalesTable
+
+ByteRange = Tuple[int, int]
+
+
+def split_byte_ranges(path: PathLike, parts: int) -> Tuple[List[str], List[ByteRange]]:
+    """Split the data section of a CSV file into at most ``parts`` newline-aligned ranges.
+
+    Returns the (BOM-stripped) header fields and ``[start, end)`` byte offsets covering
+    every data row exactly once.  Ranges are cut on raw newlines, so quoted fields must
+    not contain embedded line breaks (true for Superstore exports), and the file must not
+    be compressed.
+    """
+    if parts <= 0:
+        raise ValueError("parts must be positive")
+    if detect_codec(path) is not None:
+        raise ValueError(f"{path} is compressed and cannot be split into byte ranges")
+    csv_path = Path(path)
+    size = csv_path.stat().st_size
+    with csv_path.open("rb") as handle:
+        header_line = handle.readline().decode("utf-8")
+        header = [field.lstrip(BOM) for field in next(csv.reader([header_line]))]
+        data_start = handle.tell()
+        boundaries = [data_start]
+        for index in range(1, parts):
+            target = data_start + (size - data_start) * index // parts
+            if target <= boundaries[-1]:
+                continue
+            # Step back one byte so a target that already sits on a line start is kept.
+            handle.seek(target - 1)
+            handle.readline()
+            boundary = handle.tell()
+            if boundaries[-1] < boundary < size:
+                boundaries.append(boundary)
+    boundaries.append(size)
+    ranges = [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+    return header, ranges
+
+
+def _lines_in_range(path: PathLike, start: int, end: int) -> Iterator[str]:
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        position = start
+        while position < end:
+            line = handle.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode("utf-8")
+
+
+def _parse_range(
+    path: str,
+    header: Sequence[str],
+    byte_range: ByteRange,
+    where: Optional[SalesFilter] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> SalesTable:
+    """Worker entry point: parse one byte range into a ``SalesTable``."""
+    rows = filter(None, csv.reader(_lines_in_range(path, *byte_range)))
+    return build_table(rows, header_layout(header), where=where, columns=columns)
+
+
+def read_sales_table_parallel(
+    path: PathLike,
+    *,
+    workers: int | None = None,
+    where: Optional[SalesFilter] = None,
+    columns: Optional[Iterable[str]] = None,
+) -> SalesTable:
+    """Parse the CSV in a process pool and return the merged ``SalesTable``.
+
+    The file is split into newline-aligned byte ranges, each parsed by its own process;
+    the partial tables are concatenated in file order so the result is identical to
+    :func:`read_sales_table`.  Reports computed from it match a row-by-row pass over the
+    same file, ``top_capacity`` estimates included, because :class:`SalesAggregator`
+    feeds table rows to its sketch in file order.  ``where`` and the
+    ``columns`` projection are pushed down into every worker.  A compressed file cannot
+    be split by byte offset, so it is read by :func:`read_sales_table`, which
+    decompresses on a separate thread while parsing.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or detect_codec(path) is not None:
+        return read_sales_table(path, where=where, columns=columns)
+    header, ranges = split_byte_ranges(path, workers)
+    if len(ranges) <= 1:
+        return read_sales_table(path, where=where, columns=columns)
+    count = len(ranges)
+    projected = [project_columns(columns)] * count
+    with ProcessPoolExecutor(max_workers=min(workers, count)) as pool:
+        parts = pool.map(_parse_range, [str(path)] * count, [header] * count, ranges, [where] * count, projected)
+        return SalesTable.concat(parts)
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .compression import open_text
+from .models import SaleRecord
+from .report import SalesAggregator, SalesReport
+from .sections import SECTION_COLUMNS
+from .sketches import SketchAggregator
+from .table import FIELDS, MISSING_DAY, SalesTable, day_to_month
+from .topn import SpaceSaving, nlargest_totals
+
+PathLike = Union[str, Path]
+
+PARTIAL_FORMAT = "sales-analysis/partial"
+PARTIAL_VERSION = 3
+# Rankings offered by ``analytics`` that the single-pass report does not keep.
+RANKED_FIELDS = ("customer_id", "sub_category")
+# ``SaleRecord`` fields a partial state reads (every report section plus the extra rankings).
+PARTIAL_COLUMNS = tuple(
+    name
+    for name in FIELDS
+    if name in (*RANKED_FIELDS, "customer_name") or any(name in columns for columns in SECTION_COLUMNS.values())
+)
+# Exact sales sums kept per key: the ``SalesAggregator`` group maps, then the extra rankings.
+_AGGREGATE_GROUPS = ("by_region", "by_category", "by_segment", "by_state", "by_product", "by_month")
+_GROUPS = (*_AGGREGATE_GROUPS, *RANKED_FIELDS)
+_RANKABLE = {
+    "region": "by_region",
+    "category": "by_category",
+    "segment": "by_segment",
+    "state": "by_state",
+    "product_name": "by_product",
+    "customer_id": "customer_id",
+    "sub_category": "sub_category",
+}
+_TOTALS = ("sales", "discount", "profit")
+
+# Every finite float is an integer multiple of 2**-1074 (the smallest subnormal), so sums
+# kept as integer counts of that unit are exact, and merging them is associative.
+_UNIT_BITS = 1074
+_ONE = 1 << _UNIT_BITS
+
+Row = Tuple[float, int, float, float, Optional[str], str, str, str, str, str, str, str, str]
+
+
+def _units(value: float) -> int:
+    numerator, denominator = value.as_integer_ratio()
+    return numerator << (_UNIT_BITS + 1 - denominator.bit_length())
+
+
+def _to_float(units: int) -> float:
+    """Correctly rounded: ``int / int`` rounds the exact quotient once."""
+    return units / _ONE
+
+
+def _encode(units: int) -> str:
+    """``<hex mantissa>p<binary exponent>`` with trailing zero bits dropped, e.g. ``5p-1`` for 2.5."""
+    if not units:
+        return "0"
+    shift = (units & -units).bit_length() - 1
+    return f"{units >> shift:x}p{shift - _UNIT_BITS}"
+
+
+def _decode(text: str) -> int:
+    mantissa, _, exponent = text.partition("p")
+    shift = int(exponent or 0) + _UNIT_BITS
+    if shift < 0:
+        raise ValueError(f"{text!r} is not a sum of floats")
+    return int(mantissa, 16) << shift
+
+
+def _table_rows(table: SalesTable) -> Iterator[Row]:
+    months: Dict[int, Optional[str]] = {MISSING_DAY: None}
+    for day in dict.fromkeys(table.order_day):
+        months.setdefault(day, day_to_month(day))
+    return zip(  # type: ignore[return-value]
+        table.sales,
+        table.quantity,
+        table.discount,
+        table.profit,
+        map(months.__getitem__, table.order_day),
+        *(
+            table.categorical(name)
+            for name in (
+                "region", "category", "segment", "state", "product_name", "customer_id", "customer_name", "sub_category"
+            )
+        ),
+    )
+
+
+def _record_rows(records: Iterable[SaleRecord]) -> Iterator[Row]:
+    months: Dict[Any, Optional[str]] = {None: None}
+    for record in records:
+        order_date = record.order_date
+        month = months.get(order_date)
+        if month is None and order_date is not None:
+            month = months[order_date] = order_date.strftime("%Y-%m")
+        yield (
+            record.sales,
+            record.quantity,
+            record.discount,
+            record.profit,
+            month,
+            record.region,
+            record.category,
+            record.segment,
+            record.state,
+            record.product_name,
+            record.customer_id,
+            record.customer_name,
+            record.sub_category,
+        )
+
+
+class PartialState:
+    """Mergeable summary of one shard of the sales data.
+
+    Holds everything the ``analytics`` functions and the report need as sums and
+    counts: row and quantity counts, sales/discount/profit totals (means are kept as
+    sum and row count), the per-region/category/segment/state/product and per-month
+    sales maps, and per-customer (by ID, with each ID's first-seen name) and
+    per-sub-category sales for the rankings the report does not keep.  Group maps are
+    complete, so top-N lists of merged shards are exact.  With a bounded
+    ``top_capacity``, products are tracked by a mergeable Space-Saving sketch instead.
+
+    Every float sum is kept exactly, as an integer count of ``2**-1074``, and rounded
+    once when a report is built.  Merging is therefore exact and associative: shards
+    merged in file order give the same report, bit for bit, as one state built over the
+    whole data.  Only the sketches (Space-Saving, HyperLogLog, KLL) merge approximately.
+    """
+
+    def __init__(self, *, top_capacity: Optional[int] = None, approximate: bool = False) -> None:
+        self.row_count = 0
+        self.quantity_total = 0
+        self.totals: Dict[str, int] = dict.fromkeys(_TOTALS, 0)
+        self.groups: Dict[str, Dict[str, int]] = {name: defaultdict(int) for name in _GROUPS}
+        self.customer_names: Dict[str, str] = {}
+        self.product_sketch = SpaceSaving(top_capacity) if top_capacity else None
+        self.sketches = SketchAggregator() if approximate else None
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[SaleRecord], *, top_capacity: Optional[int] = None, approximate: bool = False
+    ) -> PartialState:
+        """Summarize ``records`` (a list, ``SalesTable`` or one-shot stream) in one pass."""
+        state = cls(top_capacity=top_capacity, approximate=approximate)
+        if isinstance(records, SalesTable):
+            if state.sketches is not None:
+                state.sketches.update(records)
+            state._fold(_table_rows(records))
+        else:
+            if state.sketches is not None:
+                records = state.sketches.tap(records)
+            state._fold(_record_rows(records))
+        return state
+
+    def _fold(self, rows: Iterator[Row]) -> None:
+        groups = self.groups
+        by_region, by_category, by_segment, by_state, by_product, by_month, customers, sub_categories = (
+            groups[name] for name in _GROUPS
+        )
+        names = self.customer_names
+        sketch = self.product_sketch
+        count = self.row_count
+        quantity_total = self.quantity_total
+        sales_total, discount_total, profit_total = (self.totals[name] for name in _TOTALS)
+        for (
+            sales, quantity, discount, profit, month, region, category, segment, state, product, customer_id,
+            customer_name, sub_category,
+        ) in rows:
+            units = _units(sales)
+            count += 1
+            quantity_total += quantity
+            sales_total += units
+            discount_total += _units(discount)
+            profit_total += _units(profit)
+            by_region[region] += units
+            by_category[category] += units
+            by_segment[segment] += units
+            by_state[state] += units
+            if sketch is None:
+                by_product[product] += units
+            else:
+                sketch.add(product, sales)
+            if month is not None:
+                by_month[month] += units
+            customers[customer_id] += units
+            if customer_id not in names:
+                names[customer_id] = customer_name
+            sub_categories[sub_category] += units
+        self.row_count = count
+        self.quantity_total = quantity_total
+        self.totals = dict(zip(_TOTALS, (sales_total, discount_total, profit_total)))
+
+    def _settings(self) -> Tuple[Optional[int], bool]:
+        sketch = self.product_sketch
+        return (sketch.capacity if sketch else None), self.sketches is not None
+
+    def merge(self, other: PartialState) -> PartialState:
+        """Fold ``other`` (the next shard in file order) into this state and return ``self``."""
+        if self._settings() != other._settings():
+            raise ValueError(
+                "cannot merge partial states built with different --top-mode/--top-capacity or --approximate"
+            )
+        self.row_count += other.row_count
+        self.quantity_total += other.quantity_total
+        for name in _TOTALS:
+            self.totals[name] += other.totals[name]
+        for name in _GROUPS:
+            target = self.groups[name]
+            for key, units in other.groups[name].items():
+                target[key] += units
+        for customer_id, customer_name in other.customer_names.items():
+            self.customer_names.setdefault(customer_id, customer_name)
+        if self.product_sketch is not None and other.product_sketch is not None:
+            self.product_sketch.merge(other.product_sketch)
+        if self.sketches is not None and other.sketches is not None:
+            self.sketches.merge(other.sketches)
+        return self
+
+    def _totals(self, name: str) -> Dict[str, float]:
+        return {key: _to_float(units) for key, units in self.groups[name].items()}
+
+    def aggregator(self) -> SalesAggregator:
+        """A :class:`SalesAggregator` holding the correctly rounded totals (and the sketches)."""
+        aggregator = SalesAggregator()
+        aggregator.row_count = self.row_count
+        aggregator.quantity_total = self.quantity_total
+        aggregator.sales_total, aggregator.discount_total, aggregator.profit_total = (
+            _to_float(self.totals[name]) for name in _TOTALS
+        )
+        for name in _AGGREGATE_GROUPS:
+            getattr(aggregator, name).update(self._totals(name))
+        aggregator.product_sketch = self.product_sketch
+        aggregator.sketches = self.sketches
+        return aggregator
+
+    def report(self, *, top_n: int = 5) -> SalesReport:
+        return self.aggregator().report(top_n=top_n)
+
+    def top(self, field: str, n: int) -> List[Tuple[str, float]]:
+        """Exact top ``n`` values of ``field`` by sales, like ``analytics.top_n_*_by_sales``.
+
+        ``customer_name`` ranks customers by ID and labels them with their names.
+        """
+        if field == "customer_name":
+            names = self.customer_names
+            return [(names[key], value) for key, value in nlargest_totals(self._totals("customer_id"), n)]
+        if field == "product_name" and self.product_sketch is not None:
+            raise ValueError("product totals are approximate in this state; use report().top_products")
+        if field not in _RANKABLE:
+            raise ValueError(f"no ranking for {field!r}; choose from {', '.join([*_RANKABLE, 'customer_name'])}")
+        return nlargest_totals(self._totals(_RANKABLE[field]), n)
+
+    def to_state(self) -> Dict[str, Any]:
+        """Return the state as a versioned, JSON-serializable dict; sums are exact fractions."""
+        return {
+            "format": PARTIAL_FORMAT,
+            "version": PARTIAL_VERSION,
+            "rows": self.row_count,
+            "quantity": self.quantity_total,
+            "totals": {name: _encode(units) for name, units in self.totals.items()},
+            "groups": {
+                name: {key: _encode(units) for key, units in values.items()} for name, values in self.groups.items()
+            },
+            "customer_names": self.customer_names,
+            "product_sketch": self.product_sketch.to_state() if self.product_sketch else None,
+            "sketches": self.sketches.to_state() if self.sketches else None,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> PartialState:
+        if state.get("format") != PARTIAL_FORMAT:
+            raise ValueError("not a sales-analysis partial state")
+        if state.get("version") != PARTIAL_VERSION:
+            raise ValueError(f"unsupported partial state version {state.get('version')!r}; expected {PARTIAL_VERSION}")
+        partial = cls()
+        partial.row_count = state["rows"]
+        partial.quantity_total = state["quantity"]
+        partial.totals = {name: _decode(state["totals"][name]) for name in _TOTALS}
+        for name in _GROUPS:
+            partial.groups[name].update((key, _decode(text)) for key, text in state["groups"][name].items())
+        partial.customer_names = dict(state["customer_names"])
+        if state["product_sketch"]:
+            partial.product_sketch = SpaceSaving.from_state(state["product_sketch"])
+        if state["sketches"]:
+            partial.sketches = SketchAggregator.from_state(state["sketches"])
+        return partial
+
+    def to_bytes(self) -> bytes:
+        """gzip-compressed JSON of :meth:`to_state`."""
+        payload = json.dumps(self.to_state(), separators=(",", ":")).encode("utf-8")
+        return gzip.compress(payload, mtime=0)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> PartialState:
+        if data[:2] == b"\x1f\x8b":
+            data = gzip.decompress(data)
+        try:
+            state = json.loads(data.decode("utf-8"))
+        except ValueError:
+            raise ValueError("not a sales-analysis partial state") from None
+        return cls.from_state(state)
+
+    def write(self, path: PathLike) -> Path:
+        """Write :meth:`to_bytes` to ``path`` atomically."""
+        target = Path(path)
+        handle, temp_name = tempfile.mkstemp(dir=target.parent, prefix=target.name, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as out:
+                out.write(self.to_bytes())
+            os.replace(temp_name, target)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        return target
+
+    @classmethod
+    def read(cls, path: PathLike) -> PartialState:
+        """Load a state written by :meth:`write` (plain JSON files are accepted too)."""
+        with open_text(path, threaded=False) as handle:
+            try:
+                state = json.load(handle)
+            except ValueError:
+                raise ValueError(f"{path} is not a sales-analysis partial state") from None
+        return cls.from_state(state)
+
+
+def merge_partials(states: Sequence[PartialState]) -> PartialState:
+    """Merge shard states in order into a new state (the inputs are left unchanged)."""
+    if not states:
+        raise ValueError("need at least one partial state to merge")
+    merged = PartialState.from_state(states[0].to_state())
+    for state in states[1:]:
+        merged.merge(state)
+    return merged
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..producer_consumer import BoundedBuffer, Producer
+from .compression import open_text
+from .decoding import DateDecoder
+from .filters import SalesFilter
+from .reader import BOM, TABLE_BATCH_SIZE, PathLike, build_table, header_layout, project_columns
+from .report import SalesAggregator
+from .table import SalesTable
+
+LineBatch = Tuple[int, List[str]]
+TableBatch = Tuple[int, SalesTable]
+
+_DONE = object()
+
+
+@dataclass(frozen=True)
+class PipelineResult:
+    """Merged aggregate of one :func:`run_pipeline` call plus its batch count."""
+
+    aggregator: SalesAggregator
+    batches: int
+
+
+class _Failure:
+    """First exception raised by any stage; later stages drain instead of blocking."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.error: Optional[BaseException] = None
+
+    def record(self, error: BaseException) -> None:
+        with self._lock:
+            if self.error is None:
+                self.error = error
+
+
+def _read_header(path: Path) -> List[str]:
+    with open_text(path) as handle:
+        return [field.lstrip(BOM) for field in next(csv.reader([handle.readline()]), [])]
+
+
+def _line_batches(path: Path, batch_lines: int, failure: _Failure) -> Iterator[LineBatch]:
+    """Stage 1 source: numbered batches of raw data lines (the header is skipped)."""
+    try:
+        with open_text(path) as handle:
+            handle.readline()
+            sequence = 0
+            while failure.error is None:
+                lines = list(islice(handle, batch_lines))
+                if not lines:
+                    return
+                yield sequence, lines
+                sequence += 1
+    except Exception as error:  # surfaced by run_pipeline after the stages drain
+        failure.record(error)
+
+
+def _worker(
+    inbox: BoundedBuffer[object], work: Callable[[object], None], failure: _Failure
+) -> Thread:
+    """Thread applying ``work`` to every inbox item until it receives ``_DONE``."""
+
+    def run() -> None:
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                return
+            if failure.error is not None:
+                continue  # keep draining so upstream stages never block on a full buffer
+            try:
+                work(item)
+            except Exception as error:
+                failure.record(error)
+
+    return Thread(target=run, daemon=True)
+
+
+def run_pipeline(
+    path: PathLike,
+    *,
+    parsers: int = 2,
+    aggregators: int = 1,
+    batch_lines: int = TABLE_BATCH_SIZE,
+    buffer_capacity: int = 8,
+    where: Optional[SalesFilter] = None,
+    top_capacity: Optional[int] = None,
+    approximate: bool = False,
+    columns: Optional[Iterable[str]] = None,
+) -> PipelineResult:
+    """Aggregate a CSV through reader -> parser -> aggregator stages joined by bounded buffers.
+
+    A :class:`Producer` thread reads raw line batches, ``parsers`` threads decode them
+    into column batches (``where`` is pushed down), and ``aggregators`` threads fold them
+    into partial :class:`SalesAggregator` instances that are merged at the end.  Each
+    :class:`BoundedBuffer` holds at most ``buffer_capacity`` batches, so a slow stage
+    applies backpressure to the ones before it.  Disk reads overlap parsing; parser
+    threads share the GIL, so for CPU parallelism use :func:`read_sales_table_parallel`.
+
+    With a single aggregator, batches are folded in file order and the report is
+    identical to a sequential pass, ``top_capacity`` estimates included.  With
+    several, partial sums and sketches are merged: totals may differ in the last
+    floating-point digits and the Space-Saving estimates and error bound may differ.  Quoted fields must not contain embedded
+    newlines (batches are cut on raw lines).  Fields outside ``columns`` are not decoded,
+    so report sections built from them come out empty.
+    """
+    if parsers <= 0 or aggregators <= 0 or batch_lines <= 0:
+        raise ValueError("parsers, aggregators and batch_lines must be positive")
+    source = Path(path)
+    layout = header_layout(_read_header(source))
+    projected = project_columns(columns)
+    failure = _Failure()
+    raw: BoundedBuffer[object] = BoundedBuffer(buffer_capacity)
+    parsed: BoundedBuffer[object] = BoundedBuffer(buffer_capacity)
+    partials = [
+        SalesAggregator(top_capacity=top_capacity, approximate=approximate) for _ in range(aggregators)
+    ]
+    counts = [0] * aggregators
+
+    def parse_worker() -> Thread:
+        decoder = DateDecoder()
+
+        def parse(item: object) -> None:
+            sequence, lines = item  # type: ignore[misc]
+            rows = filter(None, csv.reader(lines))
+            parsed.put((sequence, build_table(rows, layout, where=where, decoder=decoder, columns=projected)))
+
+        return _worker(raw, parse, failure)
+
+    def aggregate_worker(index: int) -> Thread:
+        aggregator = partials[index]
+        pending: Dict[int, SalesTable] = {}
+        expected = [0]
+
+        def fold(item: object) -> None:
+            sequence, table = item  # type: ignore[misc]
+            counts[index] += 1
+            if aggregators > 1:
+                aggregator.update(table)
+                return
+            # A single aggregator restores file order so float sums match a sequential pass.
+            pending[sequence] = table
+            while expected[0] in pending:
+                aggregator.update(pending.pop(expected[0]))
+                expected[0] += 1
+
+        return _worker(parsed, fold, failure)
+
+    reader = Producer(raw, _line_batches(source, batch_lines, failure))
+    parse_threads = [parse_worker() for _ in range(parsers)]
+    aggregate_threads = [aggregate_worker(index) for index in range(aggregators)]
+    for thread in (reader, *parse_threads, *aggregate_threads):
+        thread.start()
+
+    reader.join()
+    for _ in parse_threads:
+        raw.put(_DONE)
+    for thread in parse_threads:
+        thread.join()
+    for _ in aggregate_threads:
+        parsed.put(_DONE)
+    for thread in aggregate_threads:
+        thread.join()
+    if failure.error is not None:
+        raise failure.error
+
+    merged = partials[0]
+    for partial in partials[1:]:
+        merged.merge(partial)
+    return PipelineResult(aggregator=merged, batches=sum(counts))
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+
+T = TypeVar("T")
+F = TypeVar("F", bound=Callable[..., Any])
+PathLike = Union[str, Path]
+
+_active: Optional[Profiler] = None
+
+
+class StageStats:
+    """Accumulated measurements for one named stage."""
+
+    __slots__ = ("calls", "rows", "wall", "cpu", "child_wall", "child_cpu", "allocated")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.rows = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.child_wall = 0.0
+        self.child_cpu = 0.0
+        self.allocated = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "rows": self.rows,
+            "wall_seconds": self.wall,
+            "cpu_seconds": self.cpu,
+            "self_wall_seconds": self.wall - self.child_wall,
+            "self_cpu_seconds": self.cpu - self.child_cpu,
+            "allocated_bytes": self.allocated,
+        }
+
+
+class Profiler:
+    """Collects wall time, CPU time, row counts and (optionally) allocations per stage.
+
+    Stages nest: time spent in an inner stage is also reported as the outer stage's
+    child time, so ``self_*`` figures add up without double counting.  Each thread
+    keeps its own stage stack.  With ``track_allocations`` the net bytes allocated
+    (per :mod:`tracemalloc`) inside each stage are recorded, at a noticeable cost.
+    """
+
+    def __init__(self, *, track_allocations: bool = False) -> None:
+        self.track_allocations = track_allocations
+        self.stages: Dict[str, StageStats] = {}
+        self._folded: Dict[str, float] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._elapsed: Optional[float] = None
+
+    def _stack(self) -> List[Tuple[str, float, float, int, List[float]]]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def enter(self, name: str) -> None:
+        memory = tracemalloc.get_traced_memory()[0] if self.track_allocations else 0
+        # The trailing list collects the wall/CPU time of nested stages.
+        self._stack().append((name, time.perf_counter(), time.process_time(), memory, [0.0, 0.0]))
+
+    def exit(self, rows: int = 0) -> None:
+        wall_end = time.perf_counter()
+        cpu_end = time.process_time()
+        stack = self._stack()
+        name, wall_start, cpu_start, memory, children = stack.pop()
+        wall = wall_end - wall_start
+        cpu = cpu_end - cpu_start
+        allocated = tracemalloc.get_traced_memory()[0] - memory if self.track_allocations else 0
+        path = ";".join([frame[0] for frame in stack] + [name])
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            stats.calls += 1
+            stats.rows += rows
+            stats.wall += wall
+            stats.cpu += cpu
+            stats.child_wall += children[0]
+            stats.child_cpu += children[1]
+            stats.allocated += allocated
+            self._folded[path] = self._folded.get(path, 0.0) + wall - children[0]
+        if stack:
+            parent = stack[-1][4]
+            parent[0] += wall
+            parent[1] += cpu
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0) -> Iterator[None]:
+        self.enter(name)
+        try:
+            yield
+        finally:
+            self.exit(rows)
+
+    def add_rows(self, name: str, rows: int) -> None:
+        """Credit ``rows`` to stage ``name`` when the count is only known afterwards."""
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            stats.rows += rows
+
+    def timed_iter(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Yield from ``iterable`` timing each ``next`` call as one row of ``name``."""
+        iterator = iter(iterable)
+        while True:
+            self.enter(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.exit(0)
+                return
+            except BaseException:
+                self.exit(0)
+                raise
+            self.exit(1)
+            yield item
+
+    def timed_call(self, name: str, function: Callable[..., T]) -> Callable[..., T]:
+        """Wrap ``function`` so every call is timed as one row of ``name``."""
+
+        def call(*args: Any, **kwargs: Any) -> T:
+            self.enter(name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.exit(1)
+
+        return call
+
+    def finish(self) -> None:
+        if self._elapsed is None:
+            self._elapsed = time.perf_counter() - self._started
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The timing report: per-stage totals plus folded stacks for flame graphs."""
+        self.finish()
+        return {
+            "elapsed_seconds": self._elapsed,
+            "track_allocations": self.track_allocations,
+            "stages": {name: stats.to_dict() for name, stats in sorted(self.stages.items())},
+            # ``frame;frame;frame <self microseconds>`` lines, as read by flamegraph.pl.
+            "folded": [f"{path} {round(seconds * 1e6)}" for path, seconds in sorted(self._folded.items())],
+        }
+
+    def write_json(self, path: PathLike) -> Path:
+        target = Path(path)
+        target.write_text(json.dumps(self.to_dict(), indent=2) + "\n", encoding="utf-8")
+        return target
+
+
+def current() -> Optional[Profiler]:
+    """The active profiler, or ``None`` when profiling is off (the default)."""
+    return _active
+
+
+@contextmanager
+def profiling(profiler: Optional[Profiler] = None, *, track_allocations: bool = False) -> Iterator[Profiler]:
+    """Activate a profiler for the duration of the block."""
+    global _active
+    profiler = profiler or Profiler(track_allocations=track_allocations)
+    previous = _active
+    started_tracing = profiler.track_allocations and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _active = profiler
+    try:
+        yield profiler
+    finally:
+        _active = previous
+        profiler.finish()
+        if started_tracing:
+            tracemalloc.stop()
+
+
+@contextmanager
+def _stage(profiler: Profiler, name: str, rows: int) -> Iterator[None]:
+    profiler.enter(name)
+    try:
+        yield
+    finally:
+        profiler.exit(rows)
+
+
+class _Off:
+    """Shared no-op context manager returned by :func:`stage` when profiling is off."""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_OFF = _Off()
+
+
+def stage(name: str, rows: int = 0) -> Any:
+    """``with stage("runner.load"):`` -- times the block when a profiler is active."""
+    profiler = _active
+    if profiler is None:
+        return _OFF
+    return _stage(profiler, name, rows)
+
+
+def add_rows(name: str, rows: int) -> None:
+    """Credit ``rows`` to stage ``name`` of the active profiler, if any."""
+    profiler = _active
+    if profiler is not None:
+        profiler.add_rows(name, rows)
+
+
+def profiled(name: str) -> Callable[[F], F]:
+    """Decorator timing each call of a function over ``records`` as stage ``name``.
+
+    When profiling is off the only cost is one global lookup per call.  Rows are
+    counted when the first argument has a length.
+    """
+
+    def decorate(function: F) -> F:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            profiler = _active
+            if profiler is None:
+                return function(*args, **kwargs)
+            rows = len(args[0]) if args and hasattr(args[0], "__len__") else 0
+            profiler.enter(name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.exit(rows)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
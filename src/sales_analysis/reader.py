@@ -1,72 +1,313 @@
 from __future__ import annotations
 
 import csv
-from datetime import date, datetime
+from datetime import date
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, List, Optional, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union, overload
 
+from .compression import open_text
+from .decoding import DateDecoder, StringPool, decode_floats, decode_ints, parse_date, parse_float, parse_int
+from .filters import SalesFilter
 from .models import SaleRecord
+from .profiling import Profiler, add_rows, current, stage
+from .snapshot import load_or_build
+from .table import DATE_COLUMNS, EMPTY_VALUES, FIELDS, NUMERIC_COLUMNS, SalesTable
 
 PathLike = Union[str, Path]
+DateParser = Callable[[str], Optional[date]]
+RawRow = List[str]
+# SaleRecord field -> column position in one file's header.
+Layout = Dict[str, int]
+T = TypeVar("T")
 BOM = "\ufeff"
 DATE_FORMAT = "%m/%d/%y"
+TABLE_BATCH_SIZE = 4096
 
+# SaleRecord field -> CSV header, in file order.
+CSV_COLUMNS: Dict[str, str] = {
+    "row_id": "Row ID",
+    "order_id": "Order ID",
+    "order_date": "Order Date",
+    "ship_date": "Ship Date",
+    "ship_mode": "Ship Mode",
+    "customer_id": "Customer ID",
+    "customer_name": "Customer Name",
+    "segment": "Segment",
+    "country": "Country",
+    "city": "City",
+    "state": "State",
+    "postal_code": "Postal Code",
+    "region": "Region",
+    "product_id": "Product ID",
+    "category": "Category",
+    "sub_category": "Sub-Category",
+    "product_name": "Product Name",
+    "sales": "Sales",
+    "quantity": "Quantity",
+    "discount": "Discount",
+    "profit": "Profit",
+}
 
-def _parse_float(raw: str) -> float:
-    return float(raw) if raw else 0.0
-
-
-def _parse_int(raw: str) -> int:
-    return int(float(raw)) if raw else 0
-
-
-def _parse_date(raw: str) -> Optional[date]:
-    cleaned = raw.strip()
-    if not cleaned:
-        return None
-    # Support both two-digit and four-digit years.
-    for fmt in ("%m/%d/%y", "%m/%d/%Y"):
-        try:
-            return datetime.strptime(cleaned, fmt).date()
-        except ValueError:
-            continue
-    raise ValueError(f"Unsupported date format: {raw}")
-
-
-def read_sales_csv(path: PathLike) -> List[SaleRecord]:
-    """Load sale records from the provided CSV file."""
-    csv_path = Path(path)
-    records: List[SaleRecord] = []
-    with csv_path.open(newline="", encoding="utf-8") as handle:
-        reader: Iterable[dict[str, str]] = csv.DictReader(handle)
-        for row in reader:
-            if not row:
-                continue
-            normalized = {key.lstrip(BOM): value for key, value in row.items()}
-            records.append(
-                SaleRecord(
-                    row_id=normalized["Row ID"],
-                    order_id=normalized["Order ID"],
-                    order_date=_parse_date(normalized["Order Date"]),
-                    ship_date=_parse_date(normalized["Ship Date"]),
-                    ship_mode=normalized["Ship Mode"],
-                    customer_id=normalized["Customer ID"],
-                    customer_name=normalized["Customer Name"],
-                    segment=normalized["Segment"],
-                    country=normalized["Country"],
-                    city=normalized["City"],
-                    state=normalized["State"],
-                    postal_code=normalized["Postal Code"],
-                    region=normalized["Region"],
-                    product_id=normalized["Product ID"],
-                    category=normalized["Category"],
-                    sub_category=normalized["Sub-Category"],
-                    product_name=normalized["Product Name"],
-                    sales=_parse_float(normalized["Sales"]),
-                    quantity=_parse_int(normalized["Quantity"]),
-                    discount=_parse_float(normalized["Discount"]),
-                    profit=_parse_float(normalized["Profit"]),
-                )
-            )
+
+def header_layout(header: Sequence[str]) -> Layout:
+    """Map each ``SaleRecord`` field to its column position in a CSV ``header`` row.
+
+    A BOM on the first header is ignored; fields whose header is absent are left out.
+    """
+    positions = {name.lstrip(BOM): position for position, name in enumerate(header)}
+    return {field: positions[name] for field, name in CSV_COLUMNS.items() if name in positions}
+
+
+def project_columns(columns: Optional[Iterable[str]] = None) -> Tuple[str, ...]:
+    """Validate a column projection and return it in file order (``None`` means every field)."""
+    if columns is None:
+        return FIELDS
+    wanted = set(columns)
+    unknown = sorted(wanted.difference(FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown sale record fields {unknown}; choose from {', '.join(FIELDS)}")
+    return tuple(name for name in FIELDS if name in wanted)
+
+
+def _require(layout: Layout, fields_needed: Iterable[str]) -> None:
+    missing = [CSV_COLUMNS[name] for name in fields_needed if name not in layout]
+    if missing:
+        raise ValueError(f"CSV header is missing columns: {', '.join(missing)}")
+
+
+def _iter_rows(path: PathLike) -> Iterator[RawRow]:
+    """Yield the CSV's rows as lists of fields, header row first, skipping blank lines."""
+    profiler = current()
+    if profiler is not None:
+        yield from _iter_rows_profiled(path, profiler)
+        return
+    with open_text(path) as handle:
+        for row in csv.reader(handle):
+            if row:
+                yield row
+
+
+def _iter_rows_profiled(path: PathLike, profiler: Profiler) -> Iterator[RawRow]:
+    """:func:`_iter_rows` with file reads and CSV tokenizing timed separately."""
+    with open_text(path) as handle:
+        for row in profiler.timed_iter("read.csv", csv.reader(profiler.timed_iter("read.io", handle))):
+            if row:
+                yield row
+
+
+def _unshared(value: str) -> str:
+    return value
+
+
+def _field_decoder(name: str, decode_date: DateParser, share: Callable[[str], str]) -> Callable[[str], object]:
+    if name in DATE_COLUMNS:
+        return decode_date
+    if name == "quantity":
+        return parse_int
+    if name in NUMERIC_COLUMNS:
+        return parse_float
+    # The unique ``Row ID`` and the near-unique ``Order ID`` are stored as read.
+    return _unshared if name in ("row_id", "order_id") else share
+
+
+def record_builder(
+    layout: Layout,
+    decode_date: DateParser = parse_date,
+    share: Callable[[str], str] = _unshared,
+    columns: Optional[Iterable[str]] = None,
+) -> Callable[[RawRow], SaleRecord]:
+    """Return a function turning one positional CSV row into a ``SaleRecord``.
+
+    Only the fields in ``columns`` (default: all) are decoded; every other field keeps
+    its empty value (``""``, ``None`` or ``0``) without touching the row.  ``share``
+    (e.g. a :class:`StringPool`) is applied to every repeating string field.
+    """
+    projected = project_columns(columns)
+    _require(layout, projected)
+    template = [EMPTY_VALUES[name] for name in FIELDS]
+    steps = [(FIELDS.index(name), layout[name], _field_decoder(name, decode_date, share)) for name in projected]
+
+    def build(row: RawRow) -> SaleRecord:
+        values = template.copy()
+        for index, position, decode in steps:
+            values[index] = decode(row[position])
+        return SaleRecord(*values)
+
+    return build
+
+
+def _append_rows(
+    table: SalesTable, rows: List[RawRow], layout: Layout, decoder: DateDecoder, columns: Sequence[str]
+) -> None:
+    """Decode the projected ``columns`` of a batch of raw rows and append it to ``table``."""
+    decoded: Dict[str, Sequence] = {}
+    for name in columns:
+        position = layout[name]
+        raws = [row[position] for row in rows]
+        if name in DATE_COLUMNS:
+            decoded[name] = decoder.decode_days(raws)
+        elif name == "quantity":
+            decoded[name] = decode_ints(raws)
+        elif name in NUMERIC_COLUMNS:
+            decoded[name] = decode_floats(raws)
+        else:
+            decoded[name] = raws
+    table.extend_columns(decoded, len(rows))
+
+
+def _pushdown(
+    rows: Iterable[RawRow], layout: Layout, where: Optional[SalesFilter], decoder: DateDecoder
+) -> Iterable[RawRow]:
+    """Drop non-matching raw rows before any of their other columns are decoded."""
+    if not where:
+        return rows
+    return filter(where.raw_predicate(decoder, layout), rows)
+
+
+def build_table(
+    rows: Iterable[RawRow],
+    layout: Layout,
+    *,
+    where: Optional[SalesFilter] = None,
+    decoder: Optional[DateDecoder] = None,
+    columns: Optional[Iterable[str]] = None,
+) -> SalesTable:
+    """Build a ``SalesTable`` from positional raw rows, decoding in column batches.
+
+    ``layout`` comes from :func:`header_layout`.  Only the fields in ``columns`` are
+    decoded; the others are filled with empty values.  Pass ``decoder`` to reuse one
+    date cache across several calls on the same file.
+    """
+    projected = project_columns(columns)
+    _require(layout, projected)
+    table = SalesTable.empty()
+    decoder = decoder or DateDecoder()
+    rows = _pushdown(rows, layout, where, decoder)
+    for batch in _batched(iter(rows), TABLE_BATCH_SIZE):
+        with stage("read.decode_columns", len(batch)):
+            _append_rows(table, batch, layout, decoder, projected)
+    return table
+
+
+def _table_from_csv(path: PathLike, where: Optional[SalesFilter], columns: Optional[Iterable[str]]) -> SalesTable:
+    rows = _iter_rows(path)
+    header = next(rows, None)
+    if header is None:  # a zero-byte file has no header and no rows
+        return SalesTable.empty()
+    return build_table(rows, header_layout(header), where=where, columns=columns)
+
+
+@overload
+def iter_sales_csv(
+    path: PathLike, *, where: Optional[SalesFilter] = None, columns: Optional[Iterable[str]] = None
+) -> Iterator[SaleRecord]: ...
+
+
+@overload
+def iter_sales_csv(
+    path: PathLike,
+    *,
+    batch_size: int,
+    where: Optional[SalesFilter] = None,
+    columns: Optional[Iterable[str]] = None,
+) -> Iterator[List[SaleRecord]]: ...
+
+
+def iter_sales_csv(
+    path: PathLike,
+    *,
+    batch_size: Optional[int] = None,
+    where: Optional[SalesFilter] = None,
+    columns: Optional[Iterable[str]] = None,
+) -> Union[Iterator[SaleRecord], Iterator[List[SaleRecord]]]:
+    """Lazily yield sale records (or lists of up to ``batch_size`` records).
+
+    Only the current row or batch is held in memory, so arbitrarily large files can be
+    folded into an accumulator such as ``SalesAggregator`` in bounded memory.  Rows
+    rejected by ``where`` are dropped on their raw text, before a record is built.
+    Only the fields in ``columns`` are decoded (the rest stay empty).  Repeating
+    strings and dates are shared between the records of one call.
+    """
+    project_columns(columns)
+    records = _iter_records(path, where, columns)
+    if batch_size is None:
+        return records
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    return _batched(records, batch_size)
+
+
+def _iter_records(
+    path: PathLike, where: Optional[SalesFilter], columns: Optional[Iterable[str]]
+) -> Iterator[SaleRecord]:
+    decoder = DateDecoder()
+    decode_date: DateParser = decoder
+    profiler = current()
+    if profiler is not None:
+        decode_date = profiler.timed_call("read.parse_date", decoder)
+    rows = _iter_rows(path)
+    header = next(rows, None)
+    if header is None:
+        return
+    layout = header_layout(header)
+    build = record_builder(layout, decode_date, StringPool(), columns)
+    if profiler is not None:
+        build = profiler.timed_call("read.build_record", build)
+    yield from map(build, _pushdown(rows, layout, where, decoder))
+
+
+def _batched(items: Iterator[T], size: int) -> Iterator[List[T]]:
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def read_sales_csv(
+    path: PathLike,
+    *,
+    snapshot: bool = False,
+    where: Optional[SalesFilter] = None,
+    columns: Optional[Iterable[str]] = None,
+) -> List[SaleRecord]:
+    """Load sale records from the provided CSV file.
+
+    With ``snapshot=True`` the rows come from the binary snapshot next to the CSV (see
+    :mod:`.snapshot`), which is rebuilt automatically when the CSV changes.  ``where``
+    restricts the rows returned (see :class:`SalesFilter`).  ``columns`` names the
+    ``SaleRecord`` fields to decode; the others are left empty (``""``, ``None`` or
+    ``0``) and are never parsed.  A snapshot always holds every field.
+    """
+    if snapshot:
+        return read_sales_table(path, snapshot=True, where=where).to_records()
+    with stage("read.records"):
+        records = list(iter_sales_csv(path, where=where, columns=columns))
+    add_rows("read.records", len(records))
     return records
 
+
+def read_sales_table(
+    path: PathLike,
+    *,
+    snapshot: bool = False,
+    where: Optional[SalesFilter] = None,
+    columns: Optional[Iterable[str]] = None,
+) -> SalesTable:
+    """Load the CSV file straight into a columnar ``SalesTable``.
+
+    With ``snapshot=True`` a current binary snapshot is memory-mapped instead of parsing
+    the CSV, and a stale or missing one is rebuilt; ``where`` is then applied to the
+    snapshot's columns rather than pushed into the parser, and ``columns`` is ignored,
+    because the snapshot must hold the whole file.  Otherwise only the ``columns``
+    fields are decoded and the others are filled with empty values.
+    """
+    if snapshot:
+        with stage("read.snapshot"):
+            table = load_or_build(path, read_sales_table)
+        return where.filter_table(table) if where else table
+    with stage("read.table"):
+        table = _table_from_csv(path, where, columns)
+    add_rows("read.table", len(table))
+    return table
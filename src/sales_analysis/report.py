@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .models import SaleRecord
+from .profiling import add_rows, stage
+from .sketches import ApproximateSummary, SketchAggregator
+from .table import CategoricalColumn, SalesTable, day_to_month
+from .topn import SpaceSaving, nlargest_totals
+
+STATE_PREVIEW = 5
+_SCALARS = ("row_count", "sales_total", "quantity_total", "discount_total", "profit_total")
+_GROUPS = ("by_region", "by_category", "by_segment", "by_state", "by_product", "by_month")
+
+
+@dataclass(frozen=True)
+class SalesReport:
+    """Every metric printed by the runner, computed together."""
+
+    row_count: int
+    total_sales: float
+    total_quantity: int
+    average_discount: float
+    average_profit: float
+    sales_by_region: Dict[str, float]
+    sales_by_category: Dict[str, float]
+    sales_by_segment: Dict[str, float]
+    sales_by_state: Dict[str, float]
+    top_states: List[Tuple[str, float]]
+    top_products: List[Tuple[str, float]]
+    monthly_sales: Dict[str, float]
+    # Set only in bounded-memory mode: the most any top-product total may be over-counted.
+    top_products_max_error: Optional[float] = None
+    # Set only in approximate mode: sketch-based distinct counts and quantiles.
+    approximate: Optional[ApproximateSummary] = None
+
+
+def _fold_codes(target: Dict[str, float], column: CategoricalColumn, totals: Sequence[float]) -> None:
+    """Store each used code's total under its label, in first-seen row order."""
+    labels = column.values
+    for code in dict.fromkeys(column.codes):
+        target[labels[code]] = totals[code]
+
+
+class SalesAggregator:
+    """Single-pass accumulator for every aggregate, grouped view and trend in the report.
+
+    Feed it records (or whole ``SalesTable`` instances) with :meth:`update`, then call
+    :meth:`report`.  Each input row is visited exactly once no matter how many metrics
+    the report contains.  With ``top_capacity`` set, product totals are tracked by a
+    bounded :class:`SpaceSaving` sketch instead of an exact per-product dict.  With
+    ``approximate=True`` a :class:`SketchAggregator` also estimates distinct customers
+    and orders and sales/profit quantiles in fixed memory.  Every total, monthly buckets
+    included, is summed in row order.
+    """
+
+    def __init__(self, *, top_capacity: Optional[int] = None, approximate: bool = False) -> None:
+        self.row_count = 0
+        self.sales_total = 0.0
+        self.quantity_total = 0
+        self.discount_total = 0.0
+        self.profit_total = 0.0
+        self.by_region: Dict[str, float] = defaultdict(float)
+        self.by_category: Dict[str, float] = defaultdict(float)
+        self.by_segment: Dict[str, float] = defaultdict(float)
+        self.by_state: Dict[str, float] = defaultdict(float)
+        self.by_product: Dict[str, float] = defaultdict(float)
+        self.by_month: Dict[str, float] = defaultdict(float)
+        self.product_sketch = SpaceSaving(top_capacity) if top_capacity else None
+        self.sketches = SketchAggregator() if approximate else None
+        self._month_keys: Dict[date, str] = {}
+
+    def update(self, records: Iterable[SaleRecord]) -> SalesAggregator:
+        """Fold ``records`` into the running totals and return ``self``."""
+        if isinstance(records, SalesTable):
+            return self._update_table(records)
+        if self.sketches is not None:
+            records = self.sketches.tap(records)
+        by_region = self.by_region
+        by_category = self.by_category
+        by_segment = self.by_segment
+        by_state = self.by_state
+        by_product = self.by_product
+        sketch = self.product_sketch
+        by_month = self.by_month
+        month_keys = self._month_keys
+        count = self.row_count
+        sales_total = self.sales_total
+        quantity_total = self.quantity_total
+        discount_total = self.discount_total
+        profit_total = self.profit_total
+        for record in records:
+            sales = record.sales
+            count += 1
+            sales_total += sales
+            quantity_total += record.quantity
+            discount_total += record.discount
+            profit_total += record.profit
+            by_region[record.region] += sales
+            by_category[record.category] += sales
+            by_segment[record.segment] += sales
+            by_state[record.state] += sales
+            if sketch is None:
+                by_product[record.product_name] += sales
+            else:
+                sketch.add(record.product_name, sales)
+            order_date = record.order_date
+            if order_date is not None:
+                month = month_keys.get(order_date)
+                if month is None:
+                    month = month_keys[order_date] = order_date.strftime("%Y-%m")
+                by_month[month] += sales
+        self.row_count = count
+        self.sales_total = sales_total
+        self.quantity_total = quantity_total
+        self.discount_total = discount_total
+        self.profit_total = profit_total
+        return self
+
+    def _update_table(self, table: SalesTable) -> SalesAggregator:
+        if self.sketches is not None:
+            self.sketches.update(table)
+        columns = [
+            (self.by_region, table.categorical("region")),
+            (self.by_category, table.categorical("category")),
+            (self.by_segment, table.categorical("segment")),
+            (self.by_state, table.categorical("state")),
+            (self.by_product, table.categorical("product_name")),
+        ]
+        # Seed each per-code total with the running total for its label, so folding a
+        # table batch by batch sums in exactly the same order as a row-by-row pass.
+        sketch = self.product_sketch
+        region, category, segment, state, product = (
+            [
+                0.0 if target is self.by_product and sketch is not None else target.get(label, 0.0)
+                for label in column.values
+            ]
+            for target, column in columns
+        )
+        by_month = self.by_month
+        for sales, r, c, g, s, p, day in zip(
+            table.sales, *(column.codes for _, column in columns), table.order_day
+        ):
+            region[r] += sales
+            category[c] += sales
+            segment[g] += sales
+            state[s] += sales
+            product[p] += sales
+            if day:
+                by_month[day_to_month(day)] += sales
+        for (target, column), totals in zip(columns, (region, category, segment, state)):
+            _fold_codes(target, column, totals)
+        product_column = columns[-1][1]
+        if sketch is None:
+            _fold_codes(self.by_product, product_column, product)
+        else:
+            # Row by row, like :meth:`update`, so the sketch's evictions and error bound
+            # do not depend on how the rows were batched.
+            labels = product_column.values
+            for code, sales in zip(product_column.codes, table.sales):
+                sketch.add(labels[code], sales)
+        self.row_count += len(table)
+        self.sales_total = sum(table.sales, self.sales_total)
+        self.quantity_total = sum(table.quantity, self.quantity_total)
+        self.discount_total = sum(table.discount, self.discount_total)
+        self.profit_total = sum(table.profit, self.profit_total)
+        return self
+
+    def merge(self, other: SalesAggregator) -> SalesAggregator:
+        """Fold another aggregator's totals into this one and return ``self``.
+
+        Sums are combined per partial, so they can differ from a single row-order pass
+        in the last floating-point digits.
+        """
+        for name in _SCALARS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for name in _GROUPS:
+            target = getattr(self, name)
+            for key, value in getattr(other, name).items():
+                target[key] += value
+        if other.product_sketch is not None:
+            if self.product_sketch is None:
+                self.product_sketch = SpaceSaving(other.product_sketch.capacity)
+            self.product_sketch.merge(other.product_sketch)
+        if other.sketches is not None:
+            if self.sketches is None:
+                self.sketches = SketchAggregator(precision=other.sketches.precision, k=other.sketches.k)
+            self.sketches.merge(other.sketches)
+        return self
+
+    def to_state(self) -> Dict[str, Any]:
+        """Return the running totals as a JSON-serializable dict."""
+        state: Dict[str, Any] = {name: getattr(self, name) for name in _SCALARS}
+        state.update({name: dict(getattr(self, name)) for name in _GROUPS})
+        state["product_sketch"] = self.product_sketch.to_state() if self.product_sketch else None
+        state["sketches"] = self.sketches.to_state() if self.sketches else None
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> SalesAggregator:
+        """Rebuild an aggregator from :meth:`to_state` output."""
+        aggregator = cls()
+        for name in _SCALARS:
+            setattr(aggregator, name, state[name])
+        for name in _GROUPS:
+            getattr(aggregator, name).update(state[name])
+        if state.get("product_sketch"):
+            aggregator.product_sketch = SpaceSaving.from_state(state["product_sketch"])
+        if state.get("sketches"):
+            aggregator.sketches = SketchAggregator.from_state(state["sketches"])
+        return aggregator
+
+    def report(self, *, top_n: int = 5) -> SalesReport:
+        """Finalize the running totals into a ``SalesReport``."""
+        count = self.row_count
+        sketch = self.product_sketch
+        if sketch is None:
+            top_products, max_error = nlargest_totals(self.by_product, top_n), None
+        else:
+            top_products = [(hitter.key, hitter.estimate) for hitter in sketch.top(top_n)]
+            max_error = sketch.max_error
+        return SalesReport(
+            row_count=count,
+            total_sales=self.sales_total,
+            total_quantity=self.quantity_total,
+            average_discount=self.discount_total / count if count else 0.0,
+            average_profit=self.profit_total / count if count else 0.0,
+            sales_by_region=dict(self.by_region),
+            sales_by_category=dict(self.by_category),
+            sales_by_segment=dict(self.by_segment),
+            sales_by_state=dict(self.by_state),
+            top_states=nlargest_totals(self.by_state, STATE_PREVIEW),
+            top_products=top_products,
+            monthly_sales={month: self.by_month[month] for month in sorted(self.by_month)},
+            top_products_max_error=max_error,
+            approximate=self.sketches.summary() if self.sketches else None,
+        )
+
+
+def build_report(
+    records: Iterable[SaleRecord],
+    *,
+    top_n: int = 5,
+    top_capacity: Optional[int] = None,
+    approximate: bool = False,
+) -> SalesReport:
+    """Compute the full sales report in a single pass over ``records``.
+
+    ``top_capacity`` switches the product ranking to a bounded-memory Space-Saving
+    sketch with that many counters; ``approximate`` adds sketch-based distinct counts
+    and quantiles to the report.
+    """
+    aggregator = SalesAggregator(top_capacity=top_capacity, approximate=approximate)
+    with stage("report.aggregate"):
+        aggregator.update(records)
+    add_rows("report.aggregate", aggregator.row_count)
+    with stage("report.finalize"):
+        return aggregator.report(top_n=top_n)
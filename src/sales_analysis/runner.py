@@ -1,65 +1,307 @@
 from __future__ import annotations
 
 import argparse
+import cProfile
+import sys
+from contextlib import contextmanager, redirect_stdout
+from datetime import date
 from pathlib import Path
-from typing import Iterable, List
-
-from .analytics import (
-    average_discount,
-    average_profit,
-    monthly_sales,
-    sales_by_category,
-    sales_by_region,
-    sales_by_segment,
-    sales_by_state,
-    top_n_products_by_sales,
-    total_quantity_sold,
-    total_sales,
-)
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, TextIO, Tuple
+
+from .cache import ResultCache, dataset_fingerprint
+from .compression import detect_codec
+from .dataset import SalesDataset
+from .filters import SalesFilter, month_bounds
+from .incremental import refresh_incremental
 from .models import SaleRecord
-from .reader import read_sales_csv
+from .parallel import read_sales_table_parallel
+from .partials import PARTIAL_COLUMNS, PartialState, merge_partials
+from .pipeline import run_pipeline
+from .profiling import add_rows, profiling, stage
+from .reader import iter_sales_csv, read_sales_csv, read_sales_table
+from .report import STATE_PREVIEW, SalesReport, build_report
+from .sections import (
+    DEFAULT_SECTIONS,
+    FORMATS,
+    SectionData,
+    compute_sections,
+    parse_sections,
+    report_sections,
+    required_columns,
+    write_sections,
+)
+from .snapshot import load_or_build_indexed
+from .table import SalesTable
+from .topn import nlargest_totals
+
+_FILTER_FLAGS = (("region", "regions"), ("category", "categories"), ("state", "states"), ("segment", "segments"))
 
 
 def _format_currency(value: float) -> str:
     return f"${value:,.2f}"
 
 
-def _filter_by_month(records: Iterable[SaleRecord], month: str | None) -> List[SaleRecord]:
+def _filter_by_month(records: Iterable[SaleRecord], month: str | None) -> Iterable[SaleRecord]:
+    """Restrict rows to one YYYY-MM month, lazily unless ``records`` is a SalesTable."""
     if not month:
-        return list(records)
-    return [
-        record
-        for record in records
-        if record.order_date and record.order_date.strftime("%Y-%m") == month
-    ]
+        return records
+    try:
+        where = SalesFilter.for_month(month)
+    except ValueError:
+        return records.take([]) if isinstance(records, SalesTable) else iter(())
+    if isinstance(records, SalesTable):
+        return where.filter_table(records)
+    return (record for record in records if where.matches(record))
+
+
+def _log(message: str) -> None:
+    print(f"[SalesAnalysis] {message}")
+
+
+def _print_totals(totals: SectionData, top_n: int) -> None:
+    _log(f"Total sales: {_format_currency(totals['total_sales'])}")
+    _log(f"Total quantity sold: {totals['total_quantity']} units")
+    _log(f"Average discount: {totals['average_discount']:.2%}")
+    _log(f"Average profit: {_format_currency(totals['average_profit'])}")
 
 
-def run_reports(records: Iterable[SaleRecord], *, top_n: int = 5, month: str | None = None) -> None:
-    """Compute and print all analytics for the provided records."""
-    record_list = _filter_by_month(records, month)
+def _print_top_products(ranked: List[Dict[str, Any]], top_n: int) -> None:
+    products = [(entry["product"], entry["sales"]) for entry in ranked]
+    max_error = ranked[0].get("max_error") if ranked else None
+    if max_error is None:
+        _log(f"Top {top_n} products by sales: {products}")
+    else:
+        _log(
+            f"Top {top_n} products by sales (approximate, each over-counted by at most "
+            f"{_format_currency(max_error)}): {products}"
+        )
 
-    def log(message: str) -> None:
-        print(f"[SalesAnalysis] {message}")
 
-    if not record_list:
-        log(f"No records found for month filter '{month}'." if month else "Dataset is empty.")
+def _print_approximate(summary: Dict[str, Any] | None, top_n: int) -> None:
+    if summary is None:
         return
+    _log(
+        f"Distinct customers: ~{summary['distinct_customers']}, distinct orders: "
+        f"~{summary['distinct_orders']} (standard error {summary['distinct_relative_error']:.1%})"
+    )
+    _log(f"Distinct customers by region: {summary['distinct_customers_by_region']}")
+    _log(f"Distinct orders by region: {summary['distinct_orders_by_region']}")
+    for label, quantiles in (("Sales", summary["sales_quantiles"]), ("Profit", summary["profit_quantiles"])):
+        shown = ", ".join(f"p{fraction * 100:g}={_format_currency(value)}" for fraction, value in quantiles.items())
+        _log(f"{label} per line item: {shown} (rank error <= {summary['quantile_rank_error']:.1%})")
+
+
+# Section -> (heading it is printed under, text printer).
+_TEXT_SECTIONS: Dict[str, Tuple[str, Callable[[Any, int], None]]] = {
+    "totals": ("Aggregate Metrics", _print_totals),
+    "regions": ("Grouped Views", lambda value, _: _log(f"Sales by region: {value}")),
+    "categories": ("Grouped Views", lambda value, _: _log(f"Sales by category: {value}")),
+    "segments": ("Grouped Views", lambda value, _: _log(f"Sales by segment: {value}")),
+    "states": (
+        "Grouped Views",
+        lambda value, _: _log(
+            f"Sales by state (top {STATE_PREVIEW} shown): {dict(nlargest_totals(value, STATE_PREVIEW))}"
+        ),
+    ),
+    "top-products": ("Rankings & Trends", _print_top_products),
+    "monthly": ("Rankings & Trends", lambda value, _: _log(f"Monthly sales (YYYY-MM): {value}")),
+    "approximate": ("Approximate Analytics", _print_approximate),
+}
+
+
+def _print_sections(data: SectionData, *, top_n: int) -> None:
+    heading = None
+    for name, value in data.items():
+        section_heading, printer = _TEXT_SECTIONS[name]
+        if name == "approximate" and value is None:
+            continue
+        if section_heading != heading:
+            heading = section_heading
+            _log(f"==== {heading} ====")
+        printer(value, top_n)
+
+
+def _print_report(report: SalesReport, *, top_n: int) -> None:
+    sections = DEFAULT_SECTIONS + (("approximate",) if report.approximate else ())
+    _print_sections(report_sections(report, sections), top_n=top_n)
+
+
+def run_reports(
+    records: Iterable[SaleRecord],
+    *,
+    top_n: int = 5,
+    month: str | None = None,
+    top_capacity: int | None = None,
+    approximate: bool = False,
+) -> SalesReport | None:
+    """Compute and print all analytics for the provided records.
+
+    All metrics come from a single pass of :class:`SalesAggregator`, so ``records`` may
+    be a lazy stream such as :func:`iter_sales_csv` and is never materialized.  Passing
+    ``top_capacity`` ranks products with a bounded Space-Saving sketch, and
+    ``approximate`` adds HyperLogLog distinct counts and KLL quantiles.  The resulting
+    ``SalesReport`` is returned (``None`` when nothing matched).
+    """
+    report = build_report(
+        _filter_by_month(records, month),
+        top_n=top_n,
+        top_capacity=top_capacity,
+        approximate=approximate,
+    )
+    return _emit_report(report, top_n=top_n, month=month)
+
+
+def _emit_report(report: SalesReport, *, top_n: int, month: str | None = None) -> SalesReport | None:
+    if not report.row_count:
+        _log(f"No records found for month filter '{month}'." if month else "Dataset is empty.")
+        return None
+    with stage("runner.print"):
+        _print_report(report, top_n=top_n)
+    return report
+
+
+def run_sections(
+    records: Iterable[SaleRecord],
+    sections: Sequence[str] = DEFAULT_SECTIONS,
+    *,
+    top_n: int = 5,
+    month: str | None = None,
+    top_capacity: int | None = None,
+    output_format: str = "text",
+    stream: TextIO | None = None,
+) -> SectionData | None:
+    """Compute and emit only ``sections`` of the report (see :mod:`.sections`).
+
+    A strict subset of the sections over an in-memory list or ``SalesTable`` is computed
+    lazily, one analytics call per section; anything else takes the single-pass
+    :class:`SalesAggregator` route so one-shot streams are still read only once.
+    ``output_format`` is ``text`` (the usual log lines), ``json`` (one document) or
+    ``ndjson`` (one line per metric) written to ``stream`` (default stdout).  Returns the
+    section data, or ``None`` when a text report found no rows.
+    """
+    data, row_count = _compute_sections(records, sections, top_n=top_n, month=month, top_capacity=top_capacity)
+    return _emit_sections(data, row_count, top_n=top_n, month=month, output_format=output_format, stream=stream)
+
+
+def _compute_sections(
+    records: Iterable[SaleRecord],
+    sections: Sequence[str],
+    *,
+    top_n: int,
+    month: str | None,
+    top_capacity: int | None,
+) -> Tuple[SectionData, int]:
+    filtered = _filter_by_month(records, month)
+    if isinstance(records, (list, SalesTable)) and not set(DEFAULT_SECTIONS) <= set(sections):
+        rows = filtered if isinstance(filtered, SalesTable) else list(filtered)
+        with stage("report.sections"):
+            return compute_sections(rows, sections, top_n=top_n, top_capacity=top_capacity), len(rows)
+    report = build_report(filtered, top_n=top_n, top_capacity=top_capacity, approximate="approximate" in sections)
+    return report_sections(report, sections), report.row_count
+
+
+def _emit_sections(
+    data: SectionData,
+    row_count: int,
+    *,
+    top_n: int,
+    month: str | None = None,
+    output_format: str = "text",
+    stream: TextIO | None = None,
+) -> SectionData | None:
+    with stage("runner.print"):
+        if output_format != "text":
+            write_sections(data, output_format, stream or sys.stdout)
+            return data
+        if not row_count:
+            _log(f"No records found for month filter '{month}'." if month else "Dataset is empty.")
+            return None
+        _print_sections(data, top_n=top_n)
+    return data
+
 
-    log("==== Aggregate Metrics ====")
-    log(f"Total sales: {_format_currency(total_sales(record_list))}")
-    log(f"Total quantity sold: {total_quantity_sold(record_list)} units")
-    log(f"Average discount: {average_discount(record_list):.2%}")
-    log(f"Average profit: {_format_currency(average_profit(record_list))}")
+def _describe_filter(args: argparse.Namespace) -> str:
+    parts = [f"month={args.month}"] if args.month else []
+    parts += [f"{name}={value.isoformat()}" for name, value in (("from", args.start), ("to", args.end)) if value]
+    for _, plural in _FILTER_FLAGS:
+        if getattr(args, plural):
+            parts.append(f"{plural}={','.join(getattr(args, plural))}")
+    return " ".join(parts)
 
-    log("==== Grouped Views ====")
-    log(f"Sales by region: {sales_by_region(record_list)}")
-    log(f"Sales by category: {sales_by_category(record_list)}")
-    log(f"Sales by segment: {sales_by_segment(record_list)}")
-    log(f"Sales by state (top 5 shown): {dict(sorted(sales_by_state(record_list).items(), key=lambda kv: kv[1], reverse=True)[:5])}")
 
-    log("==== Rankings & Trends ====")
-    log(f"Top {top_n} products by sales: {top_n_products_by_sales(record_list, top_n)}")
-    log(f"Monthly sales (YYYY-MM): {monthly_sales(record_list)}")
+def _build_filter(args: argparse.Namespace) -> SalesFilter:
+    categorical = {
+        plural: getattr(args, plural) for _, plural in _FILTER_FLAGS
+    }
+    start, end = args.start, args.end
+    if args.month:
+        first, last = month_bounds(args.month)
+        start, end = max(start or first, first), min(end or last, last)
+    return SalesFilter(start=start, end=end, **categorical)
+
+
+def _iso_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a YYYY-MM-DD date, got {value!r}") from None
+
+
+def _needed_columns(args: argparse.Namespace, sections: Sequence[str]) -> Tuple[str, ...]:
+    """Fields the run reads: those of ``sections``, plus the order date ``--month`` re-checks."""
+    extra = ("order_date",) if args.month else ()
+    return tuple(dict.fromkeys(required_columns(sections) + extra))
+
+
+def _load_records(
+    args: argparse.Namespace, csv_path: Path, where: SalesFilter, columns: Sequence[str]
+) -> list[SaleRecord] | SalesTable:
+    if args.snapshot:
+        _, index = load_or_build_indexed(
+            csv_path, lambda path: read_sales_table_parallel(path, workers=max(1, args.workers))
+        )
+        return index.select(where)
+    if args.workers > 1:
+        return read_sales_table_parallel(csv_path, workers=args.workers, where=where, columns=columns)
+    if args.columnar:
+        return read_sales_table(csv_path, where=where, columns=columns)
+    return read_sales_csv(csv_path, where=where, columns=columns)
+
+
+def _load_dataset(
+    args: argparse.Namespace, dataset: SalesDataset, where: SalesFilter, columns: Sequence[str]
+) -> list[SaleRecord] | SalesTable:
+    table = dataset.read_table(
+        where=where,
+        workers=args.workers if args.workers > 1 else None,
+        snapshot=args.snapshot,
+        columns=columns,
+    )
+    return table if args.columnar or args.workers > 1 or args.snapshot else table.to_records()
+
+
+@contextmanager
+def _profiled(args: argparse.Namespace) -> Iterator[None]:
+    """Collect stage timings for ``--profile`` and a cProfile dump for ``--cprofile``."""
+    if not args.profile and not args.cprofile:
+        yield
+        return
+    functions = cProfile.Profile() if args.cprofile else None
+    with profiling(track_allocations=args.profile_allocations) as profiler:
+        if functions is not None:
+            functions.enable()
+        try:
+            with stage("runner.total"):
+                yield
+        finally:
+            if functions is not None:
+                functions.disable()
+    if functions is not None:
+        functions.dump_stats(args.cprofile)
+        _log(f"cProfile stats written to {args.cprofile}")
+    if args.profile:
+        profiler.write_json(args.profile)
+        _log(f"Stage timings written to {args.profile}")
 
 
 def main() -> None:
@@ -76,18 +318,308 @@ def main() -> None:
         default=None,
         help="optional YYYY-MM filter (e.g., 2024-01) applied before aggregation",
     )
+    parser.add_argument(
+        "--from",
+        type=_iso_date,
+        default=None,
+        dest="start",
+        metavar="YYYY-MM-DD",
+        help="only rows ordered on or after this date (inclusive; combines with --month)",
+    )
+    parser.add_argument(
+        "--to",
+        type=_iso_date,
+        default=None,
+        dest="end",
+        metavar="YYYY-MM-DD",
+        help="only rows ordered on or before this date (inclusive)",
+    )
+    parser.add_argument(
+        "--data",
+        type=str,
+        default=None,
+        help=(
+            "CSV file, directory of CSV partitions or glob (default: data/sales_sample.csv); "
+            ".gz, .bz2 and .xz files are decompressed while reading; "
+            "partitions outside the date filter are skipped and the rest are read concurrently"
+        ),
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="load the dataset into a columnar SalesTable instead of a list of records",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="stream rows from the CSV into the report aggregators without loading the whole file",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="parse the CSV with N processes over newline-aligned byte ranges (implies --columnar)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="overlap reading, parsing and aggregation in stages joined by bounded buffers",
+    )
+    parser.add_argument(
+        "--parsers",
+        type=int,
+        default=2,
+        help="number of parser threads used by --pipeline",
+    )
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="reuse (or create) a binary snapshot next to the CSV to skip parsing on warm starts",
+    )
+    parser.add_argument(
+        "--incremental",
+        type=Path,
+        default=None,
+        metavar="STATE_FILE",
+        help="append-aware mode: parse only rows added since the run that wrote STATE_FILE",
+    )
+    parser.add_argument(
+        "--emit-state",
+        type=Path,
+        default=None,
+        metavar="OUT.state",
+        help="also write this run's mergeable partial aggregate state (a few KiB) for --merge",
+    )
+    parser.add_argument(
+        "--merge",
+        type=Path,
+        nargs="+",
+        default=None,
+        metavar="STATE",
+        help="report on partial states from --emit-state (e.g. one per node, in data order) "
+        "instead of reading a dataset",
+    )
+    for flag, plural in _FILTER_FLAGS:
+        parser.add_argument(
+            f"--{flag}",
+            action="append",
+            default=None,
+            dest=plural,
+            metavar=flag.upper(),
+            help=f"only read rows whose {flag} matches (repeatable); evaluated inside the CSV reader",
+        )
+    parser.add_argument(
+        "--top-mode",
+        choices=("exact", "approx"),
+        default="exact",
+        help="exact product totals, or a bounded-memory Space-Saving sketch with reported error",
+    )
+    parser.add_argument(
+        "--top-capacity",
+        type=int,
+        default=1000,
+        help="number of counters kept by --top-mode approx",
+    )
+    parser.add_argument(
+        "--approximate",
+        action="store_true",
+        help="add fixed-memory distinct customer/order counts and sales/profit quantiles",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        default=None,
+        metavar="OUT.json",
+        help="write wall/CPU time and row counts per stage (read, parse, aggregate, print) as JSON",
+    )
+    parser.add_argument(
+        "--profile-allocations",
+        action="store_true",
+        help="also record bytes allocated per stage in the --profile report (slower)",
+    )
+    parser.add_argument(
+        "--cprofile",
+        type=Path,
+        default=None,
+        metavar="OUT.prof",
+        help="write a cProfile dump (pstats format, e.g. for snakeviz or flameprof)",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="reuse report results stored in DIR while the dataset's size and mtime are unchanged",
+    )
+    parser.add_argument(
+        "--sections",
+        type=str,
+        default=None,
+        help="comma-separated report sections to compute, e.g. totals,regions,top-products "
+        "(choices: totals, regions, categories, segments, states, top-products, monthly, approximate)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="text",
+        dest="output_format",
+        help="text log lines, one JSON document, or NDJSON (one metric per line); "
+        "with json/ndjson the progress messages go to stderr",
+    )
     args = parser.parse_args()
+    try:
+        sections = parse_sections(args.sections, approximate=args.approximate)
+    except ValueError as error:
+        parser.error(str(error))
+    out = sys.stdout
+    with _profiled(args):
+        if args.output_format == "text":
+            _run(parser, args, sections, out)
+        else:
+            with redirect_stdout(sys.stderr):
+                _run(parser, args, sections, out)
+
+
+def _run(
+    parser: argparse.ArgumentParser, args: argparse.Namespace, sections: Sequence[str], out: TextIO
+) -> None:
+    top_capacity = max(args.top_n, args.top_capacity) if args.top_mode == "approx" else None
+    try:
+        where = _build_filter(args)
+    except ValueError as error:
+        parser.error(str(error))
+    top_n = max(1, args.top_n)
+    columns = PARTIAL_COLUMNS if args.emit_state else _needed_columns(args, sections)
+
+    # Partial states are written from (and merged into) the rows, never from a cached report.
+    cache = ResultCache(directory=args.cache) if args.cache and not (args.emit_state or args.merge) else None
+    cache_key = ""
+
+    def finish(data: SectionData, row_count: int) -> None:
+        if cache is not None:
+            cache.put(cache_key, (data, row_count))
+            _log(f"Result cache miss; stored this report in {args.cache}")
+        _emit_sections(
+            data, row_count, top_n=top_n, month=args.month, output_format=args.output_format, stream=out
+        )
+
+    def emit(records: Iterable[SaleRecord]) -> None:
+        if args.emit_state:
+            partial = PartialState.from_records(
+                _filter_by_month(records, args.month),
+                top_capacity=top_capacity,
+                approximate="approximate" in sections,
+            )
+            emit_partial(partial)
+            return
+        finish(*_compute_sections(records, sections, top_n=top_n, month=args.month, top_capacity=top_capacity))
+
+    def emit_report(report: SalesReport) -> None:
+        finish(report_sections(report, sections), report.row_count)
+
+    def emit_partial(partial: PartialState) -> None:
+        if args.emit_state:
+            partial.write(args.emit_state)
+            _log(f"Wrote partial state for {partial.row_count} rows to {args.emit_state}")
+        emit_report(partial.report(top_n=top_n))
+    if args.incremental and where:
+        parser.error("filters cannot be combined with --incremental (the state covers the whole file)")
+    if args.emit_state and (args.incremental or args.pipeline):
+        parser.error("--emit-state cannot be combined with --incremental or --pipeline")
+
+    if args.merge:
+        if where or args.incremental or args.pipeline:
+            parser.error("--merge reports on the states as written; filters and reading modes do not apply")
+        try:
+            merged = merge_partials([PartialState.read(path) for path in args.merge])
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+        _log(f"Merged {len(args.merge)} partial states covering {merged.row_count} rows\n")
+        emit_partial(merged)
+        return
 
     project_root = Path(__file__).resolve().parents[2]
-    csv_path = project_root / "data" / "sales_sample.csv"
+    source = args.data or project_root / "data" / "sales_sample.csv"
+    dataset = SalesDataset.discover(source)
+    if not dataset.files:
+        parser.error(f"no CSV files found at {source}")
+    csv_path = dataset.files[0].path
+    filter_note = f" filtered by {_describe_filter(args)}" if where else ""
+    if cache is not None and not args.incremental:
+        params = {"sections": sections, "top_n": top_n, "where": where, "top_capacity": top_capacity}
+        cache_key = cache.key(dataset_fingerprint(source), "runner.sections", params)
+        hit = cache.get(cache_key)
+        if hit is not None:
+            _log(f"Result cache hit in {args.cache}; skipping the dataset read\n")
+            data, row_count = hit
+            _emit_sections(
+                data, row_count, top_n=top_n, month=args.month, output_format=args.output_format, stream=out
+            )
+            return
+    elif cache is not None:
+        cache = None  # incremental runs keep their own state file
+    if len(dataset) > 1:
+        if args.incremental:
+            parser.error("--incremental needs a single CSV file, not a partitioned dataset")
+        if args.pipeline:
+            parser.error("--pipeline needs a single CSV file, not a partitioned dataset")
+        kept = len(dataset.prune(where))
+        _log(f"Dataset {source}: reading {kept} of {len(dataset)} partitions{filter_note}")
+        if args.stream:
+            records: Iterable[SaleRecord] = dataset.iter_records(where=where, columns=columns)
+        else:
+            with stage("runner.load"):
+                records = _load_dataset(args, dataset, where, columns)
+            add_rows("runner.load", len(records))
+            _log(f"Loaded {len(records)} rows; generating analytics log...\n")
+        emit(records)
+        return
+
+    if args.incremental:
+        if detect_codec(csv_path) is not None:
+            parser.error("--incremental needs an uncompressed CSV file")
+        with stage("runner.incremental"):
+            result = refresh_incremental(
+                csv_path, args.incremental, top_capacity=top_capacity, approximate="approximate" in sections
+            )
+        action = "Rebuilt" if result.rebuilt else "Refreshed"
+        _log(
+            f"{action} incremental state {args.incremental} from {csv_path}: "
+            f"+{result.rows_added} rows ({result.bytes_read} bytes parsed)\n"
+        )
+        emit_report(result.aggregator.report(top_n=top_n))
+        return
+
+    if args.pipeline:
+        _log(f"Pipelining {csv_path} through {args.parsers} parser threads{filter_note}")
+        with stage("runner.pipeline"):
+            pipelined = run_pipeline(
+                csv_path,
+                parsers=max(1, args.parsers),
+                where=where,
+                top_capacity=top_capacity,
+                approximate="approximate" in sections,
+                columns=columns,
+            )
+        _log(f"Folded {pipelined.batches} batches; generating analytics log...\n")
+        emit_report(pipelined.aggregator.report(top_n=top_n))
+        return
+
+    if args.stream:
+        print(f"[SalesAnalysis] Streaming dataset from {csv_path}; generating analytics log...{filter_note}\n")
+        emit(iter_sales_csv(csv_path, where=where, columns=columns))
+        return
+
     print(f"[SalesAnalysis] Loading dataset from {csv_path}")
-    records = read_sales_csv(csv_path)
+    with stage("runner.load"):
+        records = _load_records(args, csv_path, where, columns)
+    add_rows("runner.load", len(records))
     print(
         f"[SalesAnalysis] Loaded {len(records)} rows; generating analytics log..."
-        + (f" filtered by month={args.month}" if args.month else "")
+        + filter_note
         + "\n"
     )
-    run_reports(records, top_n=max(1, args.top_n), month=args.month)
+    emit(records)
 
 
 if __name__ == "__main__":
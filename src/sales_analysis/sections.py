@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from .analytics import (
+    average_discount,
+    average_profit,
+    monthly_sales,
+    sales_by_category,
+    sales_by_region,
+    sales_by_segment,
+    sales_by_state,
+    top_n_products_by_sales,
+    total_quantity_sold,
+    total_sales,
+)
+from .models import SaleRecord
+from .report import SalesReport
+from .sketches import SketchAggregator
+from .table import FIELDS
+from .topn import approximate_top_n_by
+
+# Every report section in print order; ``approximate`` is opt-in.
+SECTIONS = ("totals", "regions", "categories", "segments", "states", "top-products", "monthly", "approximate")
+DEFAULT_SECTIONS = SECTIONS[:-1]
+FORMATS = ("text", "json", "ndjson")
+
+# SaleRecord fields each section reads; the readers decode nothing else (see ``required_columns``).
+SECTION_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "totals": ("sales", "quantity", "discount", "profit"),
+    "regions": ("region", "sales"),
+    "categories": ("category", "sales"),
+    "segments": ("segment", "sales"),
+    "states": ("state", "sales"),
+    "top-products": ("product_name", "sales"),
+    "monthly": ("order_date", "sales"),
+    "approximate": ("region", "customer_id", "order_id", "sales", "profit"),
+}
+
+SectionData = Dict[str, Any]
+
+
+def parse_sections(text: Optional[str], *, approximate: bool = False) -> Tuple[str, ...]:
+    """Turn ``"totals,regions"`` into a section tuple in print order.
+
+    ``None`` selects the default sections; ``approximate`` adds the sketch section.
+    """
+    if text is None:
+        return DEFAULT_SECTIONS + (("approximate",) if approximate else ())
+    requested = {name.strip() for name in text.split(",") if name.strip()}
+    unknown = sorted(requested.difference(SECTIONS))
+    if unknown or not requested:
+        raise ValueError(f"unknown report sections {unknown or [text]}; choose from {', '.join(SECTIONS)}")
+    if approximate:
+        requested.add("approximate")
+    return tuple(name for name in SECTIONS if name in requested)
+
+
+def required_columns(sections: Sequence[str]) -> Tuple[str, ...]:
+    """``SaleRecord`` fields needed to compute ``sections``, in file order."""
+    needed = {column for name in sections for column in SECTION_COLUMNS[name]}
+    return tuple(name for name in FIELDS if name in needed)
+
+
+def _ranking(pairs: Iterable[Tuple[str, float]], max_error: Optional[float]) -> List[Dict[str, Any]]:
+    ranked = []
+    for product, sales in pairs:
+        entry: Dict[str, Any] = {"product": product, "sales": sales}
+        if max_error is not None:
+            entry["max_error"] = max_error
+        ranked.append(entry)
+    return ranked
+
+
+def compute_sections(
+    records: Sequence[SaleRecord],
+    sections: Sequence[str],
+    *,
+    top_n: int = 5,
+    top_capacity: Optional[int] = None,
+) -> SectionData:
+    """Compute only the requested ``sections`` over an in-memory list or ``SalesTable``.
+
+    Each section is one call of the matching analytics function, so asking for
+    ``totals`` never builds the per-month or per-state dicts.  ``records`` is read once
+    per section and must therefore not be a one-shot iterator.
+    """
+    builders: Dict[str, Callable[[], Any]] = {
+        "totals": lambda: {
+            "rows": len(records),
+            "total_sales": total_sales(records),
+            "total_quantity": total_quantity_sold(records),
+            "average_discount": average_discount(records),
+            "average_profit": average_profit(records),
+        },
+        "regions": lambda: sales_by_region(records),
+        "categories": lambda: sales_by_category(records),
+        "segments": lambda: sales_by_segment(records),
+        "states": lambda: sales_by_state(records),
+        "top-products": lambda: _top_products(records, top_n, top_capacity),
+        "monthly": lambda: monthly_sales(records),
+        "approximate": lambda: asdict(SketchAggregator().update(records).summary()),
+    }
+    return {name: builders[name]() for name in sections}
+
+
+def _top_products(records: Sequence[SaleRecord], n: int, capacity: Optional[int]) -> List[Dict[str, Any]]:
+    if capacity is None:
+        return _ranking(top_n_products_by_sales(records, n), None)
+    hitters, max_error = approximate_top_n_by(records, "product_name", n, capacity=capacity)
+    return _ranking(((hitter.key, hitter.estimate) for hitter in hitters), max_error)
+
+
+def report_sections(report: SalesReport, sections: Sequence[str]) -> SectionData:
+    """Pick ``sections`` out of an already computed ``SalesReport``."""
+    builders: Dict[str, Callable[[], Any]] = {
+        "totals": lambda: {
+            "rows": report.row_count,
+            "total_sales": report.total_sales,
+            "total_quantity": report.total_quantity,
+            "average_discount": report.average_discount,
+            "average_profit": report.average_profit,
+        },
+        "regions": lambda: report.sales_by_region,
+        "categories": lambda: report.sales_by_category,
+        "segments": lambda: report.sales_by_segment,
+        "states": lambda: report.sales_by_state,
+        "top-products": lambda: _ranking(report.top_products, report.top_products_max_error),
+        "monthly": lambda: report.monthly_sales,
+        "approximate": lambda: asdict(report.approximate) if report.approximate else None,
+    }
+    return {name: builders[name]() for name in sections}
+
+
+def ndjson_lines(data: SectionData) -> Iterator[str]:
+    """Flatten ``data`` to JSON lines: one per mapping key, ranking entry or scalar."""
+    for section, value in data.items():
+        if isinstance(value, dict):
+            for key, item in value.items():
+                yield json.dumps({"section": section, "key": key, "value": item})
+        elif isinstance(value, list):
+            for rank, entry in enumerate(value, start=1):
+                yield json.dumps({"section": section, "rank": rank, **entry})
+        else:
+            yield json.dumps({"section": section, "value": value})
+
+
+def write_sections(data: SectionData, output_format: str, stream: TextIO) -> None:
+    """Write ``data`` to ``stream`` as one JSON document or as NDJSON lines."""
+    if output_format == "json":
+        json.dump(data, stream)
+        stream.write("\n")
+    elif output_format == "ndjson":
+        for line in ndjson_lines(data):
+            stream.write(line + "\n")
+    else:
+        raise ValueError(f"unsupported output format {output_format!r}; expected json or ndjson")
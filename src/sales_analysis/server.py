@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from socketserver import BaseServer, ThreadingMixIn, UnixStreamServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .analytics import monthly_sales
+from .cache import ResultCache, dataset_fingerprint
+from .dataset import SalesDataset
+from .date_index import DateIndex
+from .filters import SalesFilter, month_bounds
+from .groupby import group_by
+from .reader import PathLike
+from .sections import DEFAULT_SECTIONS, compute_sections, parse_sections
+from .table import NUMERIC_COLUMNS, STRING_COLUMNS, SalesTable
+from .timeseries import time_series
+from .topn import top_n_by
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_POLL_SECONDS = 2.0
+
+Params = Dict[str, List[str]]
+Response = Tuple[int, Any]
+
+_FILTER_PARAMS = {"region": "regions", "category": "categories", "state": "states", "segment": "segments"}
+
+
+@dataclass(frozen=True)
+class _Resident:
+    """One loaded version of the dataset; replaced as a whole on reload."""
+
+    fingerprint: str
+    table: SalesTable
+    index: DateIndex
+    loaded_at: float
+
+    def rows(self, where: SalesFilter) -> SalesTable:
+        return self.index.select(where)
+
+
+def _values(params: Params, name: str) -> List[str]:
+    """Repeated and comma-separated values of one query parameter."""
+    return [item.strip() for value in params.get(name, []) for item in value.split(",") if item.strip()]
+
+
+def _one(params: Params, name: str, default: Optional[str] = None) -> Optional[str]:
+    values = params.get(name)
+    return values[-1] if values else default
+
+
+def _int(params: Params, name: str, default: int) -> int:
+    value = _one(params, name)
+    try:
+        return default if value is None else int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}") from None
+
+
+def query_filter(params: Params) -> SalesFilter:
+    """Build a ``SalesFilter`` from ``month``, ``from``/``to`` (ISO dates) and categorical params."""
+    start = end = None
+    month = _one(params, "month")
+    if month:
+        start, end = month_bounds(month)
+    try:
+        if _one(params, "from"):
+            start = max(start or date.min, date.fromisoformat(_one(params, "from") or ""))
+        if _one(params, "to"):
+            end = min(end or date.max, date.fromisoformat(_one(params, "to") or ""))
+    except ValueError:
+        raise ValueError("from and to must be YYYY-MM-DD dates") from None
+    categorical = {plural: _values(params, name) or None for name, plural in _FILTER_PARAMS.items()}
+    return SalesFilter(start=start, end=end, **categorical)  # type: ignore[arg-type]
+
+
+class SalesServer:
+    """Keeps one dataset resident as a ``SalesTable`` and answers analytics queries.
+
+    :meth:`query` is safe to call from many threads: each request reads the current
+    :class:`_Resident` once, and :meth:`reload` builds the new table before swapping the
+    reference, so in-flight queries finish on the version they started with.  Date
+    ranges are cut from a :class:`DateIndex` built at load time (``/totals`` over a pure
+    date range is two binary searches), and answers are memoized per dataset
+    fingerprint in a :class:`ResultCache`.
+    """
+
+    def __init__(
+        self, source: PathLike, *, snapshot: bool = False, cache: Optional[ResultCache] = None
+    ) -> None:
+        self.source = source
+        self.snapshot = snapshot
+        self.cache = cache if cache is not None else ResultCache()
+        self.reloads = 0
+        self._reload_lock = threading.Lock()
+        self._resident = self._load(dataset_fingerprint(source))
+        self._routes: Dict[str, Callable[[_Resident, SalesFilter, Params], Any]] = {
+            "/totals": self._totals,
+            "/report": self._report,
+            "/group": self._group,
+            "/top": self._top,
+            "/monthly": lambda resident, where, params: monthly_sales(resident.rows(where)),
+            "/series": self._series,
+        }
+
+    def _load(self, fingerprint: str) -> _Resident:
+        table = SalesDataset.discover(self.source).read_table(snapshot=self.snapshot)
+        return _Resident(fingerprint=fingerprint, table=table, index=DateIndex(table), loaded_at=time.time())
+
+    @property
+    def table(self) -> SalesTable:
+        return self._resident.table
+
+    def reload(self, *, force: bool = False) -> bool:
+        """Re-read the dataset if its fingerprint changed (or ``force``); return whether it did."""
+        with self._reload_lock:
+            fingerprint = dataset_fingerprint(self.source)
+            if not force and fingerprint == self._resident.fingerprint:
+                return False
+            self._resident = self._load(fingerprint)
+            self.reloads += 1
+            return True
+
+    def query(self, path: str, params: Params) -> Response:
+        """Answer one request; returns an HTTP status and a JSON-ready body."""
+        resident = self._resident
+        if path == "/health":
+            stats = self.cache.stats()
+            return 200, {
+                "rows": len(resident.table),
+                "fingerprint": resident.fingerprint,
+                "loaded_at": resident.loaded_at,
+                "reloads": self.reloads,
+                "cache": {"hits": stats.hits, "misses": stats.misses, "entries": stats.entries},
+            }
+        route = self._routes.get(path)
+        if route is None:
+            return 404, {"error": f"unknown endpoint {path}", "endpoints": ["/health", *self._routes]}
+        try:
+            where = query_filter(params)
+            # Filter values are sets; every other parameter (``by``, ``sections``) is ordered.
+            canonical = {
+                name: sorted(values) if name in _FILTER_PARAMS else values for name, values in params.items()
+            }
+            key = ResultCache.key(resident.fingerprint, path, canonical)
+            body = self.cache.get(key)
+            if body is None:
+                body = route(resident, where, params)
+                self.cache.put(key, body)
+        except ValueError as error:
+            return 400, {"error": str(error)}
+        return 200, body
+
+    def _totals(self, resident: _Resident, where: SalesFilter, params: Params) -> Any:
+        """Totals for a pure date range come from the index's prefix sums in O(log n)."""
+        if replace(where, start=None, end=None) or (where.start is None and where.end is None):
+            return compute_sections(resident.rows(where), ("totals",))["totals"]
+        totals = resident.index.totals(where.start, where.end)
+        return {
+            "rows": totals.rows,
+            "total_sales": totals.sales,
+            "total_quantity": totals.quantity,
+            "average_discount": totals.average_discount,
+            "average_profit": totals.average_profit,
+        }
+
+    def _report(self, resident: _Resident, where: SalesFilter, params: Params) -> Any:
+        text = ",".join(_values(params, "sections")) or None
+        sections = parse_sections(text) if text else DEFAULT_SECTIONS
+        return compute_sections(resident.rows(where), sections, top_n=_int(params, "top_n", 5))
+
+    def _group(self, resident: _Resident, where: SalesFilter, params: Params) -> Any:
+        keys = _values(params, "by") or ["region"]
+        metric = _one(params, "metric", "sales") or "sales"
+        aggregation = _one(params, "agg", "sum") or "sum"
+        groups = group_by(resident.rows(where), keys, {"value": (metric, aggregation)})
+        return {"keys": keys, "groups": [{"key": list(key), **values} for key, values in groups.items()]}
+
+    def _top(self, resident: _Resident, where: SalesFilter, params: Params) -> Any:
+        key = _one(params, "by", "product_name") or "product_name"
+        metric = _one(params, "metric", "sales") or "sales"
+        if key not in STRING_COLUMNS or metric not in NUMERIC_COLUMNS:
+            raise ValueError(f"cannot rank {key!r} by {metric!r}")
+        ranked = top_n_by(resident.rows(where), key, _int(params, "n", 5), metric=metric)
+        return [{"key": name, "value": value} for name, value in ranked]
+
+    def _series(self, resident: _Resident, where: SalesFilter, params: Params) -> Any:
+        granularity = _one(params, "granularity", "month") or "month"
+        series = time_series(resident.rows(where), granularity, _one(params, "metric", "sales") or "sales")
+        body: Dict[str, Any] = {"granularity": granularity, "metric": series.metric, "series": series.to_dict()}
+        window = _int(params, "window", 0)
+        if window:
+            body["rolling"] = series.rolling(window, mean=_one(params, "mean") in ("1", "true"))
+        if _one(params, "yoy") in ("1", "true"):
+            body["year_over_year"] = series.year_over_year()
+        return body
+
+    def watch(self, interval: float = DEFAULT_POLL_SECONDS) -> threading.Event:
+        """Start a daemon thread reloading on change every ``interval`` seconds; set the event to stop."""
+        stop = threading.Event()
+
+        def run() -> None:
+            while not stop.wait(interval):
+                try:
+                    if self.reload():
+                        _log(f"Reloaded {self.source}: {len(self.table)} rows")
+                except (OSError, ValueError) as error:  # keep serving the previous version
+                    _log(f"Reload of {self.source} failed, still serving the previous data: {error}")
+
+        threading.Thread(target=run, name="sales-reload", daemon=True).start()
+        return stop
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "SalesAnalysis/1"
+    sales: SalesServer
+
+    def _send(self, status: int, body: Any) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        self._send(*self.sales.query(url.path, parse_qs(url.query)))
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path != "/reload":
+            self._send(404, {"error": "only /reload accepts POST"})
+            return
+        try:
+            reloaded = self.sales.reload(force=True)
+        except (OSError, ValueError) as error:
+            self._send(500, {"error": str(error)})
+            return
+        self._send(200, {"reloaded": reloaded, "rows": len(self.sales.table)})
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - signature from the base class
+        pass
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(
+    sales: SalesServer, *, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, socket_path: Optional[PathLike] = None
+) -> BaseServer:
+    """HTTP server answering from ``sales`` on ``host:port`` or on a Unix socket."""
+    handler = type("SalesHandler", (_Handler,), {"sales": sales})
+    if socket_path is not None:
+        Path(socket_path).unlink(missing_ok=True)
+        return _UnixHTTPServer(str(socket_path), handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def _log(message: str) -> None:
+    print(f"[SalesAnalysis] {message}", flush=True)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve sales analytics from a dataset kept in memory")
+    parser.add_argument("--data", type=str, default=None, help="CSV file, directory of partitions or glob")
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST, help="address to bind (default: localhost only)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port")
+    parser.add_argument("--socket", type=Path, default=None, help="serve on this Unix socket instead of TCP")
+    parser.add_argument("--snapshot", action="store_true", help="load through the binary snapshot cache")
+    parser.add_argument(
+        "--poll", type=float, default=DEFAULT_POLL_SECONDS, help="seconds between checks for a changed dataset"
+    )
+    args = parser.parse_args(argv)
+
+    source = args.data or Path(__file__).resolve().parents[2] / "data" / "sales_sample.csv"
+    if not SalesDataset.discover(source).files:
+        parser.error(f"no CSV files found at {source}")
+    sales = SalesServer(source, snapshot=args.snapshot)
+    server = make_server(sales, host=args.host, port=args.port, socket_path=args.socket)
+    stop = sales.watch(args.poll)
+    where = args.socket or f"http://{args.host}:{args.port}"
+    _log(f"Serving {len(sales.table)} rows from {source} at {where} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
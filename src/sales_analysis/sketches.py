@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .models import SaleRecord
+from .table import SalesTable
+
+DEFAULT_PRECISION = 12
+DEFAULT_K = 200
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """Distinct-count sketch using ``2 ** precision`` one-byte registers.
+
+    The relative standard error is ``1.04 / sqrt(2 ** precision)`` (about 1.6% at the
+    default precision of 12, i.e. 4 KiB per sketch); small cardinalities fall back to
+    linear counting and are close to exact.  Sketches with equal precision merge
+    losslessly by taking the register-wise maximum.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION) -> None:
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    @property
+    def relative_error(self) -> float:
+        """One standard error of :meth:`estimate`, as a fraction of the true count."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, value: str) -> None:
+        self.add_hash(_hash64(value))
+
+    def add_hash(self, hashed: int) -> None:
+        """Add a value already hashed to 64 bits (lets callers hash each distinct key once)."""
+        width = 64 - self.precision
+        index = hashed >> width
+        rank = width - (hashed & ((1 << width) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self) -> float:
+        registers = self.registers
+        size = len(registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        raw = alpha * size * size / sum(2.0 ** -register for register in registers)
+        zeros = registers.count(0)
+        if raw <= 2.5 * size and zeros:
+            return size * math.log(size / zeros)
+        return raw
+
+    def merge(self, other: HyperLogLog) -> HyperLogLog:
+        if other.precision != self.precision:
+            raise ValueError("cannot merge HyperLogLog sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"precision": self.precision, "registers": self.registers.hex()}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> HyperLogLog:
+        sketch = cls(state["precision"])
+        sketch.registers = bytearray.fromhex(state["registers"])
+        return sketch
+
+
+class KLLSketch:
+    """Mergeable KLL quantile sketch holding O(k) values regardless of stream length.
+
+    Level ``h`` stores items of weight ``2 ** h``; a full level is sorted and every other
+    item (random offset) is promoted to the next level.  With the default ``k = 200``
+    the rank of any returned quantile is within :attr:`rank_error` (about 1.3% of the
+    count) of the requested rank with 99% confidence.  The exact minimum and maximum
+    are always kept.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, *, seed: int = 0) -> None:
+        if k < 8:
+            raise ValueError("k must be at least 8")
+        self.k = k
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._levels: List[List[float]] = [[]]
+        self._rng = random.Random(seed)
+
+    @property
+    def rank_error(self) -> float:
+        """Normalized rank error at 99% confidence (empirical fit for KLL, k >= 8)."""
+        return 2.296 / self.k ** 0.9723
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self._levels[0].append(value)
+        if len(self._levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def update(self, values: Iterable[float]) -> KLLSketch:
+        for value in values:
+            self.add(value)
+        return self
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append([])
+                items.sort()
+                # An odd leftover stays behind so the total weight is preserved exactly.
+                keep = [items.pop()] if len(items) % 2 else []
+                self._levels[level + 1].extend(items[self._rng.randrange(2) :: 2])
+                self._levels[level] = keep
+            level += 1
+
+    def _weighted(self) -> List[tuple]:
+        return sorted(
+            (value, 1 << level) for level, items in enumerate(self._levels) for value in items
+        )
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Approximate value at ``fraction`` (0..1) of the distribution; ``None`` when empty."""
+        if not 0.0 <= fraction <= 1.0:
+            raise ValueError("fraction must be between 0 and 1")
+        return self.quantiles([fraction])[0]
+
+    def quantiles(self, fractions: Sequence[float]) -> List[Optional[float]]:
+        if not self.count:
+            return [None] * len(fractions)
+        weighted = self._weighted()
+        results: List[Optional[float]] = []
+        for fraction in fractions:
+            if fraction <= 0.0:
+                results.append(self.min)
+                continue
+            if fraction >= 1.0:
+                results.append(self.max)
+                continue
+            target = fraction * self.count
+            seen = 0
+            for value, weight in weighted:
+                seen += weight
+                if seen >= target:
+                    results.append(value)
+                    break
+            else:
+                results.append(self.max)
+        return results
+
+    def merge(self, other: KLLSketch) -> KLLSketch:
+        if other.k != self.k:
+            raise ValueError("cannot merge KLL sketches with different k")
+        while len(self._levels) < len(other._levels):
+            self._levels.append([])
+        for level, items in enumerate(other._levels):
+            self._levels[level].extend(items)
+        self.count += other.count
+        for bound in (other.min, other.max):
+            if bound is not None:
+                self.min = bound if self.min is None else min(self.min, bound)
+                self.max = bound if self.max is None else max(self.max, bound)
+        self._compress()
+        return self
+
+    def __len__(self) -> int:
+        """Number of values retained (not the stream length, see :attr:`count`)."""
+        return sum(len(items) for items in self._levels)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"k": self.k, "count": self.count, "min": self.min, "max": self.max, "levels": self._levels}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> KLLSketch:
+        sketch = cls(state["k"])
+        sketch.count = state["count"]
+        sketch.min = state["min"]
+        sketch.max = state["max"]
+        sketch._levels = [list(items) for items in state["levels"]]
+        return sketch
+
+
+@dataclass(frozen=True)
+class ApproximateSummary:
+    """Sketch-based distinct counts and quantiles with their error bounds."""
+
+    distinct_customers: int
+    distinct_orders: int
+    distinct_customers_by_region: Dict[str, int]
+    distinct_orders_by_region: Dict[str, int]
+    sales_quantiles: Dict[float, Optional[float]]
+    profit_quantiles: Dict[float, Optional[float]]
+    # One standard error of every distinct count, relative to the true count.
+    distinct_relative_error: float
+    # 99%-confidence rank error of every quantile, as a fraction of the row count.
+    quantile_rank_error: float
+
+
+class SketchAggregator:
+    """Fixed-memory distinct counts and quantiles, mergeable across partial runs.
+
+    Tracks HyperLogLog sketches of ``customer_id`` and ``order_id`` overall and per
+    region, plus KLL sketches of line-item ``sales`` and ``profit``.  Memory depends on
+    ``precision``, ``k`` and the number of regions, not on the number of rows.
+    """
+
+    def __init__(self, *, precision: int = DEFAULT_PRECISION, k: int = DEFAULT_K) -> None:
+        self.precision = precision
+        self.k = k
+        self.customers: Dict[str, HyperLogLog] = {}
+        self.orders: Dict[str, HyperLogLog] = {}
+        self.sales = KLLSketch(k)
+        self.profit = KLLSketch(k, seed=1)
+
+    def _region(self, sketches: Dict[str, HyperLogLog], region: str) -> HyperLogLog:
+        sketch = sketches.get(region)
+        if sketch is None:
+            sketch = sketches[region] = HyperLogLog(self.precision)
+        return sketch
+
+    def tap(self, records: Iterable[SaleRecord]) -> Iterator[SaleRecord]:
+        """Yield ``records`` unchanged while folding each one into the sketches."""
+        for record in records:
+            self._region(self.customers, record.region).add(record.customer_id)
+            self._region(self.orders, record.region).add(record.order_id)
+            self.sales.add(record.sales)
+            self.profit.add(record.profit)
+            yield record
+
+    def update(self, records: Iterable[SaleRecord]) -> SketchAggregator:
+        """Fold ``records`` (or a ``SalesTable``) into the sketches and return ``self``."""
+        if isinstance(records, SalesTable):
+            return self._update_table(records)
+        for _ in self.tap(records):
+            pass
+        return self
+
+    def _update_table(self, table: SalesTable) -> SketchAggregator:
+        regions = table.categorical("region")
+        for name, target in (("customer_id", self.customers), ("order_id", self.orders)):
+            column = table.categorical(name)
+            # HyperLogLog ignores repeats, so each distinct (region, key) pair is hashed once.
+            for region, code in dict.fromkeys(zip(regions.codes, column.codes)):
+                self._region(target, regions.values[region]).add_hash(_hash64(column.values[code]))
+        self.sales.update(table.sales)
+        self.profit.update(table.profit)
+        return self
+
+    def merge(self, other: SketchAggregator) -> SketchAggregator:
+        for mine, theirs in ((self.customers, other.customers), (self.orders, other.orders)):
+            for region, sketch in theirs.items():
+                self._region(mine, region).merge(sketch)
+        self.sales.merge(other.sales)
+        self.profit.merge(other.profit)
+        return self
+
+    def summary(self, quantiles: Sequence[float] = QUANTILES) -> ApproximateSummary:
+        def union(sketches: Dict[str, HyperLogLog]) -> int:
+            total = HyperLogLog(self.precision)
+            for sketch in sketches.values():
+                total.merge(sketch)
+            return round(total.estimate())
+
+        return ApproximateSummary(
+            distinct_customers=union(self.customers),
+            distinct_orders=union(self.orders),
+            distinct_customers_by_region={
+                region: round(sketch.estimate()) for region, sketch in self.customers.items()
+            },
+            distinct_orders_by_region={
+                region: round(sketch.estimate()) for region, sketch in self.orders.items()
+            },
+            sales_quantiles=dict(zip(quantiles, self.sales.quantiles(quantiles))),
+            profit_quantiles=dict(zip(quantiles, self.profit.quantiles(quantiles))),
+            distinct_relative_error=HyperLogLog(self.precision).relative_error,
+            quantile_rank_error=self.sales.rank_error,
+        )
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "precision": self.precision,
+            "k": self.k,
+            "customers": {region: sketch.to_state() for region, sketch in self.customers.items()},
+            "orders": {region: sketch.to_state() for region, sketch in self.orders.items()},
+            "sales": self.sales.to_state(),
+            "profit": self.profit.to_state(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> SketchAggregator:
+        aggregator = cls(precision=state["precision"], k=state["k"])
+        for name in ("customers", "orders"):
+            getattr(aggregator, name).update(
+                {region: HyperLogLog.from_state(sketch) for region, sketch in state[name].items()}
+            )
+        aggregator.sales = KLLSketch.from_state(state["sales"])
+        aggregator.profit = KLLSketch.from_state(state["profit"])
+        return aggregator
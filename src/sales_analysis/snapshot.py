@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .date_index import INDEX_ARRAYS, DateIndex
+from .table import DATE_COLUMNS, NUMERIC_COLUMNS, STRING_COLUMNS, CategoricalColumn, SalesTable
+
+PathLike = Union[str, Path]
+
+SNAPSHOT_SUFFIX = ".snapshot"
+SNAPSHOT_VERSION = 2
+_MAGIC = b"SALESNAP"
+_PREAMBLE = struct.Struct("<8sII")  # magic, version, header length
+_ALIGNMENT = 8
+_SEPARATOR = "\x00"
+_HASH_CHUNK = 1 << 20
+
+
+def snapshot_path(csv_path: PathLike) -> Path:
+    """Return the snapshot location for ``csv_path`` (stored next to the CSV)."""
+    path = Path(csv_path)
+    return path.with_name(path.name + SNAPSHOT_SUFFIX)
+
+
+def content_hash(path: PathLike) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_key(csv_path: Path, digest: Optional[str] = None) -> Dict[str, Any]:
+    stat = csv_path.stat()
+    return {
+        "path": str(csv_path.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": digest if digest is not None else content_hash(csv_path),
+    }
+
+
+def _format(column: Sequence) -> str:
+    return column.typecode if isinstance(column, array) else column.format  # type: ignore[attr-defined]
+
+
+def write_snapshot(
+    table: SalesTable,
+    csv_path: PathLike,
+    *,
+    source_key: Optional[Dict[str, Any]] = None,
+    index: Optional[DateIndex] = None,
+) -> Path:
+    """Persist ``table`` as a memory-mappable snapshot keyed to the current ``csv_path``.
+
+    Layout: a fixed preamble, a JSON header (source key, row count, column directory),
+    then each column's raw native-endian bytes aligned to 8 bytes.  String dictionaries
+    are stored as NUL-separated UTF-8.  The table's :class:`DateIndex` (built here unless
+    ``index`` is passed) is stored the same way, so loads can answer date ranges without
+    sorting.  The file is written atomically.
+    """
+    source = Path(csv_path)
+    target = snapshot_path(source)
+    payloads: List[tuple[Dict[str, Any], bytes]] = []
+
+    def add(name: str, fmt: str, payload: bytes, **extra: Any) -> None:
+        payloads.append(({"name": name, "format": fmt, "nbytes": len(payload), **extra}, payload))
+
+    for name in NUMERIC_COLUMNS:
+        column = table.numeric_column(name)
+        add(name, _format(column), bytes(memoryview(column)))
+    for name in DATE_COLUMNS:
+        column = table.day_column(name)
+        add(name, _format(column), bytes(memoryview(column)))
+    for name in STRING_COLUMNS:
+        categorical = table.categorical(name)
+        add(name, _format(categorical.codes), bytes(memoryview(categorical.codes)))
+        values = categorical.values
+        add(name + ":values", "utf-8", _SEPARATOR.join(values).encode("utf-8"), count=len(values))
+    arrays = (index or DateIndex(table)).arrays()
+    for name in INDEX_ARRAYS:
+        column = arrays[name]
+        add("index:" + name, _format(column), bytes(memoryview(column)))  # type: ignore[arg-type]
+
+    directory = []
+    offset = 0
+    for entry, payload in payloads:
+        directory.append({**entry, "offset": offset})
+        offset += len(payload) + (-len(payload)) % _ALIGNMENT
+    header = json.dumps(
+        {
+            "source": source_key if source_key is not None else _source_key(source),
+            "rows": len(table),
+            "byteorder": sys.byteorder,
+            "columns": directory,
+        }
+    ).encode("utf-8")
+    header += b" " * ((-(_PREAMBLE.size + len(header))) % _ALIGNMENT)
+
+    handle, temp_name = tempfile.mkstemp(dir=target.parent, prefix=target.name, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as out:
+            out.write(_PREAMBLE.pack(_MAGIC, SNAPSHOT_VERSION, len(header)))
+            out.write(header)
+            for _, payload in payloads:
+                out.write(payload)
+                out.write(b"\0" * ((-len(payload)) % _ALIGNMENT))
+        os.replace(temp_name, target)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    return target
+
+
+def _read_header(snapshot: Path) -> Optional[tuple[Dict[str, Any], int]]:
+    try:
+        with snapshot.open("rb") as handle:
+            magic, version, length = _PREAMBLE.unpack(handle.read(_PREAMBLE.size))
+            if magic != _MAGIC or version != SNAPSHOT_VERSION:
+                return None
+            header = json.loads(handle.read(length))
+    except (OSError, ValueError, struct.error):
+        return None
+    if header.get("byteorder") != sys.byteorder:
+        return None
+    return header, _PREAMBLE.size + length
+
+
+def _is_current(source: Path, key: Dict[str, Any]) -> bool:
+    stat = source.stat()
+    if key.get("path") != str(source.resolve()) or key.get("size") != stat.st_size:
+        return False
+    if key.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    # Touched but possibly unchanged: fall back to comparing content.
+    return key.get("hash") == content_hash(source)
+
+
+def _map_table(snapshot: Path, header: Dict[str, Any], data_start: int) -> Tuple[SalesTable, DateIndex]:
+    with snapshot.open("rb") as handle:
+        mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    entries = {entry["name"]: entry for entry in header["columns"]}
+
+    def section(name: str) -> memoryview:
+        entry = entries[name]
+        start = data_start + entry["offset"]
+        return view[start : start + entry["nbytes"]]
+
+    def numbers(name: str) -> memoryview:
+        return section(name).cast(entries[name]["format"])
+
+    def strings(name: str) -> CategoricalColumn:
+        values_name = name + ":values"
+        raw = bytes(section(values_name)).decode("utf-8")
+        values = raw.split(_SEPARATOR) if entries[values_name]["count"] else []
+        return CategoricalColumn(numbers(name), values)
+
+    table = SalesTable(
+        {name: numbers(name) for name in NUMERIC_COLUMNS},
+        {name: numbers(name) for name in DATE_COLUMNS},
+        {name: strings(name) for name in STRING_COLUMNS},
+    )
+    return table, DateIndex(table, {name: numbers("index:" + name) for name in INDEX_ARRAYS})
+
+
+def load_snapshot(csv_path: PathLike) -> Optional[SalesTable]:
+    """Memory-map the snapshot for ``csv_path``; ``None`` if missing, stale or unreadable.
+
+    Columns of the returned table are read-only ``memoryview`` objects over the mapping,
+    so loading costs O(number of distinct strings) rather than O(rows).
+    """
+    source = Path(csv_path)
+    snapshot = snapshot_path(source)
+    parsed = _read_header(snapshot)
+    if parsed is None or not _is_current(source, parsed[0]["source"]):
+        return None
+    return _map_table(snapshot, *parsed)[0]
+
+
+def load_or_build(csv_path: PathLike, build: Callable[[Path], SalesTable]) -> SalesTable:
+    """Return the snapshot table for ``csv_path``, rebuilding it with ``build`` when stale.
+
+    A snapshot whose size and mtime still match is used without touching the CSV.  If
+    only the mtime changed but the content hash matches, the snapshot is re-keyed so the
+    next start skips hashing.  When the snapshot cannot be written (e.g. a read-only
+    directory) the freshly built table is returned anyway.
+    """
+    return load_or_build_indexed(csv_path, build)[0]
+
+
+def load_or_build_indexed(
+    csv_path: PathLike, build: Callable[[Path], SalesTable]
+) -> Tuple[SalesTable, DateIndex]:
+    """:func:`load_or_build` together with the table's :class:`DateIndex`.
+
+    On a warm start the index is mapped from the snapshot like the columns, so a date
+    range is cut with two binary searches instead of a scan of every row.
+    """
+    source = Path(csv_path)
+    snapshot = snapshot_path(source)
+    parsed = _read_header(snapshot)
+    if parsed is not None and _is_current(source, parsed[0]["source"]):
+        table, index = _map_table(snapshot, *parsed)
+        if parsed[0]["source"]["mtime_ns"] != source.stat().st_mtime_ns:
+            _try_write(table, source, _source_key(source, parsed[0]["source"]["hash"]), index)
+        return table, index
+    # Key the snapshot to the file as it was *before* parsing, so a write racing with
+    # the build makes the snapshot stale instead of silently wrong.
+    key = _source_key(source)
+    table = build(source)
+    index = DateIndex(table)
+    _try_write(table, source, key, index)
+    return table, index
+
+
+def _try_write(table: SalesTable, source: Path, key: Dict[str, Any], index: DateIndex) -> None:
+    try:
+        write_snapshot(table, source, source_key=key, index=index)
+    except OSError:
+        pass
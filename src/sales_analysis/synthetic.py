@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from .models import SaleRecord
+from .reader import BOM, CSV_COLUMNS, PathLike
+
+# Region -> states, loosely following the Superstore export (49 states in 4 regions there).
+REGIONS = {
+    "East": ["New York", "Pennsylvania", "Ohio", "Massachusetts", "New Jersey", "Virginia", "Delaware",
+             "Connecticut", "Maryland", "Rhode Island", "New Hampshire", "Vermont", "Maine"],
+    "West": ["California", "Washington", "Arizona", "Colorado", "Oregon", "Utah", "Nevada", "New Mexico",
+             "Idaho", "Montana", "Wyoming"],
+    "Central": ["Texas", "Illinois", "Michigan", "Indiana", "Wisconsin", "Minnesota", "Missouri", "Oklahoma",
+                "Nebraska", "Iowa", "Kansas", "South Dakota", "North Dakota"],
+    "South": ["Florida", "North Carolina", "Tennessee", "Georgia", "Kentucky", "Alabama", "Mississippi",
+              "Arkansas", "Louisiana", "South Carolina"],
+}
+CATEGORIES = {
+    "Furniture": ["Bookcases", "Chairs", "Furnishings", "Tables"],
+    "Office Supplies": ["Appliances", "Art", "Binders", "Envelopes", "Fasteners", "Labels", "Paper",
+                        "Storage", "Supplies"],
+    "Technology": ["Accessories", "Copiers", "Machines", "Phones"],
+}
+SEGMENTS = ("Consumer", "Corporate", "Home Office")
+SHIP_MODES = ("Standard Class", "Second Class", "First Class", "Same Day")
+_SHIP_DAYS = {"Same Day": (0, 0), "First Class": (1, 3), "Second Class": (2, 5), "Standard Class": (4, 7)}
+_DISCOUNTS = (0.0, 0.0, 0.0, 0.1, 0.2, 0.2, 0.3, 0.4, 0.5, 0.7, 0.8)
+_START = date(2014, 1, 1)
+_DAYS = 3652  # 2014-01-01 .. 2023-12-31
+_BASE_ROWS = 10_000
+
+Customer = Tuple[str, str, str]
+Product = Tuple[str, str, str, str, float]
+Location = Tuple[str, str, str, str]
+
+
+def _scaled(base: int, rows: int) -> int:
+    """Grow a dimension's cardinality with the square root of the row count."""
+    return max(base, int(base * (rows / _BASE_ROWS) ** 0.5))
+
+
+def _dimensions(rng: random.Random, rows: int) -> Tuple[List[Customer], List[Product], List[Location]]:
+    customers = [
+        (f"{chr(65 + index % 26)}{chr(65 + index // 26 % 26)}-{10000 + index}", f"Customer {index:05d}",
+         rng.choice(SEGMENTS))
+        for index in range(_scaled(800, rows))
+    ]
+    products = []
+    for index in range(_scaled(1850, rows)):
+        category = rng.choice(list(CATEGORIES))
+        sub_category = rng.choice(CATEGORIES[category])
+        unit_price = round(rng.lognormvariate(3.2, 1.1), 2) + 1.0
+        products.append(
+            (f"{category[:3].upper()}-{sub_category[:2].upper()}-{10000000 + index}", category, sub_category,
+             f"{sub_category} item {index}, model {rng.randrange(100, 999)}", unit_price)
+        )
+    locations = []
+    for region, states in REGIONS.items():
+        for state in states:
+            for city in range(rng.randint(3, 20)):
+                locations.append((region, state, f"{state} City {city}", f"{rng.randrange(10000, 99999)}"))
+    return customers, products, locations
+
+
+def generate_records(rows: int, *, seed: int = 0) -> Iterator[SaleRecord]:
+    """Yield ``rows`` deterministic Superstore-schema records (same seed, same rows).
+
+    Cardinalities follow the public Superstore export at 10k rows (about 800 customers,
+    1,850 products, 4 regions, ~49 states, 17 sub-categories, ~2 lines per order) and
+    customers/products grow with the square root of ``rows`` beyond that.  Popular
+    customers and products are skewed, order dates span 2014-2023 and about 0.1% of
+    rows have no order date.
+    """
+    if rows < 0:
+        raise ValueError("rows must be non-negative")
+    rng = random.Random(seed)
+    customers, products, locations = _dimensions(rng, rows)
+    customer_weights = list(accumulate(1.0 / (rank + 1) ** 0.6 for rank in range(len(customers))))
+    product_weights = list(accumulate(1.0 / (rank + 1) ** 0.8 for rank in range(len(products))))
+    row = 0
+    order = 0
+    while row < rows:
+        order += 1
+        ordered = _START + timedelta(days=rng.randrange(_DAYS))
+        ship_mode = rng.choices(SHIP_MODES, weights=(60, 20, 15, 5))[0]
+        low, high = _SHIP_DAYS[ship_mode]
+        shipped = ordered + timedelta(days=rng.randint(low, high))
+        customer_id, customer_name, segment = rng.choices(customers, cum_weights=customer_weights)[0]
+        region, state, city, postal_code = rng.choice(locations)
+        undated = rng.random() < 0.001
+        order_id = f"{'CA' if rng.random() < 0.8 else 'US'}-{ordered.year}-{100000 + order}"
+        for _ in range(min(rows - row, 1 + int(rng.expovariate(0.7)))):
+            row += 1
+            product_id, category, sub_category, product_name, unit_price = rng.choices(
+                products, cum_weights=product_weights
+            )[0]
+            quantity = rng.randint(1, 14)
+            discount = rng.choice(_DISCOUNTS)
+            sales = round(unit_price * quantity * (1 - discount), 4)
+            yield SaleRecord(
+                row_id=str(row),
+                order_id=order_id,
+                order_date=None if undated else ordered,
+                ship_date=None if undated else shipped,
+                ship_mode=ship_mode,
+                customer_id=customer_id,
+                customer_name=customer_name,
+                segment=segment,
+                country="United States",
+                city=city,
+                state=state,
+                postal_code=postal_code,
+                region=region,
+                product_id=product_id,
+                category=category,
+                sub_category=sub_category,
+                product_name=product_name,
+                sales=sales,
+                quantity=quantity,
+                discount=discount,
+                profit=round(sales * rng.uniform(-0.4, 0.45) * (1 - discount), 4),
+            )
+
+
+def write_synthetic_csv(path: PathLike, rows: int, *, seed: int = 0) -> Path:
+    """Stream :func:`generate_records` to ``path`` in the Superstore CSV layout."""
+    target = Path(path)
+    with target.open("w", newline="", encoding="utf-8") as handle:
+        handle.write(BOM)
+        writer = csv.writer(handle)
+        writer.writerow(CSV_COLUMNS.values())
+        for record in generate_records(rows, seed=seed):
+            writer.writerow(
+                [
+                    value.strftime("%m/%d/%Y") if isinstance(value, date) else "" if value is None else value
+                    for value in (getattr(record, name) for name in CSV_COLUMNS)
+                ]
+            )
+    return target
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic Superstore CSV")
+    parser.add_argument("output", type=Path, help="CSV file to write")
+    parser.add_argument("--rows", type=int, default=100_000, help="number of rows (e.g. 10000 to 10000000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed; the same seed gives the same file")
+    args = parser.parse_args(argv)
+    rows = max(0, args.rows)
+    write_synthetic_csv(args.output, rows, seed=args.seed)
+    print(f"[SalesAnalysis] Wrote {rows:,} synthetic rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
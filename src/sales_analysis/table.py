@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import fields
+from datetime import date
+from itertools import repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .models import SaleRecord
+
+FIELDS = tuple(field.name for field in fields(SaleRecord))
+NUMERIC_COLUMNS = ("sales", "quantity", "discount", "profit")
+DATE_COLUMNS = ("order_date", "ship_date")
+STRING_COLUMNS = tuple(
+    field.name
+    for field in fields(SaleRecord)
+    if field.name not in NUMERIC_COLUMNS and field.name not in DATE_COLUMNS
+)
+# Value of each field in rows read without it (see the readers' ``columns`` projection).
+EMPTY_VALUES: Dict[str, object] = {
+    **{name: "" for name in STRING_COLUMNS},
+    **{name: None for name in DATE_COLUMNS},
+    "sales": 0.0,
+    "quantity": 0,
+    "discount": 0.0,
+    "profit": 0.0,
+}
+
+# array typecodes per numeric column; dates are stored as proleptic ordinals
+# (``date.toordinal``) with 0 reserved for a missing value.
+_NUMERIC_TYPECODES = {"sales": "d", "quantity": "q", "discount": "d", "profit": "d"}
+_DAY_TYPECODE = "i"
+_CODE_TYPECODE = "i"
+MISSING_DAY = 0
+_DATES: Dict[int, date] = {}
+_MONTHS: Dict[int, str] = {}
+
+
+def _pick(column: Sequence, typecode: str, indices: Sequence[int]) -> array:
+    return array(typecode, [column[i] for i in indices])
+
+
+def day_to_date(day: int) -> Optional[date]:
+    """Convert a stored day number back into a (shared) ``date`` instance."""
+    if day == MISSING_DAY:
+        return None
+    cached = _DATES.get(day)
+    if cached is None:
+        cached = _DATES[day] = date.fromordinal(day)
+    return cached
+
+
+def day_to_month(day: int) -> str:
+    """Return the ``YYYY-MM`` label for a (non-missing) stored day number."""
+    label = _MONTHS.get(day)
+    if label is None:
+        label = _MONTHS[day] = date.fromordinal(day).strftime("%Y-%m")
+    return label
+
+
+def date_to_day(value: Optional[date]) -> int:
+    """Convert an optional ``date`` into the stored day number."""
+    return value.toordinal() if value is not None else MISSING_DAY
+
+
+class CategoricalColumn:
+    """Dictionary-encoded string column: one integer code per row plus a value table."""
+
+    __slots__ = ("codes", "values", "_index")
+
+    def __init__(self, codes: Optional[Sequence[int]] = None, values: Optional[List[str]] = None) -> None:
+        self.codes = codes if codes is not None else array(_CODE_TYPECODE)
+        self.values: List[str] = values if values is not None else []
+        self._index: Optional[Dict[str, int]] = None
+
+    def _lookup(self) -> Dict[str, int]:
+        if self._index is None:
+            self._index = {value: code for code, value in enumerate(self.values)}
+        return self._index
+
+    def encode(self, value: str) -> int:
+        """Return the code for ``value``, adding it to the dictionary if unseen."""
+        index = self._lookup()
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: str) -> None:
+        self.codes.append(self.encode(value))
+
+    def __getstate__(self) -> tuple:
+        # The lookup index is rebuilt on demand; don't ship it across processes.
+        return self.codes, self.values
+
+    def __setstate__(self, state: tuple) -> None:
+        self.codes, self.values = state
+        self._index = None
+
+    def take(self, indices: Sequence[int]) -> CategoricalColumn:
+        """Return a column restricted to ``indices`` (the dictionary is kept as-is)."""
+        return CategoricalColumn(_pick(self.codes, _CODE_TYPECODE, indices), list(self.values))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> str:
+        return self.values[self.codes[index]]
+
+    def __iter__(self) -> Iterator[str]:
+        values = self.values
+        return (values[code] for code in self.codes)
+
+
+class SalesTable:
+    """Columnar, array-backed alternative to ``List[SaleRecord]``.
+
+    Numeric columns are ``array`` buffers, dates are integer day numbers and every
+    string column is dictionary-encoded.  Iterating or indexing the table still yields
+    ``SaleRecord`` rows, so it can be passed anywhere an ``Iterable[SaleRecord]`` is
+    expected; the analytics functions detect it and use the columns directly.
+    """
+
+    def __init__(
+        self,
+        numeric: Dict[str, Sequence[float]],
+        days: Dict[str, Sequence[int]],
+        strings: Dict[str, CategoricalColumn],
+    ) -> None:
+        self.sales = numeric["sales"]
+        self.quantity = numeric["quantity"]
+        self.discount = numeric["discount"]
+        self.profit = numeric["profit"]
+        self.order_day = days["order_date"]
+        self.ship_day = days["ship_date"]
+        self._strings = strings
+
+    @classmethod
+    def empty(cls) -> SalesTable:
+        return cls(
+            {name: array(_NUMERIC_TYPECODES[name]) for name in NUMERIC_COLUMNS},
+            {name: array(_DAY_TYPECODE) for name in DATE_COLUMNS},
+            {name: CategoricalColumn() for name in STRING_COLUMNS},
+        )
+
+    @classmethod
+    def from_records(cls, records: Iterable[SaleRecord]) -> SalesTable:
+        """Build a table from row objects."""
+        table = cls.empty()
+        for record in records:
+            table.append(record)
+        return table
+
+    @classmethod
+    def concat(cls, tables: Iterable[SalesTable]) -> SalesTable:
+        """Concatenate tables in order, re-encoding string dictionaries as needed."""
+        result = cls.empty()
+        for table in tables:
+            for name in NUMERIC_COLUMNS:
+                result.numeric_column(name).extend(table.numeric_column(name))
+            result.order_day.extend(table.order_day)
+            result.ship_day.extend(table.ship_day)
+            for name in STRING_COLUMNS:
+                target = result.categorical(name)
+                source = table.categorical(name)
+                remap = [target.encode(value) for value in source.values]
+                target.codes.extend(remap[code] for code in source.codes)
+        return result
+
+    def append(self, record: SaleRecord) -> None:
+        """Append one row."""
+        self.sales.append(record.sales)
+        self.quantity.append(record.quantity)
+        self.discount.append(record.discount)
+        self.profit.append(record.profit)
+        self.order_day.append(date_to_day(record.order_date))
+        self.ship_day.append(date_to_day(record.ship_date))
+        for name in STRING_COLUMNS:
+            self._strings[name].append(getattr(record, name))
+
+    def extend_columns(self, columns: Dict[str, Sequence], length: Optional[int] = None) -> None:
+        """Append a batch given as one equally long sequence per column.
+
+        Numeric columns take decoded numbers, date columns take day numbers and string
+        columns take raw strings (encoded here).  Columns absent from ``columns`` are
+        filled with ``length`` empty values (``0``, no date, ``""``).
+        """
+        if length is None:
+            length = len(next(iter(columns.values()), ()))
+        for name in NUMERIC_COLUMNS:
+            self.numeric_column(name).extend(columns[name] if name in columns else repeat(0, length))
+        for name in DATE_COLUMNS:
+            self.day_column(name).extend(columns[name] if name in columns else repeat(MISSING_DAY, length))
+        for name in STRING_COLUMNS:
+            column = self._strings[name]
+            if name in columns:
+                column.codes.extend(map(column.encode, columns[name]))
+            elif length:
+                column.codes.extend(repeat(column.encode(""), length))
+
+    def numeric_column(self, name: str) -> Sequence[float]:
+        """Return the numeric column called ``name``."""
+        if name not in NUMERIC_COLUMNS:
+            raise KeyError(f"Unknown numeric column: {name}")
+        return getattr(self, name)
+
+    def day_column(self, name: str) -> Sequence[int]:
+        """Return the day-number column for ``order_date`` or ``ship_date``."""
+        if name == "order_date":
+            return self.order_day
+        if name == "ship_date":
+            return self.ship_day
+        raise KeyError(f"Unknown date column: {name}")
+
+    def categorical(self, name: str) -> CategoricalColumn:
+        """Return the dictionary-encoded column called ``name``."""
+        try:
+            return self._strings[name]
+        except KeyError:
+            raise KeyError(f"Unknown string column: {name}") from None
+
+    def take(self, indices: Sequence[int]) -> SalesTable:
+        """Return a new table holding only the rows at ``indices`` (in that order)."""
+        return SalesTable(
+            {
+                name: _pick(self.numeric_column(name), _NUMERIC_TYPECODES[name], indices)
+                for name in NUMERIC_COLUMNS
+            },
+            {name: _pick(self.day_column(name), _DAY_TYPECODE, indices) for name in DATE_COLUMNS},
+            {name: column.take(indices) for name, column in self._strings.items()},
+        )
+
+    def row(self, index: int) -> SaleRecord:
+        """Materialize row ``index`` as a ``SaleRecord``."""
+        values = {name: column[index] for name, column in self._strings.items()}
+        return SaleRecord(
+            order_date=day_to_date(self.order_day[index]),
+            ship_date=day_to_date(self.ship_day[index]),
+            sales=self.sales[index],
+            quantity=self.quantity[index],
+            discount=self.discount[index],
+            profit=self.profit[index],
+            **values,
+        )
+
+    def to_records(self) -> List[SaleRecord]:
+        return list(self)
+
+    def __len__(self) -> int:
+        return len(self.sales)
+
+    def __getitem__(self, index: int) -> SaleRecord:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("SalesTable index out of range")
+        return self.row(index)
+
+    def __iter__(self) -> Iterator[SaleRecord]:
+        return (self.row(index) for index in range(len(self)))
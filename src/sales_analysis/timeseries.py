@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .models import SaleRecord
+from .table import MISSING_DAY, NUMERIC_COLUMNS, SalesTable
+
+GRANULARITIES = ("day", "week", "month", "quarter", "year")
+METRICS = NUMERIC_COLUMNS + ("count",)
+
+# Periods per year, used to find "the same period last year" for every granularity but days.
+_PERIODS_PER_YEAR = {"week": 52, "month": 12, "quarter": 4, "year": 1}
+
+
+def _day_key(day: date) -> int:
+    return day.toordinal()
+
+
+def _week_key(day: date) -> int:
+    # Ordinal 1 (0001-01-01) is a Monday, so this numbers Monday-based weeks.
+    return (day.toordinal() - 1) // 7
+
+
+def _month_key(day: date) -> int:
+    return day.year * 12 + day.month - 1
+
+
+def _quarter_key(day: date) -> int:
+    return day.year * 4 + (day.month - 1) // 3
+
+
+def _year_key(day: date) -> int:
+    return day.year
+
+
+def _week_label(key: int) -> str:
+    year, week, _ = date.fromordinal(key * 7 + 1).isocalendar()
+    return f"{year:04d}-W{week:02d}"
+
+
+_KEYS: Dict[str, Callable[[date], int]] = {
+    "day": _day_key,
+    "week": _week_key,
+    "month": _month_key,
+    "quarter": _quarter_key,
+    "year": _year_key,
+}
+_LABELS: Dict[str, Callable[[int], str]] = {
+    "day": lambda key: date.fromordinal(key).isoformat(),
+    "week": _week_label,
+    "month": lambda key: f"{key // 12:04d}-{key % 12 + 1:02d}",
+    "quarter": lambda key: f"{key // 4:04d}-Q{key % 4 + 1}",
+    "year": lambda key: f"{key:04d}",
+}
+
+
+def _check(granularity: str, metric: str) -> None:
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity {granularity!r}; expected one of {', '.join(GRANULARITIES)}")
+    if metric not in METRICS:
+        raise ValueError(f"Unsupported metric {metric!r}; expected one of {', '.join(METRICS)}")
+
+
+class TimeSeries:
+    """Totals of one metric per calendar period, keyed by consecutive integers.
+
+    Period keys are integers in which neighbouring periods differ by one (for example
+    ``year * 12 + month - 1`` for months), so buckets are filled in a single O(n) pass
+    without sorting records or formatting dates per row, and rolling windows and
+    year-over-year changes are computed from the buckets alone.  Only the distinct
+    period keys are ever sorted.
+    """
+
+    def __init__(self, granularity: str, metric: str, buckets: Dict[int, float]) -> None:
+        _check(granularity, metric)
+        self.granularity = granularity
+        self.metric = metric
+        self.buckets = buckets
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+    def label(self, key: int) -> str:
+        """``2019-03-14``, ``2019-W11``, ``2019-03``, ``2019-Q1`` or ``2019``."""
+        return _LABELS[self.granularity](key)
+
+    def keys(self) -> List[int]:
+        return sorted(self.buckets)
+
+    def to_dict(self) -> Dict[str, float]:
+        """Label -> total for every period with rows, in chronological order."""
+        return {self.label(key): self.buckets[key] for key in self.keys()}
+
+    def _dense(self) -> List[Tuple[int, float]]:
+        """Every period from the first to the last bucket, with empty periods as 0."""
+        keys = self.keys()
+        if not keys:
+            return []
+        return [(key, self.buckets.get(key, 0)) for key in range(keys[0], keys[-1] + 1)]
+
+    def rolling(self, window: int, *, mean: bool = False) -> Dict[str, float]:
+        """Trailing ``window``-period sum (or mean) ending at each period.
+
+        Periods without rows count as zero, and the first ``window - 1`` periods use the
+        shorter history available.  The sum is updated incrementally (add the entering
+        period, subtract the leaving one), so values can differ from a fresh sum of the
+        window in the last floating-point digits.
+        """
+        if window <= 0:
+            raise ValueError("window must be positive")
+        dense = self._dense()
+        result: Dict[str, float] = {}
+        total = 0
+        for position, (key, value) in enumerate(dense):
+            total += value
+            if position >= window:
+                total -= dense[position - window][1]
+            span = min(position + 1, window)
+            result[self.label(key)] = total / span if mean else total
+        return result
+
+    def _year_ago(self, key: int) -> Optional[int]:
+        if self.granularity != "day":
+            return key - _PERIODS_PER_YEAR[self.granularity]
+        day = date.fromordinal(key)
+        try:
+            return day.replace(year=day.year - 1).toordinal()
+        except ValueError:  # February 29th has no counterpart
+            return None
+
+    def year_over_year(self) -> Dict[str, Optional[float]]:
+        """Relative change against the same period one year earlier (``None`` without a base).
+
+        Weeks compare with the week 52 weeks earlier; days compare with the same date.
+        """
+        changes: Dict[str, Optional[float]] = {}
+        for key in self.keys():
+            previous_key = self._year_ago(key)
+            previous = self.buckets.get(previous_key) if previous_key is not None else None
+            changes[self.label(key)] = (self.buckets[key] - previous) / abs(previous) if previous else None
+        return changes
+
+
+def time_series(
+    records: Iterable[SaleRecord], granularity: str = "month", metric: str = "sales"
+) -> TimeSeries:
+    """Bucket ``metric`` (a numeric column or ``count``) by order-date period in one pass.
+
+    Rows without an order date are skipped.  Each distinct date is converted to its
+    period key once, so the per-row cost is one dictionary lookup and one addition.
+    Buckets are summed in row order, not date order, so a total can differ from a
+    date-sorted sum in the last floating-point digits.
+    """
+    _check(granularity, metric)
+    to_key = _KEYS[granularity]
+    buckets: Dict[int, float] = defaultdict(int)
+    if isinstance(records, SalesTable):
+        day_keys: Dict[int, int] = {}
+        values = records.numeric_column(metric) if metric != "count" else [1] * len(records)
+        for day, value in zip(records.day_column("order_date"), values):
+            if day == MISSING_DAY:
+                continue
+            key = day_keys.get(day)
+            if key is None:
+                key = day_keys[day] = to_key(date.fromordinal(day))
+            buckets[key] += value
+        return TimeSeries(granularity, metric, dict(buckets))
+    value_of: Callable[[SaleRecord], float] = (lambda record: 1) if metric == "count" else attrgetter(metric)
+    date_keys: Dict[date, int] = {}
+    for record in records:
+        order_date = record.order_date
+        if order_date is None:
+            continue
+        key = date_keys.get(order_date)
+        if key is None:
+            key = date_keys[order_date] = to_key(order_date)
+        buckets[key] += value_of(record)
+    return TimeSeries(granularity, metric, dict(buckets))
+
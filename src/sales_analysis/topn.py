@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .groupby import sum_by
+from .models import SaleRecord
+from .table import SalesTable
+
+
+def exact_totals(records: Iterable[SaleRecord], key: str, metric: str = "sales") -> Dict[str, float]:
+    """Sum ``metric`` per distinct value of the ``key`` column, in first-seen order."""
+    return sum_by(records, key, metric)
+
+
+def nlargest_totals(totals: Dict[str, float], n: int) -> List[Tuple[str, float]]:
+    """Top ``n`` entries by value in O(K log n); ties keep first-seen order like ``sorted``."""
+    return heapq.nlargest(n, totals.items(), key=itemgetter(1)) if n > 0 else []
+
+
+def top_n_by(
+    records: Iterable[SaleRecord], key: str, n: int, *, metric: str = "sales"
+) -> List[Tuple[str, float]]:
+    """Exact top ``n`` values of ``key`` ranked by summed ``metric``."""
+    if n <= 0:
+        return []
+    return nlargest_totals(exact_totals(records, key, metric), n)
+
+
+@dataclass(frozen=True)
+class HeavyHitter:
+    """One Space-Saving estimate: ``estimate - error <= true total <= estimate``."""
+
+    key: str
+    estimate: float
+    error: float
+
+
+class SpaceSaving:
+    """Weighted Space-Saving heavy-hitter sketch with at most ``capacity`` counters.
+
+    Memory is O(capacity) regardless of how many distinct keys are seen.  Every
+    estimate over-counts by at most its recorded ``error``, and every error is bounded
+    by :attr:`max_error`, itself at most ``total / capacity``.  Any key whose true
+    total exceeds ``total / capacity`` is guaranteed to be monitored.  Weights must be
+    non-negative.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.total = 0.0
+        self._counts: Dict[str, float] = {}
+        self._errors: Dict[str, float] = {}
+        # One entry per monitored key holding a value <= its current count; entries go
+        # stale when a count grows and are refreshed lazily when they reach the top.
+        self._heap: List[Tuple[float, str]] = []
+
+    def add(self, key: str, weight: float = 1.0) -> None:
+        if weight < 0:
+            raise ValueError("Space-Saving weights must be non-negative")
+        self.total += weight
+        counts = self._counts
+        if key in counts:
+            counts[key] += weight
+            return
+        if len(counts) < self.capacity:
+            counts[key] = weight
+            self._errors[key] = 0.0
+            heapq.heappush(self._heap, (weight, key))
+            return
+        floor, victim = self._pop_min()
+        del counts[victim]
+        del self._errors[victim]
+        counts[key] = floor + weight
+        self._errors[key] = floor
+        heapq.heappush(self._heap, (floor + weight, key))
+
+    def _pop_min(self) -> Tuple[float, str]:
+        heap = self._heap
+        counts = self._counts
+        while True:
+            stored, key = heapq.heappop(heap)
+            current = counts[key]
+            if current == stored:
+                return stored, key
+            heapq.heappush(heap, (current, key))
+
+    @property
+    def max_error(self) -> float:
+        """Upper bound on the over-count of any estimate (0 until the sketch is full)."""
+        if len(self._counts) < self.capacity:
+            return 0.0
+        floor, key = self._pop_min()
+        heapq.heappush(self._heap, (floor, key))
+        return floor
+
+    def top(self, n: int) -> List[HeavyHitter]:
+        """The ``n`` largest estimates, highest first."""
+        ranked = nlargest_totals(self._counts, n)
+        return [HeavyHitter(key, estimate, self._errors[key]) for key, estimate in ranked]
+
+    def merge(self, other: SpaceSaving) -> SpaceSaving:
+        """Fold another sketch in (mergeable Space-Saving); bounds remain valid."""
+        self_floor = self.max_error
+        other_floor = other.max_error
+        keys = list(self._counts) + [key for key in other._counts if key not in self._counts]
+        combined = {
+            key: (
+                self._counts.get(key, self_floor) + other._counts.get(key, other_floor),
+                self._errors.get(key, self_floor) + other._errors.get(key, other_floor),
+            )
+            for key in keys
+        }
+        kept = heapq.nlargest(self.capacity, combined.items(), key=lambda item: item[1][0])
+        kept_keys = {key for key, _ in kept}
+        self._counts = {key: combined[key][0] for key in keys if key in kept_keys}
+        self._errors = {key: combined[key][1] for key in keys if key in kept_keys}
+        self._heap = [(count, key) for key, count in self._counts.items()]
+        heapq.heapify(self._heap)
+        self.total += other.total
+        return self
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "counters": [[key, self._counts[key], self._errors[key]] for key in self._counts],
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> SpaceSaving:
+        sketch = cls(state["capacity"])
+        sketch.total = state["total"]
+        for key, count, error in state["counters"]:
+            sketch._counts[key] = count
+            sketch._errors[key] = error
+        sketch._heap = [(count, key) for key, count in sketch._counts.items()]
+        heapq.heapify(sketch._heap)
+        return sketch
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+def approximate_top_n_by(
+    records: Iterable[SaleRecord], key: str, n: int, *, capacity: int, metric: str = "sales"
+) -> Tuple[List[HeavyHitter], float]:
+    """Bounded-memory top ``n`` via Space-Saving; returns the hitters and the error bound."""
+    sketch = SpaceSaving(capacity)
+    if isinstance(records, SalesTable):
+        column = records.categorical(key)
+        labels = column.values
+        for code, value in zip(column.codes, records.numeric_column(metric)):
+            sketch.add(labels[code], value)
+    else:
+        for record in records:
+            sketch.add(getattr(record, key), getattr(record, metric))
+    return sketch.top(n), sketch.max_error
@@ -1,5 +1,13 @@
 from __future__ import annotations
 
+import bz2
+import gzip
+import json
+import lzma
+import math
+import os
+import threading
+import urllib.request
 from datetime import date
 from pathlib import Path
 
@@ -13,12 +21,51 @@ from src.sales_analysis.analytics import (
     sales_by_region,
     sales_by_segment,
     sales_by_state,
+    top_n_customers_by_sales,
     top_n_products_by_sales,
+    top_n_states_by_sales,
+    top_n_sub_categories_by_sales,
     total_quantity_sold,
     total_sales,
 )
+from src.sales_analysis.cache import CachedAnalytics, ResultCache, dataset_fingerprint
+from src.sales_analysis.compression import detect_codec, open_text
+from src.sales_analysis.cube import SalesCube
+from src.sales_analysis.date_index import DateIndex
+from src.sales_analysis.dataset import SalesDataset, file_stats, partition_bounds
+from src.sales_analysis.decoding import DateDecoder, decode_floats, decode_ints
+from src.sales_analysis.filters import SalesFilter
+from src.sales_analysis.groupby import group_by
+from src.sales_analysis.incremental import refresh_incremental
 from src.sales_analysis.models import SaleRecord
-from src.sales_analysis.reader import read_sales_csv
+from src.sales_analysis.pipeline import run_pipeline
+from src.sales_analysis.profiling import Profiler, current, profiling, stage
+from src.sales_analysis.reader import iter_sales_csv, read_sales_csv, read_sales_table
+from src.sales_analysis.parallel import read_sales_table_parallel, split_byte_ranges
+from src.sales_analysis.partials import PartialState, merge_partials
+from src.sales_analysis.report import SalesAggregator, build_report
+from src.sales_analysis.runner import run_reports, run_sections
+from src.sales_analysis.sections import (
+    SECTIONS,
+    compute_sections,
+    parse_sections,
+    report_sections,
+    required_columns,
+)
+from src.sales_analysis.server import SalesServer, make_server
+from src.sales_analysis.snapshot import (
+    load_or_build,
+    load_or_build_indexed,
+    load_snapshot,
+    snapshot_path,
+    write_snapshot,
+)
+from src.sales_analysis.sketches import HyperLogLog, KLLSketch
+from src.sales_analysis.synthetic import generate_records, write_synthetic_csv
+from src.sales_analysis.table import EMPTY_VALUES, SalesTable
+from src.sales_analysis.timeseries import time_series
+from src.sales_analysis.topn import SpaceSaving
+from src.sales_analysis.topn import exact_totals as sales_by_key
 
 
 def _make_record(**overrides: object) -> SaleRecord:
@@ -147,3 +194,1034 @@ def test_read_sales_csv_handles_bom_and_missing_dates(tmp_path: Path) -> None:
     assert second.sales == pytest.approx(250.5)
     assert first.quantity == 2
 
+
+
+_CSV_HEADER = "\ufeffRow ID,Order ID,Order Date,Ship Date,Ship Mode,Customer ID,Customer Name,Segment,Country,City,State,Postal Code,Region,Product ID,Category,Sub-Category,Product Name,Sales,Quantity,Discount,Profit\n"
+
+
+def _csv_line(record: SaleRecord) -> str:
+    """Render a SaleRecord the way the Superstore export does (MM/DD/YYYY dates)."""
+    def fmt(value: date | None) -> str:
+        return value.strftime("%m/%d/%Y") if value else ""
+
+    fields = [
+        record.row_id, record.order_id, fmt(record.order_date), fmt(record.ship_date), record.ship_mode,
+        record.customer_id, record.customer_name, record.segment, record.country, record.city,
+        record.state, record.postal_code, record.region, record.product_id, record.category,
+        record.sub_category, f'"{record.product_name}"', repr(record.sales), str(record.quantity),
+        repr(record.discount), repr(record.profit),
+    ]
+    return ",".join(fields) + "\n"
+
+
+def _write_sales_csv(path: Path, records: list[SaleRecord]) -> Path:
+    """Write records to a Superstore-style CSV file and return its path."""
+    path.write_text(_CSV_HEADER + "".join(_csv_line(record) for record in records), encoding="utf-8")
+    return path
+
+
+def _varied_records() -> list[SaleRecord]:
+    """Return a slightly larger dataset spanning several months, states and products."""
+    return _sample_records() + [
+        _make_record(
+            row_id="4",
+            order_id="CA-2019-100004",
+            order_date=date(2019, 2, 11),
+            product_name="Staples",
+            sales=80.0,
+            region="West",
+            state="California",
+            segment="Home Office",
+            category="Office Supplies",
+            quantity=4,
+            discount=0.0,
+            profit=-5.5,
+        ),
+        _make_record(
+            row_id="5",
+            order_id="CA-2019-100005",
+            order_date=date(2019, 3, 28),
+            ship_date=None,
+            product_name="Phone, Model A",
+            sales=420.25,
+            region="East",
+            state="New York",
+            category="Technology",
+            sub_category="Phones",
+            quantity=1,
+            discount=0.2,
+            profit=35.75,
+        ),
+        _make_record(row_id="6", order_date=None, product_name="Xerox 225", sales=12.5),
+    ]
+
+
+def test_sales_table_matches_record_analytics() -> None:
+    """Every analytics function returns the same answer for a SalesTable and a record list."""
+    records = _varied_records()
+    table = SalesTable.from_records(records)
+    assert len(table) == len(records)
+    assert total_sales(table) == total_sales(records)
+    assert total_quantity_sold(table) == total_quantity_sold(records)
+    assert average_discount(table) == average_discount(records)
+    assert average_profit(table) == average_profit(records)
+    for grouping in (sales_by_region, sales_by_category, sales_by_segment, sales_by_state):
+        assert list(grouping(table).items()) == list(grouping(records).items())
+    assert top_n_products_by_sales(table, 3) == top_n_products_by_sales(records, 3)
+    assert monthly_sales(table) == monthly_sales(records)
+    assert average_discount(SalesTable.empty()) == 0.0
+
+
+def test_sales_table_row_access_take_and_concat() -> None:
+    """Row-wise access round-trips SaleRecords; take/concat keep rows in order."""
+    records = _varied_records()
+    table = SalesTable.from_records(records)
+    assert table[0] == records[0]
+    assert table[-1] == records[-1]
+    assert list(table) == records
+    assert list(table.take([4, 1])) == [records[4], records[1]]
+    merged = SalesTable.concat([table.take([0, 1]), SalesTable.from_records(records[2:])])
+    assert list(merged) == records
+    with pytest.raises(IndexError):
+        table[len(records)]
+
+
+def test_read_sales_table_matches_read_sales_csv(tmp_path: Path) -> None:
+    """The columnar loader yields the same rows as the record loader."""
+    path = _write_sales_csv(tmp_path / "sales.csv", _varied_records())
+    table = read_sales_table(path)
+    assert isinstance(table, SalesTable)
+    assert list(table) == read_sales_csv(path)
+
+
+def test_empty_csv_reads_as_no_rows(tmp_path: Path) -> None:
+    """A zero-byte CSV has no header to check; every reader returns an empty result."""
+    path = tmp_path / "empty.csv"
+    path.write_bytes(b"")
+    columns = required_columns(("totals",))
+    assert read_sales_csv(path) == [] and list(iter_sales_csv(path, columns=columns)) == []
+    assert len(read_sales_table(path)) == 0 and len(read_sales_table(path, columns=columns)) == 0
+    assert len(read_sales_table_parallel(path, workers=2)) == 0
+    assert run_pipeline(path, columns=columns).aggregator.row_count == 0
+    assert refresh_incremental(path, tmp_path / "state.json").rows_added == 0
+    _write_sales_csv(path, _varied_records()[:2])
+    assert refresh_incremental(path, tmp_path / "state.json").rows_added == 2
+
+
+def test_column_projection_decodes_only_requested_fields(tmp_path: Path) -> None:
+    """Projected readers fill unrequested fields with empty values and still push filters down."""
+    records = _varied_records()
+    path = _write_sales_csv(tmp_path / "sales.csv", records)
+    columns = required_columns(("regions", "monthly"))
+    assert columns == ("order_date", "region", "sales")
+    expected = [
+        SaleRecord(**{**EMPTY_VALUES, **{name: getattr(record, name) for name in columns}})  # type: ignore[arg-type]
+        for record in records
+    ]
+    assert read_sales_csv(path, columns=columns) == expected
+    assert list(read_sales_table(path, columns=columns)) == expected
+    assert list(read_sales_table_parallel(path, workers=2, columns=columns)) == expected
+    where = SalesFilter(categories=["Technology"])
+    assert list(iter_sales_csv(path, where=where, columns=columns)) == [
+        row for row, record in zip(expected, records) if record.category == "Technology"
+    ]
+    sections = ("regions", "monthly")
+    assert compute_sections(read_sales_table(path, columns=columns), sections) == compute_sections(records, sections)
+    with pytest.raises(ValueError):
+        read_sales_csv(path, columns=("revenue",))
+
+
+def test_compressed_csv_is_read_by_extension_or_magic_bytes(tmp_path: Path) -> None:
+    """gzip, bz2 and xz files decode to the same rows, inline or on the read-ahead thread."""
+    records = _varied_records()
+    plain = _write_sales_csv(tmp_path / "sales.csv", records)
+    payload = plain.read_bytes()
+    for name, compress in (("gz", gzip.compress), ("bz2", bz2.compress), ("xz", lzma.compress)):
+        compressed = tmp_path / f"sales.csv.{name}"
+        compressed.write_bytes(compress(payload))
+        disguised = tmp_path / f"sales_{name}.dat"
+        disguised.write_bytes(compressed.read_bytes())
+        assert detect_codec(compressed) is detect_codec(disguised) is not None
+        for threaded in (True, False):
+            with open_text(disguised, threaded=threaded) as handle:
+                assert handle.read() == payload.decode("utf-8")
+        assert read_sales_csv(compressed) == records
+        assert list(read_sales_table_parallel(compressed, workers=2)) == records
+    assert detect_codec(plain) is None
+    assert [item.path for item in SalesDataset.discover(tmp_path).files] == [plain]
+    plain.unlink()
+    assert [item.path.name for item in SalesDataset.discover(tmp_path).files] == ["sales.csv.gz"]
+    with pytest.raises(ValueError):
+        refresh_incremental(tmp_path / "sales.csv.gz", tmp_path / "state.json")
+    broken = tmp_path / "broken.csv.gz"
+    broken.write_bytes(gzip.compress(payload)[:-40])
+    with pytest.raises(EOFError), open_text(broken, threaded=True) as handle:
+        handle.read()
+
+
+def test_partial_states_merge_into_the_single_node_report(tmp_path: Path) -> None:
+    """Shards summarized separately, serialized and merged in any grouping equal one full pass."""
+    records = list(generate_records(1500, seed=6))
+    shards = [records[:400], SalesTable.from_records(records[400:900]), iter(records[900:])]
+    paths = []
+    for index, shard in enumerate(shards):
+        paths.append(PartialState.from_records(shard).write(tmp_path / f"node{index}.state"))
+    first, second, third = (PartialState.read(path) for path in paths)
+    merged = merge_partials([first, second, third])
+    single = PartialState.from_records(records)
+    report = merged.report(top_n=3)
+    assert report == single.report(top_n=3)
+    assert merge_partials([first, merge_partials([second, third])]).report(top_n=3) == report
+    assert report.total_sales == math.fsum(record.sales for record in records)
+    assert report.sales_by_state == {
+        state: math.fsum(record.sales for record in records if record.state == state)
+        for state in report.sales_by_state
+    }
+    expected = build_report(records, top_n=3)
+    for name in ("sales_by_region", "sales_by_state", "monthly_sales"):
+        assert list(getattr(report, name)) == list(getattr(expected, name))
+    assert merged.top("customer_name", 2) == single.top("customer_name", 2)
+    assert [name for name, _ in merged.top("customer_name", 2)] == [
+        name for name, _ in top_n_customers_by_sales(records, 2)
+    ]
+    assert merged.top("sub_category", 2) == single.top("sub_category", 2)
+    assert PartialState.from_bytes(merged.to_bytes()).to_state() == merged.to_state()
+
+    with pytest.raises(ValueError):
+        merged.merge(PartialState.from_records(records, top_capacity=4))
+    stale = merged.to_state()
+    stale["version"] = 0
+    with pytest.raises(ValueError):
+        PartialState.from_state(stale)
+
+
+def test_build_report_matches_individual_analytics() -> None:
+    """The fused single-pass report agrees with each standalone analytics function."""
+    records = _varied_records()
+    for source in (records, SalesTable.from_records(records)):
+        report = build_report(source, top_n=2)
+        assert report.row_count == len(records)
+        assert report.total_sales == total_sales(records)
+        assert report.total_quantity == total_quantity_sold(records)
+        assert report.average_discount == average_discount(records)
+        assert report.average_profit == average_profit(records)
+        assert report.sales_by_region == sales_by_region(records)
+        assert report.sales_by_category == sales_by_category(records)
+        assert report.sales_by_segment == sales_by_segment(records)
+        assert report.sales_by_state == sales_by_state(records)
+        assert report.top_products == top_n_products_by_sales(records, 2)
+        assert report.top_states == sorted(sales_by_state(records).items(), key=lambda kv: kv[1], reverse=True)[:5]
+        assert report.monthly_sales == monthly_sales(records)
+        assert list(report.monthly_sales) == sorted(report.monthly_sales)
+
+
+def test_run_reports_returns_report_and_handles_empty_month(capsys: pytest.CaptureFixture[str]) -> None:
+    """run_reports prints every section and returns the structured report."""
+    report = run_reports(_varied_records(), top_n=2, month="2019-01")
+    output = capsys.readouterr().out
+    assert report is not None and report.row_count == 3
+    assert "Total sales: $650.00" in output
+    assert "Top 2 products by sales" in output
+    assert run_reports(_varied_records(), month="2030-01") is None
+    assert "No records found for month filter '2030-01'." in capsys.readouterr().out
+
+
+def test_iter_sales_csv_streams_records_and_batches(tmp_path: Path) -> None:
+    """iter_sales_csv yields records lazily, optionally grouped into fixed-size batches."""
+    records = _varied_records()
+    path = _write_sales_csv(tmp_path / "sales.csv", records)
+    stream = iter_sales_csv(path)
+    assert not isinstance(stream, list)
+    assert next(stream) == records[0]
+    batches = list(iter_sales_csv(path, batch_size=4))
+    assert [len(batch) for batch in batches] == [4, 2]
+    assert [record for batch in batches for record in batch] == records
+    with pytest.raises(ValueError):
+        iter_sales_csv(path, batch_size=0)
+
+
+def test_streaming_analytics_and_reports_accept_one_shot_iterators(tmp_path: Path) -> None:
+    """Accumulator-based analytics and run_reports work on single-use generators."""
+    records = _varied_records()
+    assert average_discount(iter(records)) == average_discount(records)
+    assert average_profit(iter(records)) == average_profit(records)
+    assert monthly_sales(iter(records)) == {"2019-01": 650.0, "2019-02": 80.0, "2019-03": 420.25}
+    path = _write_sales_csv(tmp_path / "sales.csv", records)
+    report = run_reports(iter_sales_csv(path), top_n=3)
+    assert report == build_report(records, top_n=3)
+
+
+def test_split_byte_ranges_cover_every_row_once(tmp_path: Path) -> None:
+    """Byte ranges are newline-aligned, contiguous and span the whole data section."""
+    path = _write_sales_csv(tmp_path / "sales.csv", _varied_records() * 5)
+    header, ranges = split_byte_ranges(path, 4)
+    assert header[0] == "Row ID"
+    data = path.read_bytes()
+    assert ranges[0][0] == data.index(b"\n") + 1
+    assert ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert data[start - 1 : start] == b"\n"
+    assert split_byte_ranges(path, 1)[1] == [(ranges[0][0], len(data))]
+
+
+def test_parallel_reader_matches_serial(tmp_path: Path) -> None:
+    """The process-pool loader yields the same rows and report as the serial path."""
+    records = _varied_records() * 7
+    path = _write_sales_csv(tmp_path / "sales.csv", records)
+    table = read_sales_table_parallel(path, workers=3)
+    assert list(table) == records
+    assert build_report(table, top_n=3) == build_report(read_sales_csv(path), top_n=3)
+
+
+def test_date_decoder_sniffs_format_and_memoizes() -> None:
+    """DateDecoder matches strptime semantics, shares date objects and bounds its memo."""
+    four_digit = DateDecoder()
+    first = four_digit("03/15/2019")
+    assert first == date(2019, 3, 15)
+    assert four_digit("03/15/2019") is first
+    assert four_digit("") is None
+    assert four_digit("1/2/20") == date(2020, 1, 2)  # falls back for a stray two-digit year
+    two_digit = DateDecoder(max_cache_size=1)
+    assert two_digit("12/31/69") == date(1969, 12, 31)
+    assert two_digit("1/1/68") == date(2068, 1, 1)
+    assert len(two_digit._cache) == 1
+    assert DateDecoder()("2024-02-29") == date(2024, 2, 29)
+    with pytest.raises(ValueError):
+        DateDecoder()("15 March 2019")
+
+
+def test_bulk_numeric_decoding_handles_blanks_and_float_quantities() -> None:
+    """Column decoders take the fast path when possible and fall back per value."""
+    assert list(decode_floats(["1.5", "2"])) == [1.5, 2.0]
+    assert list(decode_floats(["1.5", ""])) == [1.5, 0.0]
+    assert list(decode_ints(["3", "4"])) == [3, 4]
+    assert list(decode_ints(["3.0", ""])) == [3, 0]
+
+
+def test_snapshot_round_trip_and_invalidation(tmp_path: Path) -> None:
+    """Warm starts memory-map the snapshot; changing the CSV triggers a rebuild."""
+    records = _varied_records()
+    path = _write_sales_csv(tmp_path / "sales.csv", records)
+    builds: list[Path] = []
+
+    def build(source: Path) -> SalesTable:
+        builds.append(source)
+        return read_sales_table(source)
+
+    cold = load_or_build(path, build)
+    assert snapshot_path(path).exists() and len(builds) == 1
+    warm = load_or_build(path, build)
+    assert len(builds) == 1
+    assert isinstance(warm.sales, memoryview)
+    assert list(warm) == list(cold) == records
+    assert build_report(warm, top_n=3) == build_report(records, top_n=3)
+
+    os.utime(path, ns=(0, 0))  # touched but unchanged: hash match, no rebuild
+    assert list(load_or_build(path, build)) == records and len(builds) == 1
+
+    _write_sales_csv(path, records[:2])
+    assert load_snapshot(path) is None
+    assert read_sales_csv(path, snapshot=True) == records[:2]
+
+
+def test_snapshot_of_empty_table(tmp_path: Path) -> None:
+    """An empty dataset still produces a loadable snapshot."""
+    path = _write_sales_csv(tmp_path / "empty.csv", [])
+    write_snapshot(read_sales_table(path), path)
+    loaded = load_snapshot(path)
+    assert loaded is not None and len(loaded) == 0
+    assert loaded.categorical("region").values == []
+
+
+def test_incremental_refresh_parses_only_appended_rows(tmp_path: Path) -> None:
+    """Appends are folded into persisted state; partial lines wait; rewrites rebuild."""
+    records = _varied_records()
+    path = _write_sales_csv(tmp_path / "sales.csv", records[:3])
+    state = tmp_path / "sales.state.json"
+
+    first = refresh_incremental(path, state)
+    assert first.rebuilt and first.rows_added == 3
+
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write("".join(_csv_line(record) for record in records[3:5]))
+        handle.write(_csv_line(records[5])[:20])  # still being written
+    second = refresh_incremental(path, state)
+    assert not second.rebuilt and second.rows_added == 2
+    assert second.bytes_read == sum(len(_csv_line(r).encode("utf-8")) for r in records[3:5])
+
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(_csv_line(records[5])[20:])
+    third = refresh_incremental(path, state)
+    assert third.rows_added == 1
+    assert third.aggregator.report(top_n=3) == build_report(records, top_n=3)
+
+    assert refresh_incremental(path, state).rows_added == 0
+    _write_sales_csv(path, records[:2])  # truncated / rewritten
+    rebuilt = refresh_incremental(path, state)
+    assert rebuilt.rebuilt
+    assert rebuilt.aggregator.report(top_n=3) == build_report(records[:2], top_n=3)
+
+
+def test_incremental_refresh_keeps_and_rebuilds_approximate_sketches(tmp_path: Path) -> None:
+    """The approximate setting is persisted; switching it rebuilds instead of dropping sketches."""
+    records = _varied_records()
+    path = _write_sales_csv(tmp_path / "sales.csv", records[:3])
+    state = tmp_path / "sales.state.json"
+
+    first = refresh_incremental(path, state, approximate=True)
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write("".join(_csv_line(record) for record in records[3:]))
+    appended = refresh_incremental(path, state, approximate=True)
+    assert not appended.rebuilt and first.rebuilt
+    expected = run_reports(records, approximate=True).approximate
+    assert appended.aggregator.report().approximate == expected
+
+    exact = refresh_incremental(path, state)
+    assert exact.rebuilt and exact.aggregator.report().approximate is None
+    assert refresh_incremental(path, state, approximate=True).rebuilt
+
+
+def test_incremental_refresh_keeps_the_top_capacity_setting(tmp_path: Path) -> None:
+    """Bounded top-N state survives appends and is rebuilt when the capacity changes."""
+    records = _varied_records()
+    path = _write_sales_csv(tmp_path / "sales.csv", records[:3])
+    state = tmp_path / "sales.state.json"
+
+    refresh_incremental(path, state, top_capacity=2)
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write("".join(_csv_line(record) for record in records[3:]))
+    appended = refresh_incremental(path, state, top_capacity=2)
+    assert not appended.rebuilt
+    assert appended.aggregator.report(top_n=2).top_products_max_error is not None
+    assert appended.aggregator.report(top_n=2) == build_report(records, top_n=2, top_capacity=2)
+
+    assert refresh_incremental(path, state, top_capacity=3).rebuilt
+    exact = refresh_incremental(path, state)
+    assert exact.rebuilt and exact.aggregator.report(top_n=3) == build_report(records, top_n=3)
+
+
+def test_sales_cube_answers_group_bys_and_slices() -> None:
+    """Cube queries agree with the row-level analytics for groupings and month slices."""
+    records = _varied_records()
+    for cube in (SalesCube.from_records(records), SalesCube.from_records(SalesTable.from_records(records))):
+        assert len(cube) == 6
+        totals = cube.totals()
+        assert totals.sales == pytest.approx(total_sales(records))
+        assert totals.quantity == total_quantity_sold(records)
+        assert totals.count == len(records)
+        assert totals.average_discount == pytest.approx(average_discount(records))
+        assert cube.sales_by("region") == pytest.approx(sales_by_region(records))
+        assert cube.sales_by("state") == pytest.approx(sales_by_state(records))
+        assert cube.monthly_sales() == pytest.approx(monthly_sales(records))
+        january = [r for r in records if r.order_date and r.order_date.month == 1]
+        assert cube.sales_by("category", {"month": "2019-01"}) == pytest.approx(sales_by_category(january))
+        east_or_west = cube.query(("region", "month"), {"region": ["East", "West"]})
+        assert set(east_or_west) == {("East", "2019-01"), ("West", "2019-02"), ("East", "2019-03")}
+        assert cube.totals({"month": "2031-01"}).count == 0
+    assert len(SalesCube.from_records(records * 4)) == 6
+    with pytest.raises(ValueError):
+        SalesCube().query(("product_name",))
+
+
+def test_sales_filter_pushdown_matches_post_filtering(tmp_path: Path) -> None:
+    """Readers given a SalesFilter return exactly the rows a post-filter would keep."""
+    records = _varied_records()
+    path = _write_sales_csv(tmp_path / "sales.csv", records)
+    filters = [
+        SalesFilter.for_month("2019-01"),
+        SalesFilter(regions=["East"], segments=["Consumer", "Corporate"]),
+        SalesFilter(start=date(2019, 2, 1), states=["New York", "California"]),
+        SalesFilter(end=date(2019, 1, 31), categories={"Furniture"}),
+    ]
+    for where in filters:
+        expected = [record for record in records if where.matches(record)]
+        assert expected
+        assert read_sales_csv(path, where=where) == expected
+        assert list(iter_sales_csv(path, where=where)) == expected
+        assert list(read_sales_table(path, where=where)) == expected
+        assert list(where.filter_table(SalesTable.from_records(records))) == expected
+        assert list(read_sales_table_parallel(path, workers=2, where=where)) == expected
+    assert not SalesFilter() and SalesFilter(regions=[])
+    assert read_sales_csv(path, where=SalesFilter(regions=[])) == []
+    with pytest.raises(ValueError):
+        SalesFilter.for_month("March")
+
+
+def test_raw_predicate_skips_date_decoding_for_rejected_rows() -> None:
+    """Categorical predicates run on raw text before the Order Date is decoded."""
+    decoded: list[str] = []
+
+    def decode(raw: str) -> date | None:
+        decoded.append(raw)
+        return date(2019, 1, 5)
+
+    predicate = SalesFilter.for_month("2019-01", regions=["West"]).raw_predicate(decode)
+    assert not predicate({"Region": "East", "Order Date": "01/05/2019"})
+    assert decoded == []
+    assert predicate({"Region": "West", "Order Date": "01/05/2019"})
+    assert decoded == ["01/05/2019"]
+
+
+def test_top_n_rankings_for_other_dimensions() -> None:
+    """Exact rankings use heapq.nlargest and keep sorted()'s tie order."""
+    records = _varied_records()
+    for ranking, column in (
+        (top_n_states_by_sales, "state"),
+        (top_n_sub_categories_by_sales, "sub_category"),
+        (top_n_products_by_sales, "product_name"),
+    ):
+        totals: dict[str, float] = {}
+        for record in records:
+            totals[getattr(record, column)] = totals.get(getattr(record, column), 0.0) + record.sales
+        expected = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:2]
+        assert ranking(records, 2) == expected
+        assert ranking(SalesTable.from_records(records), 2) == expected
+        assert ranking(records, 0) == []
+
+
+def test_top_customers_are_ranked_by_id_and_labelled_by_name() -> None:
+    """Customers sharing a name stay separate; the name is only the label."""
+    records = [
+        _make_record(customer_id="AB-1", customer_name="Alex Brown", sales=100.0),
+        _make_record(customer_id="CD-2", customer_name="Casey Dunn", sales=150.0),
+        _make_record(customer_id="AB-3", customer_name="Alex Brown", sales=90.0),
+        _make_record(customer_id="AB-1", customer_name="Alex Brown", sales=20.0),
+    ]
+    expected = [("Casey Dunn", 150.0), ("Alex Brown", 120.0), ("Alex Brown", 90.0)]
+    for source in (records, SalesTable.from_records(records), iter(records)):
+        assert top_n_customers_by_sales(source, 3) == expected
+    assert top_n_customers_by_sales(records, 0) == []
+
+
+def test_space_saving_bounds_hold_on_skewed_stream() -> None:
+    """Space-Saving estimates bracket the true totals and find every heavy hitter."""
+    import random
+
+    rng = random.Random(3)
+    stream = [(f"sku-{min(int(rng.paretovariate(1.1)), 5000)}", rng.uniform(1, 10)) for _ in range(20000)]
+    truth: dict[str, float] = {}
+    for key, weight in stream:
+        truth[key] = truth.get(key, 0.0) + weight
+    halves = [SpaceSaving(50), SpaceSaving(50)]
+    whole = SpaceSaving(50)
+    for index, (key, weight) in enumerate(stream):
+        whole.add(key, weight)
+        halves[index % 2].add(key, weight)
+    merged = halves[0].merge(halves[1])
+    for sketch in (whole, merged):
+        assert len(sketch) <= 50
+        assert sketch.max_error <= sketch.total / 50 + 1e-9
+        for hitter in sketch.top(10):
+            assert hitter.estimate - hitter.error <= truth[hitter.key] + 1e-6
+            assert truth[hitter.key] <= hitter.estimate + 1e-6
+        monitored = {hitter.key for hitter in sketch.top(50)}
+        assert {key for key, total in truth.items() if total > sketch.total / 50} <= monitored
+    assert [h.key for h in whole.top(3)] == [k for k, _ in sorted(truth.items(), key=lambda kv: -kv[1])[:3]]
+    restored = SpaceSaving.from_state(whole.to_state())
+    assert restored.top(5) == whole.top(5) and restored.max_error == whole.max_error
+    with pytest.raises(ValueError):
+        SpaceSaving(1).add("refund", -1.0)
+
+
+def test_build_report_bounded_top_products() -> None:
+    """build_report(top_capacity=...) reports sketch estimates with an error bound."""
+    records = _varied_records() * 3
+    exact = build_report(records, top_n=2)
+    assert exact.top_products_max_error is None
+    roomy = build_report(records, top_n=2, top_capacity=10)
+    assert roomy.top_products == exact.top_products and roomy.top_products_max_error == 0.0
+    for source in (records, SalesTable.from_records(records)):
+        tight = build_report(source, top_n=1, top_capacity=2)
+        assert tight.top_products_max_error is not None
+        (name, estimate), = tight.top_products
+        true_total = sales_by_key(records, "product_name")[name]
+        assert true_total <= estimate <= true_total + tight.top_products_max_error
+
+
+def test_bounded_top_products_agree_across_read_modes(tmp_path: Path) -> None:
+    """The Space-Saving sketch sees rows in file order however the rows were read."""
+    path = write_synthetic_csv(tmp_path / "sales.csv", 3000, seed=4)
+    records = read_sales_csv(path)
+    expected = build_report(records, top_n=3, top_capacity=20)
+    assert expected.top_products_max_error
+    assert build_report(iter_sales_csv(path), top_n=3, top_capacity=20) == expected
+    assert build_report(read_sales_table(path), top_n=3, top_capacity=20) == expected
+    assert build_report(read_sales_table_parallel(path, workers=2), top_n=3, top_capacity=20) == expected
+    assert run_pipeline(path, batch_lines=250, top_capacity=20).aggregator.report(top_n=3) == expected
+
+
+def test_hyperloglog_estimates_within_error_and_merges() -> None:
+    """HLL stays within a few standard errors and merging equals sketching the union."""
+    left, right, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    for index in range(30000):
+        key = f"CUST-{index}"
+        (left if index % 3 else right).add(key)
+        union.add(key)
+        union.add(key)
+    assert abs(union.estimate() - 30000) <= 3 * union.relative_error * 30000
+    assert left.merge(right).registers == union.registers
+    assert HyperLogLog.from_state(union.to_state()).estimate() == union.estimate()
+    small = HyperLogLog()
+    for key in ("a", "b", "c", "a"):
+        small.add(key)
+    assert round(small.estimate()) == 3
+
+
+def test_kll_quantiles_within_rank_error() -> None:
+    """KLL keeps O(k) items and each quantile's rank is within the documented error."""
+    import random
+
+    values = list(range(50000))
+    random.Random(5).shuffle(values)
+    halves = [KLLSketch(), KLLSketch(seed=7)]
+    for index, value in enumerate(values):
+        halves[index % 2].add(float(value))
+    sketch = halves[0].merge(halves[1])
+    assert sketch.count == 50000 and len(sketch) < 1000
+    assert (sketch.min, sketch.max) == (0.0, 49999.0)
+    for fraction in (0.01, 0.5, 0.9, 0.95, 0.99):
+        assert abs(sketch.quantile(fraction) - fraction * 50000) <= sketch.rank_error * 50000
+    restored = KLLSketch.from_state(sketch.to_state())
+    assert restored.quantiles([0.5, 0.95]) == sketch.quantiles([0.5, 0.95])
+    assert KLLSketch().quantile(0.5) is None
+
+
+def test_build_report_approximate_summary() -> None:
+    """Approximate mode reports distinct counts and quantiles for records and tables alike."""
+    records = _varied_records()
+    exact = build_report(records)
+    assert exact.approximate is None
+    summaries = [build_report(source, approximate=True).approximate for source in (records, SalesTable.from_records(records))]
+    assert summaries[0] == summaries[1]
+    summary = summaries[0]
+    assert summary.distinct_customers == len({record.customer_id for record in records})
+    assert summary.distinct_orders == len({record.order_id for record in records})
+    for region in {record.region for record in records}:
+        expected = len({record.order_id for record in records if record.region == region})
+        assert summary.distinct_orders_by_region[region] == expected
+    assert summary.sales_quantiles[0.5] in {record.sales for record in records}
+    assert summary.sales_quantiles[0.99] == max(record.sales for record in records)
+    aggregator = SalesAggregator(approximate=True).update(records)
+    restored = SalesAggregator.from_state(json.loads(json.dumps(aggregator.to_state())))
+    assert restored.report().approximate == summary
+
+
+def test_group_by_multi_key_aggregations() -> None:
+    """group_by supports multi-column keys and every aggregation on records and tables."""
+    records = _varied_records()
+    metrics = {
+        "revenue": ("sales", "sum"),
+        "rows": ("sales", "count"),
+        "avg_profit": ("profit", "mean"),
+        "min_qty": ("quantity", "min"),
+        "max_discount": ("discount", "max"),
+    }
+    expected: dict = {}
+    for record in records:
+        key = (record.region, record.category)
+        expected.setdefault(key, []).append(record)
+    grouped = group_by(records, ["region", "category"], metrics)
+    assert list(grouped) == list(expected)
+    for key, rows in expected.items():
+        assert grouped[key] == {
+            "revenue": sum(row.sales for row in rows),
+            "rows": len(rows),
+            "avg_profit": sum(row.profit for row in rows) / len(rows),
+            "min_qty": min(row.quantity for row in rows),
+            "max_discount": max(row.discount for row in rows),
+        }
+    assert group_by(SalesTable.from_records(records), ["region", "category"], metrics) == grouped
+    assert group_by(records, [], {"rows": ("sales", "count")}) == {(): {"rows": len(records)}}
+    assert group_by([], ["region"], metrics) == {}
+    with pytest.raises(ValueError):
+        group_by(records, ["sales"], metrics)
+    with pytest.raises(ValueError):
+        group_by(records, ["region"], {"x": ("sales", "median")})
+
+
+def test_records_are_slotted_and_share_repeated_values(tmp_path: Path) -> None:
+    """read_sales_csv returns slotted records whose repeated strings and dates are shared."""
+    records = _varied_records() * 2
+    csv_path = tmp_path / "sales.csv"
+    _write_sales_csv(csv_path, records)
+    loaded = read_sales_csv(csv_path)
+    assert loaded == records
+    assert not hasattr(loaded[0], "__dict__")
+    first, second = loaded[0], loaded[len(records) // 2]
+    assert first.region is second.region and first.product_name is second.product_name
+    assert first.order_date is second.order_date
+    assert first.row_id == second.row_id
+
+
+def test_partition_bounds_from_file_names() -> None:
+    """Year, month and day partitions are recognised in file stems."""
+    assert partition_bounds("sales_2024.csv") == (date(2024, 1, 1), date(2024, 12, 31))
+    assert partition_bounds("data/sales_2024-02.csv") == (date(2024, 2, 1), date(2024, 2, 29))
+    assert partition_bounds("2023_07_04.csv") == (date(2023, 7, 4), date(2023, 7, 4))
+    assert partition_bounds("sales_sample.csv") is None
+    assert partition_bounds("orders_120245.csv") is None
+
+
+def test_dataset_prunes_partitions_and_reads_union(tmp_path: Path) -> None:
+    """A partitioned dataset skips non-overlapping files and returns the union of the rest."""
+    records = _varied_records()
+    by_month: dict = {}
+    for record in records:
+        month = record.order_date.strftime("%Y-%m") if record.order_date else None
+        by_month.setdefault(month, []).append(record)
+    for month, rows in by_month.items():
+        _write_sales_csv(tmp_path / (f"sales_{month}.csv" if month else "unlabelled.csv"), rows)
+    # A file without a partition in its name relies on min/max statistics.
+    _write_sales_csv(tmp_path / "late_uploads.csv", by_month["2019-02"])
+
+    dataset = SalesDataset.discover(tmp_path)
+    assert len(dataset) == len(by_month) + 1
+    where = SalesFilter.for_month("2019-02")
+    kept = sorted(item.path.name for item in dataset.prune(where))
+    assert kept == ["late_uploads.csv", "sales_2019-02.csv"]
+    assert file_stats(tmp_path / "unlabelled.csv") == (None, None)
+    assert (tmp_path / "late_uploads.csv.stats").exists()
+
+    expected = [record for record in records if where.matches(record)] * 2
+    for workers in (1, 2):
+        table = dataset.read_table(where=where, workers=workers)
+        assert sorted(table.to_records(), key=lambda r: r.row_id) == sorted(expected, key=lambda r: r.row_id)
+    assert sum(1 for _ in dataset.iter_records(where=where)) == len(expected)
+    everything = SalesDataset.discover(str(tmp_path / "*.csv")).read_table(workers=1)
+    assert total_sales(everything) == pytest.approx(total_sales(records) + total_sales(by_month["2019-02"]))
+
+
+def test_table_batches_fold_like_a_row_by_row_pass() -> None:
+    """Updating with table batches sums in row order, exactly like the record path."""
+    records = _varied_records() * 7
+    aggregator = SalesAggregator()
+    for start in range(0, len(records), 5):
+        aggregator.update(SalesTable.from_records(records[start : start + 5]))
+    assert aggregator.report() == build_report(records)
+    merged = SalesAggregator().update(records[:20]).merge(SalesAggregator().update(records[20:]))
+    assert merged.report().sales_by_region == pytest.approx(build_report(records).sales_by_region)
+    assert merged.row_count == len(records)
+
+
+def test_pipeline_matches_sequential_report(tmp_path: Path) -> None:
+    """The staged pipeline gives the sequential report, with or without pushdown."""
+    records = _varied_records() * 50
+    csv_path = tmp_path / "sales.csv"
+    _write_sales_csv(csv_path, records)
+    result = run_pipeline(csv_path, parsers=3, batch_lines=7, buffer_capacity=1)
+    assert result.batches == -(-len(records) // 7)
+    assert result.aggregator.report() == build_report(records)
+    where = SalesFilter(regions={"West"})
+    filtered = run_pipeline(csv_path, parsers=2, aggregators=3, batch_lines=11, where=where)
+    expected = build_report([record for record in records if record.region == "West"])
+    assert filtered.aggregator.row_count == expected.row_count
+    assert filtered.aggregator.report().total_sales == pytest.approx(expected.total_sales)
+
+
+def test_pipeline_surfaces_parse_errors(tmp_path: Path) -> None:
+    """A failing parser stops the pipeline and re-raises instead of hanging."""
+    csv_path = tmp_path / "sales.csv"
+    _write_sales_csv(csv_path, _varied_records() * 20)
+    with csv_path.open("a", encoding="utf-8") as handle:
+        handle.write(_csv_line(_varied_records()[0]).replace("2019", "20x9"))
+    with pytest.raises(ValueError):
+        run_pipeline(csv_path, parsers=2, batch_lines=3, buffer_capacity=1)
+
+
+def test_synthetic_generator_is_deterministic_and_round_trips(tmp_path: Path) -> None:
+    """Synthetic data depends only on the seed and parses back to the generated records."""
+    first = list(generate_records(500, seed=3))
+    assert first == list(generate_records(500, seed=3))
+    assert first != list(generate_records(500, seed=4))
+    assert len({record.order_id for record in first}) < len(first)
+    assert {record.region for record in first} == {"East", "West", "Central", "South"}
+    csv_path = write_synthetic_csv(tmp_path / "synthetic.csv", 500, seed=3)
+    assert read_sales_csv(csv_path) == first
+    assert read_sales_table(csv_path).to_records() == first
+
+
+def test_profiler_nests_stages_and_is_inert_when_off(tmp_path: Path) -> None:
+    """Stages nest into self/child time and folded stacks; the module hooks do nothing when off."""
+    assert current() is None
+    with stage("unused"):
+        pass
+    profiler = Profiler()
+    with profiler.stage("outer"):
+        with profiler.stage("inner", rows=3):
+            pass
+        assert list(profiler.timed_iter("items", [1, 2])) == [1, 2]
+    outer = profiler.stages["outer"]
+    assert profiler.stages["inner"].rows == 3
+    assert profiler.stages["items"].calls == 3 and profiler.stages["items"].rows == 2
+    assert outer.child_wall <= outer.wall
+    report = profiler.to_dict()
+    assert report["stages"]["outer"]["self_wall_seconds"] >= 0
+    assert {line.rsplit(" ", 1)[0] for line in report["folded"]} == {"outer", "outer;inner", "outer;items"}
+
+
+def test_profiling_records_reader_and_analytics_stages(tmp_path: Path) -> None:
+    """An active profiler times the reader and analytics stages without changing their results."""
+    records = _varied_records()
+    path = _write_sales_csv(tmp_path / "sales.csv", records)
+
+    with profiling(track_allocations=True) as profiler:
+        loaded = read_sales_csv(path)
+        table = read_sales_table(path)
+        sales = total_sales(loaded)
+    assert current() is None
+    assert loaded == read_sales_csv(path)
+    assert table.to_records() == loaded
+    assert sales == total_sales(records)
+
+    stages = profiler.stages
+    for name in ("read.io", "read.csv", "read.parse_date", "read.build_record",
+                 "read.decode_columns", "analytics.total_sales"):
+        assert stages[name].calls > 0, name
+    assert stages["read.records"].rows == len(records)
+    assert stages["read.build_record"].rows == len(records)
+    assert stages["analytics.total_sales"].rows == len(records)
+    written = json.loads(profiler.write_json(tmp_path / "profile.json").read_text(encoding="utf-8"))
+    assert written["track_allocations"] is True
+    assert "read.table;read.decode_columns" in {line.rsplit(" ", 1)[0] for line in written["folded"]}
+
+
+def test_lazy_sections_match_the_single_pass_report() -> None:
+    """Computing only the requested sections gives the same values as the full report."""
+    records = _varied_records()
+    table = SalesTable.from_records(records)
+    expected = report_sections(build_report(records, top_n=3, approximate=True), SECTIONS)
+    assert compute_sections(records, SECTIONS, top_n=3) == expected
+    assert compute_sections(table, SECTIONS, top_n=3) == expected
+    assert compute_sections(records, ("monthly",)) == {"monthly": expected["monthly"]}
+
+    assert parse_sections("top-products, totals") == ("totals", "top-products")
+    assert parse_sections(None, approximate=True)[-1] == "approximate"
+    with pytest.raises(ValueError):
+        parse_sections("totals,profit")
+
+
+def test_run_sections_writes_json_and_ndjson(capsys: pytest.CaptureFixture[str]) -> None:
+    """JSON output is one document; NDJSON is one line per section entry."""
+    records = _varied_records()
+    data = run_sections(records, ("totals", "top-products"), top_n=2, output_format="json")
+    assert json.loads(capsys.readouterr().out) == json.loads(json.dumps(data))
+    assert set(data) == {"totals", "top-products"}
+    assert data["totals"]["total_sales"] == total_sales(records)
+
+    run_sections(iter(records), ("regions", "top-products"), top_n=2, output_format="ndjson")
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert {(line["key"], line["value"]) for line in lines if line["section"] == "regions"} == set(
+        sales_by_region(records).items()
+    )
+    assert [line["rank"] for line in lines if line["section"] == "top-products"] == [1, 2]
+
+    assert run_sections(records, ("totals",), month="2030-01") is None
+    assert "No records found for month filter '2030-01'." in capsys.readouterr().out
+
+
+def test_result_cache_lru_and_disk_tiers(tmp_path: Path) -> None:
+    """LRU eviction in memory, order-insensitive filter keys and a shared, size-capped disk tier."""
+    cache = ResultCache(max_entries=2)
+    for name in ("a", "b", "c"):
+        cache.put(name, name.upper())
+    assert cache.get("a") is None and cache.get("c") == "C"
+    assert cache.stats().evictions == 1
+
+    shared = tmp_path / "cache"
+    key = ResultCache.key("fingerprint", "sales_by_region", {"where": SalesFilter(regions=["West", "East"])})
+    assert key == ResultCache.key("fingerprint", "sales_by_region", {"where": SalesFilter(regions=["East", "West"])})
+    ResultCache(directory=shared).put(key, {"West": 1.0})
+    reader = ResultCache(directory=shared)
+    assert reader.get(key) == {"West": 1.0}
+    assert reader.stats().disk_hits == 1
+
+    small = ResultCache(directory=shared, max_disk_bytes=0)
+    small.put("other", list(range(100)))
+    assert not list(shared.glob("*.result"))
+
+
+def test_cached_analytics_invalidates_when_the_csv_changes(tmp_path: Path) -> None:
+    """Repeated queries hit the cache until the CSV's fingerprint changes."""
+    records = _varied_records()
+    path = _write_sales_csv(tmp_path / "sales.csv", records)
+    queries = CachedAnalytics(path)
+    assert queries(sales_by_region) == sales_by_region(records)
+    assert queries(top_n_products_by_sales, 2) == top_n_products_by_sales(records, 2)
+    assert queries(sales_by_region) == sales_by_region(records)
+    assert queries.report(top_n=2).total_sales == total_sales(records)
+    stats = queries.cache.stats()
+    assert (stats.hits, stats.misses) == (1, 3)
+
+    fingerprint = dataset_fingerprint(path)
+    _write_sales_csv(path, records[:2])
+    os.utime(path, ns=(0, 0))
+    assert dataset_fingerprint(path) != fingerprint
+    assert queries(sales_by_region) == sales_by_region(records[:2])
+
+
+def test_cached_analytics_keys_lambdas_by_identity(tmp_path: Path) -> None:
+    """Lambdas share a qualified name, so each is cached separately; the disk tier refuses them."""
+    path = _write_sales_csv(tmp_path / "sales.csv", _varied_records())
+    queries = CachedAnalytics(path)
+    count, total = (lambda table: len(table)), (lambda table: total_sales(table))
+    assert queries(count) == len(_varied_records())
+    assert queries(total) == total_sales(_varied_records())
+    assert queries(count) == len(_varied_records()) and queries.cache.stats().hits == 1
+    with pytest.raises(ValueError):
+        CachedAnalytics(path, cache=ResultCache(directory=tmp_path / "cache"))(count)
+
+
+def test_sales_server_answers_queries_and_reloads(tmp_path: Path) -> None:
+    """The resident server answers each endpoint, caches repeats and reloads changed data."""
+    records = _varied_records()
+    path = _write_sales_csv(tmp_path / "sales.csv", records)
+    sales = SalesServer(path)
+
+    status, body = sales.query("/report", {"sections": ["totals,regions"], "month": ["2019-01"]})
+    january = [record for record in records if record.order_date and record.order_date.strftime("%Y-%m") == "2019-01"]
+    assert status == 200 and body["regions"] == sales_by_region(january)
+    assert sales.query("/top", {"by": ["state"], "n": ["2"]})[1] == [
+        {"key": state, "value": value} for state, value in top_n_states_by_sales(records, 2)
+    ]
+    status, body = sales.query("/group", {"by": ["region"], "region": ["West"]})
+    assert body["groups"] == [{"key": ["West"], "value": sales_by_region(records)["West"]}]
+    assert sales.query("/report", {"sections": ["nope"]})[0] == 400
+    assert sales.query("/missing", {})[0] == 404
+    sales.query("/top", {"by": ["state"], "n": ["2"]})
+    assert sales.cache.stats().hits == 1
+
+    assert sales.reload() is False
+    _write_sales_csv(path, records[:2])
+    os.utime(path, ns=(0, 0))
+    assert sales.reload() is True
+    assert sales.query("/health", {})[1]["rows"] == 2
+
+    server = make_server(sales, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/report?sections=totals") as response:
+            assert json.loads(response.read())["totals"]["rows"] == 2
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_server_cache_keeps_group_key_order(tmp_path: Path) -> None:
+    """Filter values share a cache entry in any order; ``by`` keys in a new order do not."""
+    sales = SalesServer(_write_sales_csv(tmp_path / "sales.csv", _varied_records()))
+    first = sales.query("/group", {"by": ["category", "region"]})[1]
+    second = sales.query("/group", {"by": ["region", "category"]})[1]
+    assert first["keys"] == ["category", "region"] and second["keys"] == ["region", "category"]
+    assert {tuple(group["key"][::-1]) for group in second["groups"]} == {tuple(group["key"]) for group in first["groups"]}
+    sales.query("/group", {"by": ["region"], "region": ["West", "East"]})
+    hits = sales.cache.stats().hits
+    sales.query("/group", {"by": ["region"], "region": ["East", "West"]})
+    assert sales.cache.stats().hits == hits + 1
+
+
+def test_date_index_ranges_match_filtered_scans() -> None:
+    """Index slices equal filtered scans; range totals match row sums."""
+    records = list(generate_records(400, seed=3))
+    table = SalesTable.from_records(records)
+    index = DateIndex(table)
+    assert len(index) == sum(1 for record in records if record.order_date is not None)
+    assert index.first == min(record.order_date for record in records if record.order_date)
+    for start, end in ((date(2016, 1, 1), date(2016, 12, 31)), (None, date(2015, 6, 30)), (date(2023, 7, 1), None),
+                       (date(2020, 5, 1), date(2020, 4, 1))):
+        expected = SalesFilter(start=start, end=end).filter_table(table)
+        sliced = index.slice(start, end)
+        assert sliced.to_records() == expected.to_records()
+        assert sales_by_region(sliced) == sales_by_region(expected)
+        totals = index.totals(start, end)
+        assert totals.rows == len(expected)
+        assert totals.quantity == total_quantity_sold(expected)
+        assert totals.sales == pytest.approx(total_sales(expected))
+        assert totals.average_profit == pytest.approx(average_profit(expected))
+
+
+def test_server_range_totals_use_the_date_index(tmp_path: Path) -> None:
+    """/totals over a date range agrees with the totals section of /report."""
+    records = _varied_records()
+    sales = SalesServer(_write_sales_csv(tmp_path / "sales.csv", records))
+    params = {"from": ["2019-01-01"], "to": ["2019-01-31"]}
+    status, body = sales.query("/totals", params)
+    expected = sales.query("/report", {**params, "sections": ["totals"]})[1]["totals"]
+    assert status == 200 and body["rows"] == expected["rows"]
+    assert body["total_sales"] == pytest.approx(expected["total_sales"])
+    assert sales.query("/totals", {**params, "region": ["East"]})[1] == sales.query(
+        "/report", {**params, "region": ["East"], "sections": ["totals"]}
+    )[1]["totals"]
+
+
+def test_snapshot_persists_the_date_index(tmp_path: Path) -> None:
+    """Warm snapshot loads map the stored index, and its selections match filtered scans."""
+    path = _write_sales_csv(tmp_path / "sales.csv", list(generate_records(300, seed=9)))
+    builds: list[Path] = []
+
+    def build(source: Path) -> SalesTable:
+        builds.append(source)
+        return read_sales_table(source)
+
+    cold_table, cold_index = load_or_build_indexed(path, build)
+    warm_table, warm_index = load_or_build_indexed(path, build)
+    assert len(builds) == 1
+    assert all(isinstance(column, memoryview) for column in warm_index.arrays().values())
+    assert {name: list(column) for name, column in warm_index.arrays().items()} == {
+        name: list(column) for name, column in cold_index.arrays().items()
+    }
+    for where in (
+        SalesFilter(start=date(2016, 1, 1), end=date(2017, 6, 30)),
+        SalesFilter(start=date(2016, 1, 1), end=date(2017, 6, 30), regions=["West"]),
+        SalesFilter(regions=["East"]),
+    ):
+        expected = where.filter_table(cold_table).to_records()
+        assert warm_index.select(where).to_records() == expected
+        assert cold_index.select(where).to_records() == expected
+
+
+def test_time_series_granularities_rolling_and_year_over_year() -> None:
+    """Buckets agree across inputs and granularities; year-over-year uses the prior year."""
+    records = list(generate_records(600, seed=5))
+    table = SalesTable.from_records(records)
+    dated = [record for record in records if record.order_date is not None]
+
+    monthly = time_series(records, "month")
+    assert monthly.to_dict() == monthly_sales(records) == time_series(table, "month").to_dict()
+    assert time_series(table, "quarter", "quantity").to_dict() == time_series(records, "quarter", "quantity").to_dict()
+    yearly = time_series(records, "year", "count").to_dict()
+    assert sum(yearly.values()) == len(dated)
+    assert yearly["2016"] == sum(1 for record in dated if record.order_date.year == 2016)
+    assert list(time_series(records, "week").to_dict())[0].startswith(f"{min(r.order_date for r in dated).isocalendar()[0]}-W")
+    quarterly = time_series(records, "quarter")
+    assert set(quarterly.to_dict()) == {f"{r.order_date.year}-Q{(r.order_date.month - 1) // 3 + 1}" for r in dated}
+
+
+    sales = time_series(records, "year").to_dict()
+    changes = time_series(records, "year").year_over_year()
+    assert changes["2014"] is None
+    assert changes["2017"] == pytest.approx((sales["2017"] - sales["2016"]) / sales["2016"])
+    with pytest.raises(ValueError):
+        time_series(records, "decade")
+
+
+def test_time_series_rolling_counts_empty_periods_as_zero() -> None:
+    """Rolling windows span months without rows, which contribute zero."""
+    records = [
+        _make_record(row_id="1", order_date=date(2019, 1, 3), sales=10.0),
+        _make_record(row_id="2", order_date=date(2019, 1, 28), sales=20.0),
+        _make_record(row_id="3", order_date=date(2019, 3, 14), sales=40.0),
+        _make_record(row_id="4", order_date=date(2019, 4, 2), sales=5.0),
+        _make_record(row_id="5", order_date=None, sales=1000.0),
+    ]
+    for source in (records, SalesTable.from_records(records)):
+        monthly = time_series(source, "month")
+        assert monthly.to_dict() == {"2019-01": 30.0, "2019-03": 40.0, "2019-04": 5.0}
+        assert monthly.rolling(1) == {"2019-01": 30.0, "2019-02": 0.0, "2019-03": 40.0, "2019-04": 5.0}
+        assert monthly.rolling(2) == {"2019-01": 30.0, "2019-02": 30.0, "2019-03": 40.0, "2019-04": 45.0}
+        assert monthly.rolling(3) == {"2019-01": 30.0, "2019-02": 30.0, "2019-03": 70.0, "2019-04": 45.0}
+        assert monthly.rolling(2, mean=True) == {"2019-01": 30.0, "2019-02": 15.0, "2019-03": 20.0, "2019-04": 22.5}
+    with pytest.raises(ValueError):
+        time_series(records, "month").rolling(0)